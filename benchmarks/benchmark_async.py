@@ -0,0 +1,189 @@
+"""
+Benchmark: gunicorn síncrono (WSGI) x gunicorn + uvicorn (ASGI).
+
+Sobe cada servidor localmente, mede a memória (RSS) da árvore de processos
+e dispara requisições GET concorrentes contra a mesma rota, nas versões
+síncrona (/api/v1/...) e assíncrona (/api/v1/async/...).
+
+A comparação justa é com o mesmo orçamento de memória: ajuste --workers-wsgi
+e --workers-asgi até os RSS ficarem próximos e compare req/s e latências
+com a mesma concorrência.
+
+Uso (na raiz do projeto, com banco populado e SECRET_KEY definido):
+    python benchmarks/benchmark_async.py --rota consultas/ \\
+        --concorrencia 64 --requisicoes 2000 --workers-wsgi 4 --workers-asgi 1
+
+Requer gunicorn e uvicorn-worker instalados (ver requirements.txt).
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_arvore_kb(pid):
+    """Soma o VmRSS (kB) do processo e de todos os descendentes (Linux)."""
+    filhos = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat") as arquivo:
+                ppid = int(arquivo.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        filhos.setdefault(ppid, []).append(int(entrada))
+
+    total, pendentes = 0, [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        pendentes.extend(filhos.get(atual, []))
+        try:
+            with open(f"/proc/{atual}/status") as arquivo:
+                for linha in arquivo:
+                    if linha.startswith("VmRSS:"):
+                        total += int(linha.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+def subir_servidor(modo, workers, porta):
+    aplicacao = f"config.{modo}:application"
+    comando = [
+        sys.executable, "-m", "gunicorn", aplicacao,
+        "--bind", f"127.0.0.1:{porta}",
+        "--workers", str(workers),
+        "--log-level", "warning",
+    ]  # fmt: skip
+    if modo == "asgi":
+        comando += ["--worker-class", "uvicorn_worker.UvicornWorker"]
+    processo = subprocess.Popen(comando, cwd=RAIZ)
+
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/api/v1/", timeout=1)
+            return processo
+        except urllib.error.HTTPError:
+            return processo  # Servidor no ar (ex.: 401/404 na raiz da API)
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError(f"Servidor {modo} não respondeu na porta {porta}.")
+
+
+async def _requisicao(porta, caminho, cabecalhos):
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    pedido = (
+        f"GET {caminho} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Accept: application/json\r\nConnection: close\r\n{cabecalhos}\r\n"
+    )
+    escritor.write(pedido.encode())
+    await escritor.drain()
+    resposta = await leitor.read()
+    escritor.close()
+    return int(resposta.split(b" ", 2)[1])
+
+
+async def gerar_carga(porta, caminho, concorrencia, total, cabecalhos):
+    latencias, erros = [], 0
+    fila = asyncio.Queue()
+    for _ in range(total):
+        fila.put_nowait(None)
+
+    async def cliente():
+        nonlocal erros
+        while not fila.empty():
+            fila.get_nowait()
+            inicio = time.perf_counter()
+            try:
+                codigo = await _requisicao(porta, caminho, cabecalhos)
+            except OSError:
+                codigo = 0
+            latencias.append(time.perf_counter() - inicio)
+            if codigo != 200:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def medir(modo, args):
+    workers = args.workers_wsgi if modo == "wsgi" else args.workers_asgi
+    prefixo = "/api/v1/" if modo == "wsgi" else "/api/v1/async/"
+    caminho = prefixo + args.rota
+    cabecalhos = f"Authorization: Bearer {args.token}\r\n" if args.token else ""
+
+    processo = subir_servidor(modo, workers, args.porta)
+    try:
+        # Aquecimento: carrega módulos e conexões em todos os workers
+        asyncio.run(
+            gerar_carga(args.porta, caminho, workers * 2, workers * 10, cabecalhos)
+        )
+        latencias, erros, duracao = asyncio.run(
+            gerar_carga(
+                args.porta, caminho, args.concorrencia, args.requisicoes, cabecalhos
+            )
+        )
+        rss_mb = rss_arvore_kb(processo.pid) / 1024
+    finally:
+        processo.send_signal(signal.SIGTERM)
+        processo.wait(timeout=30)
+
+    latencias.sort()
+    return {
+        "modo": modo,
+        "workers": workers,
+        "rss_mb": rss_mb,
+        "req_s": len(latencias) / duracao,
+        "p50_ms": statistics.median(latencias) * 1000,
+        "p95_ms": latencias[int(len(latencias) * 0.95) - 1] * 1000,
+        "erros": erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rota", default="consultas/", help="Rota relativa a /api/v1/."
+    )
+    parser.add_argument("--concorrencia", type=int, default=64)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--workers-wsgi", type=int, default=4)
+    parser.add_argument("--workers-asgi", type=int, default=1)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--token", help="JWT de acesso (opcional).")
+    args = parser.parse_args()
+
+    resultados = [medir("wsgi", args), medir("asgi", args)]
+
+    print(
+        f"\nRota: {args.rota} | concorrência: {args.concorrencia} "
+        f"| requisições: {args.requisicoes}"
+    )
+    print(
+        f"{'modo':<6}{'workers':>8}{'RSS MB':>9}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'erros':>7}"
+    )
+    for r in resultados:
+        print(
+            f"{r['modo']:<6}{r['workers']:>8}{r['rss_mb']:>9.1f}{r['req_s']:>9.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['erros']:>7}"
+        )
+    for r in resultados:
+        print(f"{r['modo']}: {r['req_s'] / max(r['rss_mb'], 1):.2f} req/s por MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: serialização + renderização de páginas de ConsultaSerializer.
+
+Para cada renderer disponível (JSON do DRF, JSON com orjson e MessagePack)
+mede o tempo de serializar e de renderizar páginas de consultas e o tamanho
+da resposta sem compressão, com gzip e com brotli (o que vai pela rede).
+
+Uso (na raiz do projeto, com banco populado e SECRET_KEY definido):
+    python benchmarks/benchmark_renderers.py --tamanho-pagina 100 --repeticoes 20
+"""
+
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from clinic.middleware import CompressaoAPIMiddleware, brotli  # noqa: E402
+from clinic.renderers import (  # noqa: E402
+    JSONRapidoRenderer,
+    MessagePackRenderer,
+    msgpack,
+    orjson,
+)
+from clinic.serializers import ConsultaSerializer  # noqa: E402
+from clinic.views import ConsultaViewSet  # noqa: E402
+
+
+def cronometrar(funcao, repeticoes):
+    """Retorna (resultado da última execução, mediana em ms)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tamanho-pagina", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    # Mesma consulta ao banco da listagem da API; a página é carregada uma vez
+    # para que o tempo medido seja só o de serialização
+    pagina = list(ConsultaViewSet.queryset[: args.tamanho_pagina])
+    if not pagina:
+        sys.exit("Nenhuma consulta no banco: popule-o antes de rodar o benchmark.")
+
+    dados, tempo_serializacao = cronometrar(
+        lambda: ConsultaSerializer(pagina, many=True).data, args.repeticoes
+    )
+    print(
+        f"{len(pagina)} consultas por página | serialização "
+        f"(ConsultaSerializer): {tempo_serializacao:.2f} ms\n"
+    )
+
+    renderers = [("json (DRF)", JSONRenderer())]
+    if orjson is not None:
+        renderers.append(("json (orjson)", JSONRapidoRenderer()))
+    if msgpack is not None:
+        renderers.append(("msgpack", MessagePackRenderer()))
+
+    qualidade = CompressaoAPIMiddleware.qualidade_brotli
+    print(
+        f"{'renderer':<15}{'render ms':>10}{'total ms':>10}"
+        f"{'bytes':>10}{'gzip':>10}{'brotli':>10}"
+    )
+    for nome, renderer in renderers:
+        corpo, tempo = cronometrar(lambda: renderer.render(dados), args.repeticoes)
+        tamanho_brotli = (
+            len(brotli.compress(corpo, quality=qualidade)) if brotli else "-"
+        )
+        print(
+            f"{nome:<15}{tempo:>10.2f}{tempo + tempo_serializacao:>10.2f}"
+            f"{len(corpo):>10}{len(gzip.compress(corpo)):>10}{tamanho_brotli:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ class TutorAdmin(admin.ModelAdmin):
         "cpf",
         "email",
         "telefone_principal",
+        "total_pacientes",
         "data_cadastro",
     )
     search_fields = ("nome_completo", "cpf", "email")
@@ -46,7 +47,7 @@ class PacienteAdmin(admin.ModelAdmin):
         "raca",
         "sexo",
         "status",
-        "idade",
+        "get_idade",
         "data_cadastro",
     )
     search_fields = ("nome", "tutor__nome_completo", "microchip", "raca")
@@ -101,12 +102,18 @@ class PacienteAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        # Idade calculada no banco, uma vez por linha da listagem
+        return super().get_queryset(request).com_idade()
+
     def get_idade(
         self, obj
     ):  # Para exibir a property 'idade' corretamente se necessário
         return obj.idade
 
     get_idade.short_description = "Idade Atual"  # type: ignore
+    # Mais novo primeiro ao ordenar por idade (usa o índice da data)
+    get_idade.admin_order_field = "-data_nascimento"  # type: ignore
 
 
 @admin.register(Veterinario)
@@ -114,6 +121,7 @@ class VeterinarioAdmin(admin.ModelAdmin):
     list_display = (
         "nome_completo",
         "crmv",
+        "total_consultas",
     )
     search_fields = ("nome_completo", "crmv")
 
@@ -121,7 +129,7 @@ class VeterinarioAdmin(admin.ModelAdmin):
 @admin.register(Sintoma)
 class SintomaAdmin(admin.ModelAdmin):
     list_display = ("nome", "descricao")
-    search_fields = ("nome",)
+    search_fields = ("nome", "sinonimos")
 
 
 @admin.register(Consulta)
@@ -282,7 +290,9 @@ class DoencaAdmin(admin.ModelAdmin):
     search_fields = ('nome', 'descricao', 'sintomas_associados__nome')
     filter_horizontal = ('sintomas_associados',)
 
-    @admin.display(description='Nº de Sintomas Associados')
+    @admin.display(
+        description='Nº de Sintomas Associados', ordering='total_sintomas'
+    )
     def get_sintomas_count(self, obj):
-        """Retorna a contagem de sintomas associados."""
-        return obj.sintomas_associados.count()
+        """Retorna a contagem de sintomas associados (coluna contadora)."""
+        return obj.total_sintomas
@@ -0,0 +1,284 @@
+"""
+Versões assíncronas dos endpoints de leitura mais acessados.
+
+Servidas sob ASGI (ver perfil 'asgi' do docker-compose), estas views usam
+o ORM assíncrono do Django: enquanto uma requisição espera o banco, o
+mesmo worker atende outras, em vez de ficar bloqueado como um worker
+síncrono do gunicorn.
+
+O DRF não executa views async, então elas são views Django puras que
+reaproveitam dos ViewSets os filtros, a busca, a ordenação, a paginação
+e os serializers, respondendo no mesmo formato da API síncrona.
+Endpoints (prefixo /api/v1/async/):
+- GET consultas/ e consultas/{id}/
+- GET pacientes/
+- GET lookups/?recursos=...
+- GET diagnosticos/sugerir/?sintomas=1,2,3
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .constants import ERROR_IDS_INVALIDOS
+from .models import Consulta, Doenca
+from .serializers import DoencaSerializer
+from .services import DiagnosticoService
+from .views import (
+    ConsultaViewSet,
+    PacienteViewSet,
+    ler_recursos_lookup,
+    queryset_lookup,
+    resposta_lookups,
+)
+
+logger = logging.getLogger(__name__)
+
+ERRO_PAGINA_INVALIDA = "Página inválida."
+ERRO_TOKEN_INVALIDO = "Token inválido ou expirado."
+
+
+def _json(dados, status_code=status.HTTP_200_OK):
+    # Mesmo renderer JSON da API síncrona (orjson, se API_RENDERERS_RAPIDOS)
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(
+        renderer.render(dados),
+        content_type=renderer.media_type,
+        status=status_code,
+    )
+
+
+async def _token_invalido(request):
+    """
+    Valida o JWT, se enviado, como o JWTAuthentication faria.
+
+    As leituras são públicas (IsAuthenticatedOrReadOnly), mas um token
+    inválido continua resultando em 401, como na API síncrona.
+
+    Returns:
+        Resposta 401, ou None se não há token ou ele é válido
+    """
+    autenticacao = JWTAuthentication()
+    cabecalho = autenticacao.get_header(request)
+    token_bruto = autenticacao.get_raw_token(cabecalho) if cabecalho else None
+    if token_bruto is None:
+        return None
+    try:
+        token = autenticacao.get_validated_token(token_bruto)
+        usuario_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return _json({"detail": ERRO_TOKEN_INVALIDO}, status.HTTP_401_UNAUTHORIZED)
+
+    existe = await (
+        get_user_model()
+        .objects.filter(**{jwt_settings.USER_ID_FIELD: usuario_id}, is_active=True)
+        .aexists()
+    )
+    if not existe:
+        return _json({"detail": ERRO_TOKEN_INVALIDO}, status.HTTP_401_UNAUTHORIZED)
+    return None
+
+
+def _instanciar_viewset(viewset_class, request, action, **kwargs):
+    """Cria o ViewSet para reaproveitar filtros, paginação e serializers."""
+    # Sem autenticadores: request.user não é consultado no banco
+    requisicao = Request(request, authenticators=())
+    return viewset_class(
+        request=requisicao, args=(), kwargs=kwargs, format_kwarg=None, action=action
+    )
+
+
+async def _listar(request, viewset_class, otimizar):
+    """
+    Lista paginada equivalente a ViewSet.list(), com o ORM assíncrono.
+
+    O queryset é montado pelos filtros do ViewSet em uma thread (o
+    django-filter pode validar IDs no banco) e avaliado de forma assíncrona.
+    """
+    erro = await _token_invalido(request)
+    if erro:
+        return erro
+
+    view = _instanciar_viewset(viewset_class, request, "list")
+    try:
+        queryset = await sync_to_async(
+            lambda: otimizar(view.filter_queryset(view.get_queryset()))
+        )()
+        tamanho = view.paginator.get_page_size(view.request)
+    except ValidationError as e:
+        return _json(e.detail, status.HTTP_400_BAD_REQUEST)
+
+    paginador = view.paginator
+    try:
+        pagina = int(view.request.query_params.get(paginador.page_query_param, 1))
+    except ValueError:
+        pagina = 0
+    total = await queryset.acount()
+    ultima_pagina = max(1, -(-total // tamanho))
+    if pagina < 1 or pagina > ultima_pagina:
+        return _json({"detail": ERRO_PAGINA_INVALIDA}, status.HTTP_404_NOT_FOUND)
+
+    inicio = (pagina - 1) * tamanho
+    objetos = [objeto async for objeto in queryset[inicio : inicio + tamanho]]
+
+    url = view.request.build_absolute_uri()
+    anterior = None
+    if pagina > 1:
+        anterior = (
+            remove_query_param(url, paginador.page_query_param)
+            if pagina == 2
+            else replace_query_param(url, paginador.page_query_param, pagina - 1)
+        )
+    proxima = None
+    if pagina < ultima_pagina:
+        proxima = replace_query_param(url, paginador.page_query_param, pagina + 1)
+
+    return _json(
+        {
+            "count": total,
+            "next": proxima,
+            "previous": anterior,
+            "results": view.get_serializer(objetos, many=True).data,
+        }
+    )
+
+
+def _otimizar_consultas(queryset):
+    # A serialização em contexto assíncrono não pode disparar consultas:
+    # os sintomas das doenças aninhadas também precisam vir no prefetch.
+    return queryset.prefetch_related(
+        "diagnosticos_suspeitos__sintomas_associados",
+        "diagnosticos_definitivos__sintomas_associados",
+    )
+
+
+def _otimizar_pacientes(queryset):
+    return queryset.select_related("tutor")
+
+
+async def _carregar_base_conhecimento():
+    """Retorna {doenca_id: {sintoma_id, ...}} lido da tabela de associação."""
+    associacoes = Doenca.sintomas_associados.through.objects.values_list(
+        "doenca_id", "sintoma_id"
+    )
+    sintomas_por_doenca = {}
+    async for doenca_id, sintoma_id in associacoes:
+        sintomas_por_doenca.setdefault(doenca_id, set()).add(sintoma_id)
+    return sintomas_por_doenca
+
+
+async def _sugerir_diagnosticos(sintomas_ids):
+    """
+    Calcula os diagnósticos sugeridos sem gravar nada no banco.
+
+    Returns:
+        Lista de Doenca em ordem de score, com o atributo _score anexado
+    """
+    ranking = DiagnosticoService().ranquear_doencas(
+        await _carregar_base_conhecimento(), set(sintomas_ids)
+    )
+    doencas = await Doenca.objects.prefetch_related("sintomas_associados").ain_bulk(
+        [doenca_id for doenca_id, _ in ranking]
+    )
+    sugeridas = []
+    for doenca_id, score in ranking:
+        doenca = doencas[doenca_id]
+        doenca._score = score
+        sugeridas.append(doenca)
+    return sugeridas
+
+
+@require_GET
+async def listar_consultas(request):
+    """Versão assíncrona de GET /consultas/ (mesmos filtros e paginação)."""
+    return await _listar(request, ConsultaViewSet, _otimizar_consultas)
+
+
+@require_GET
+async def detalhar_consulta(request, pk):
+    """
+    Versão assíncrona de GET /consultas/{id}/.
+
+    Os diagnósticos sugeridos são recalculados para a resposta, como na
+    versão síncrona, mas não são regravados no banco (o recálculo
+    persistido acontece na criação e na atualização da consulta).
+    """
+    erro = await _token_invalido(request)
+    if erro:
+        return erro
+
+    view = _instanciar_viewset(ConsultaViewSet, request, "retrieve", pk=pk)
+    try:
+        consulta = await _otimizar_consultas(view.get_queryset()).aget(pk=pk)
+    except Consulta.DoesNotExist:
+        raise Http404
+
+    sintomas_ids = [sintoma.pk for sintoma in consulta.sintomas_apresentados.all()]
+    consulta._diagnosticos_sugeridos_ordenados = await _sugerir_diagnosticos(
+        sintomas_ids
+    )
+    return _json(view.get_serializer(consulta).data)
+
+
+@require_GET
+async def listar_pacientes(request):
+    """Versão assíncrona de GET /pacientes/ (mesmos filtros e paginação)."""
+    return await _listar(request, PacienteViewSet, _otimizar_pacientes)
+
+
+@require_GET
+async def lookups(request):
+    """Versão assíncrona de GET /lookups/?recursos=..."""
+    erro = await _token_invalido(request)
+    if erro:
+        return erro
+
+    recursos, erro = ler_recursos_lookup(request.GET)
+    if erro:
+        return _json({"detail": erro}, status.HTTP_400_BAD_REQUEST)
+
+    dados = {}
+    for nome in recursos:
+        dados[nome] = [item async for item in queryset_lookup(nome)]
+    return resposta_lookups(request, dados, _json(dados))
+
+
+@require_GET
+async def sugerir_diagnosticos(request):
+    """
+    Sugestão de diagnósticos avulsa: GET /diagnosticos/sugerir/?sintomas=1,2,3
+
+    Calcula o ranking sem criar consulta, no mesmo formato dos
+    diagnósticos suspeitos da consulta (com score e porcentagem).
+    """
+    erro = await _token_invalido(request)
+    if erro:
+        return erro
+
+    try:
+        sintomas_ids = [
+            int(parte)
+            for parte in request.GET.get("sintomas", "").split(",")
+            if parte.strip()
+        ]
+    except ValueError:
+        return _json({"sintomas": [ERROR_IDS_INVALIDOS]}, status.HTTP_400_BAD_REQUEST)
+
+    resultado = []
+    for doenca in await _sugerir_diagnosticos(sintomas_ids):
+        dados = DoencaSerializer(doenca).data
+        dados["score"] = round(doenca._score, 2)
+        dados["porcentagem"] = f"{round(doenca._score, 1)}%"
+        resultado.append(dados)
+    return _json(resultado)
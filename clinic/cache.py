@@ -0,0 +1,62 @@
+"""
+Cache de respostas da API com invalidação por versão de tabela.
+
+Cada "tabela" lógica (ex: 'base_conhecimento', 'paciente') tem um contador
+guardado no próprio cache. As chaves das respostas incluem os contadores
+das tabelas das quais dependem; incrementar um contador torna todas essas
+chaves obsoletas de uma vez, sem precisar localizá-las ou apagá-las (as
+entradas antigas expiram sozinhas pelo timeout).
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIXO_VERSAO = "clinic:versao"
+
+
+def _chave_versao(tabela):
+    return f"{PREFIXO_VERSAO}:{tabela}"
+
+
+def _versao_inicial():
+    # Se o contador for descartado pelo cache, recomeça de um valor maior
+    # que os anteriores, para não reaproveitar chaves antigas.
+    return int(time.time() * 1000)
+
+
+def versoes_tabelas(tabelas):
+    """
+    Retorna {tabela: versão} para as tabelas informadas.
+
+    Contadores inexistentes são inicializados.
+    """
+    chaves = {_chave_versao(tabela): tabela for tabela in tabelas}
+    versoes = cache.get_many(list(chaves))
+    for chave in chaves.keys() - versoes.keys():
+        cache.add(chave, _versao_inicial(), timeout=None)
+        versoes[chave] = cache.get(chave)
+    return {tabela: versoes[chave] for chave, tabela in chaves.items()}
+
+
+def _incrementar(tabelas):
+    for tabela in tabelas:
+        chave = _chave_versao(tabela)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.add(chave, _versao_inicial(), timeout=None)
+
+
+def incrementar_versao_tabela(*tabelas):
+    """
+    Invalida as respostas em cache que dependem das tabelas informadas.
+
+    Dentro de uma transação o contador é incrementado agora e novamente no
+    commit: uma requisição concorrente que leia os dados antigos antes do
+    commit não consegue deixar em cache uma resposta com a versão final.
+    """
+    _incrementar(tabelas)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _incrementar(tabelas))
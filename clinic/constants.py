@@ -30,6 +30,65 @@ ERROR_DOENCA_NOME_DUPLICADO = "Já existe uma doença cadastrada com este nome."
 ERROR_CONSULTA_PACIENTE_OBRIGATORIO = "O campo paciente é obrigatório."
 ERROR_CONSULTA_DATA_FUTURA = "A data de nascimento não pode ser no futuro."
 
+# Operações em lote
+ERROR_LOTE_FORMATO = "Envie uma lista de objetos."
+ERROR_LOTE_VAZIO = "A lista enviada está vazia."
+ERROR_LOTE_LIMITE = "O lote excede o limite de {limite} itens."
+ERROR_LOTE_ID_OBRIGATORIO = "O campo id é obrigatório em cada item."
+ERROR_LOTE_ID_REPETIDO = "Este id aparece mais de uma vez no lote."
+ERROR_LOTE_NAO_ENCONTRADO = "Registro não encontrado."
+ERROR_LOTE_VALOR_REPETIDO = "Este valor aparece mais de uma vez no lote."
+
+# Lookups (listas compactas para selects)
+ERROR_LOOKUP_RECURSOS_OBRIGATORIO = "Informe os recursos desejados em 'recursos'."
+ERROR_LOOKUP_RECURSO_INVALIDO = "Recurso(s) desconhecido(s): {recursos}."
+
+# Requisições em lote (/batch/)
+ERROR_BATCH_FORMATO = (
+    "Envie 'requisicoes' com uma lista de URLs ou objetos com o campo 'url'."
+)
+ERROR_BATCH_LIMITE = "O lote excede o limite de {limite} requisições."
+ERROR_BATCH_METODO = "Somente requisições GET são permitidas no lote."
+ERROR_BATCH_URL_INVALIDA = "URL inválida: use um caminho relativo da API."
+ERROR_BATCH_ANINHADO = "Requisições em lote não podem ser aninhadas."
+ERROR_BATCH_NAO_ENCONTRADO = "Nenhum endpoint encontrado para esta URL."
+ERROR_BATCH_STREAMING = "Endpoints de exportação não podem ser usados no lote."
+
+# Filtro por IDs (?ids=1,5,9)
+ERROR_IDS_INVALIDOS = "Informe IDs numéricos separados por vírgula."
+ERROR_IDS_LIMITE = "Informe no máximo {limite} IDs."
+
+# Sincronização incremental (/sync/)
+ERROR_SYNC_DATA_INVALIDA = (
+    "Data inválida em 'modified_since'. Use o formato ISO 8601 "
+    "(ex: 2025-01-31T14:00:00Z)."
+)
+ERROR_SYNC_CURSOR_INVALIDO = "Cursor de sincronização inválido."
+
+# Busca global (/busca/)
+ERROR_BUSCA_TERMO_CURTO = "Informe ao menos {minimo} caracteres para a busca."
+
+# Consulta por identificador (/identificadores/{valor}/)
+ERROR_IDENTIFICADOR_INVALIDO = (
+    "Identificador não reconhecido. Informe um CPF, microchip ou CRMV."
+)
+ERROR_IDENTIFICADOR_NAO_ENCONTRADO = "Nenhum cadastro com este identificador."
+
+# Upload da foto em partes (/pacientes/{id}/foto/upload/)
+ERROR_UPLOAD_TAMANHO = "Informe 'tamanho' (bytes) entre 1 e {maximo}."
+ERROR_UPLOAD_NAO_ENCONTRADO = "Upload não encontrado ou expirado."
+ERROR_UPLOAD_PARTE_TAMANHO = "Cada parte deve ter entre 1 e {maximo} bytes."
+ERROR_UPLOAD_CONTENT_RANGE = (
+    "Content-Range inválido. Use 'bytes início-fim/total' com o total do upload."
+)
+ERROR_UPLOAD_FORA_DE_ORDEM = "A parte deve começar no byte {recebidos}."
+ERROR_UPLOAD_PARTE_INCOMPLETA = "A parte recebida é menor que o Content-Length."
+ERROR_UPLOAD_PARTE_CONCORRENTE = (
+    "Outra parte deste upload está sendo recebida; consulte os bytes recebidos."
+)
+ERROR_UPLOAD_FORMATO = "Envie uma imagem JPEG, PNG ou WebP."
+ERROR_UPLOAD_PIXELS = "A imagem excede o limite de {maximo} pixels."
+
 # Gerais
 ERROR_FIELD_REQUIRED = "Este campo é obrigatório."
 ERROR_UNIQUE_CONSTRAINT = "Este valor já está cadastrado no sistema."
@@ -91,6 +150,9 @@ HELP_TEXT_PACIENTE_FOTO = "Foto do paciente"
 HELP_TEXT_DOENCA_SINTOMAS = (
     "Lista de IDs dos sintomas a serem associados a esta doença."
 )
+HELP_TEXT_SINTOMA_SINONIMOS = (
+    "Um sinônimo por linha, usados no autocompletar (ex: 'Êmese' para 'Vômito')."
+)
 
 
 # ==================== CHOICES ====================
@@ -161,6 +223,13 @@ TIPO_CONSULTA_CHOICES = [
     (TIPO_OUTRO, "Outro"),
 ]
 
+# Tipos de registro do índice de busca global (na ordem de exibição)
+TIPO_BUSCA_CHOICES = [
+    ("tutor", "Tutor"),
+    ("paciente", "Paciente"),
+    ("consulta", "Consulta"),
+]
+
 
 # ==================== CONFIGURAÇÕES ====================
 
@@ -168,6 +237,88 @@ TIPO_CONSULTA_CHOICES = [
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
 
+# Filtro por IDs: máximo de IDs em '?ids=' (todos cabem em uma página)
+MAX_IDS_FILTRO = MAX_PAGE_SIZE
+
+# Operações em lote (POST/PATCH com lista de objetos)
+MAX_ITENS_LOTE = 500
+
+# Requisições em lote (/batch/): máximo de sub-requisições por chamada
+BATCH_MAX_REQUISICOES = 20
+
+# Sincronização incremental (/sync/): registros por página e margem (segundos)
+# que evita perder alterações de transações ainda não confirmadas
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 1000
+SYNC_MARGEM_SEGUNDOS = 5
+
+# Cache de respostas da API (segundos). As entradas são invalidadas pelas
+# versões das tabelas; o timeout só limita quanto tempo ficam ocupando espaço.
+CACHE_RESPOSTA_TIMEOUT = 60 * 60
+
+# Exportação em streaming (linhas lidas do cursor por bloco)
+EXPORT_CHUNK_SIZE = 2000
+
+# Busca global (/busca/): tamanho mínimo de cada termo, termos considerados,
+# linhas do índice lidas por termo e orçamento de tempo (ms) da busca
+BUSCA_TAMANHO_MINIMO = 2
+BUSCA_MAX_TERMOS = 5
+BUSCA_MAX_CANDIDATOS = 1000
+BUSCA_ORCAMENTO_MS = 200
+BUSCA_LIMITE_PADRAO = 10
+BUSCA_LIMITE_MAXIMO = 50
+
+# Identificadores normalizados: separadores removidos das colunas
+# cpf_digitos, microchip_normalizado e crmv_normalizado (e das consultas)
+SEPARADORES_CPF = ".-"
+SEPARADORES_MICROCHIP = " -."
+SEPARADORES_CRMV = " -./"
+
+# Consulta por identificador: validade (segundos) do resultado em cache
+IDENTIFICADOR_CACHE_TIMEOUT = 60
+
+# Autocompletar de sintomas: sugestões por resposta e entradas do índice
+# em memória examinadas por busca
+AUTOCOMPLETE_LIMITE_PADRAO = 10
+AUTOCOMPLETE_LIMITE_MAXIMO = 50
+AUTOCOMPLETE_MAX_VARREDURA = 500
+
+# Miniaturas da foto do paciente: lado máximo (px) de cada tamanho, formatos
+# gerados (o primeiro é o preferido), qualidade e diretório no storage
+MINIATURA_TAMANHOS = {"pequena": 96, "media": 320, "grande": 800}
+MINIATURA_FORMATOS = ("webp", "jpeg")
+MINIATURA_QUALIDADE = 80
+MINIATURA_DIRETORIO = "pacientes_fotos/miniaturas"
+
+# Upload da foto em partes: tamanho máximo da foto e de cada parte (bytes),
+# bloco lido do corpo por vez, limite de pixels (largura x altura, lido do
+# cabeçalho da imagem), formatos aceitos (extensão gravada) e validade (s)
+# de um upload iniciado e não concluído
+FOTO_TAMANHO_MAXIMO = 30 * 1024 * 1024
+FOTO_TAMANHO_MAXIMO_PARTE = 5 * 1024 * 1024
+FOTO_BLOCO_LEITURA = 64 * 1024
+FOTO_MAX_PIXELS = 50_000_000
+FOTO_FORMATOS_PERMITIDOS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+FOTO_UPLOAD_VALIDADE = 24 * 60 * 60
+
+# Arquivos de mídia (MEDIA_URL): um nome nunca tem o conteúdo trocado (o
+# storage gera outro nome), então podem ficar em cache por um ano
+MIDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Deduplicação de tutores (dedupe_tutores): MinHash com bandas x linhas
+# permutações sobre trigramas do nome, blocos de candidatos maiores que
+# DEDUPE_MAX_BLOCO ignorados (nomes/CEPs muito comuns), pesos do score e
+# score mínimo para fundir dois cadastros
+DEDUPE_TAMANHO_SHINGLE = 3
+DEDUPE_BANDAS = 8
+DEDUPE_LINHAS_POR_BANDA = 3
+DEDUPE_MAX_BLOCO = 200
+DEDUPE_PESO_NOME = 0.6
+DEDUPE_PESO_TELEFONE = 0.25
+DEDUPE_PESO_CEP = 0.1
+DEDUPE_PESO_EMAIL = 0.05
+DEDUPE_LIMIAR_PADRAO = 0.7
+
 # Logging
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -123,7 +123,7 @@ diagnosticos = diagnostico_service.sugerir_diagnosticos(sintomas_paciente)
 
 print(f"\n💡 Diagnósticos sugeridos (ordenados por probabilidade):")
 for i, doenca in enumerate(diagnosticos, 1):
-    sintomas_da_doenca = doenca.sintomas_associados.count()
+    sintomas_da_doenca = doenca.total_sintomas
     print(f"   {i}. {doenca.nome} ({sintomas_da_doenca} sintomas associados)")
 
 # ============================================================================
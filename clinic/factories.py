@@ -289,7 +289,7 @@ class SintomaFactory(DjangoModelFactory):
 
     # Gera nome único para cada sintoma
     nome = factory.Sequence(  # type: ignore
-        lambda n: f"Sintoma Auto {fake_pt_br.unique.word().capitalize()}{n}"
+        lambda n: f"Sintoma Auto {fake_pt_br.word().capitalize()}{n}"
     )
     descricao = factory.Faker("sentence", nb_words=random.randint(3, 10))  # type: ignore
 
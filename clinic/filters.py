@@ -0,0 +1,127 @@
+"""
+Filtros adicionais da API.
+"""
+
+from datetime import timedelta
+
+import django_filters
+from django.db.models import Case, F, IntegerField, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .constants import ERROR_IDS_INVALIDOS, ERROR_IDS_LIMITE, MAX_IDS_FILTRO
+from .models import Paciente
+
+
+def ids_da_requisicao(request):
+    """
+    Lê o parâmetro '?ids=1,5,9' da requisição.
+
+    Returns:
+        Lista de IDs sem repetições, na ordem pedida, ou None se o
+        parâmetro não foi informado
+
+    Raises:
+        ValidationError: Se houver valores não numéricos ou IDs demais
+    """
+    valor = request.query_params.get("ids")
+    if valor is None:
+        return None
+    try:
+        ids = [int(parte) for parte in valor.split(",") if parte.strip()]
+    except ValueError:
+        raise ValidationError({"ids": [ERROR_IDS_INVALIDOS]})
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_IDS_FILTRO:
+        raise ValidationError(
+            {"ids": [ERROR_IDS_LIMITE.format(limite=MAX_IDS_FILTRO)]}
+        )
+    return ids
+
+
+class IdsFilterBackend(BaseFilterBackend):
+    """
+    Filtra a listagem por '?ids=1,5,9' com uma única consulta id__in.
+
+    O queryset do ViewSet (com seus select_related/prefetch_related) é
+    mantido e os resultados voltam na ordem em que os IDs foram pedidos,
+    a menos que o cliente informe '?ordering='. Deve ser o último backend
+    da lista, para que a ordenação não seja sobrescrita pelo OrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ids = ids_da_requisicao(request)
+        if ids is None:
+            return queryset
+        queryset = queryset.filter(pk__in=ids)
+        if "ordering" in request.query_params or not ids:
+            return queryset
+        return queryset.order_by(
+            Case(
+                *[When(pk=pk, then=posicao) for posicao, pk in enumerate(ids)],
+                output_field=IntegerField(),
+            )
+        )
+
+
+class OrderingFilterComApelidos(OrderingFilter):
+    """
+    OrderingFilter que aceita apelidos definidos em view.ordering_apelidos.
+
+    Ex: {"idade": "-data_nascimento"} faz '?ordering=idade' ordenar pela
+    data de nascimento (decrescente), usando o índice da coluna em vez de
+    uma expressão calculada. Nulos ficam sempre no fim. Os apelidos também
+    precisam constar em ordering_fields.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        apelidos = getattr(view, "ordering_apelidos", {})
+        if not ordering or not apelidos:
+            return ordering
+        return [self._traduzir(campo, apelidos) for campo in ordering]
+
+    def _traduzir(self, campo, apelidos):
+        nome = campo.lstrip("-")
+        if nome not in apelidos:
+            return campo
+        destino = apelidos[nome]
+        decrescente = campo.startswith("-") != destino.startswith("-")
+        expressao = F(destino.lstrip("-"))
+        if decrescente:
+            return expressao.desc(nulls_last=True)
+        return expressao.asc(nulls_last=True)
+
+
+class PacienteFilter(django_filters.FilterSet):
+    """
+    Filtros da listagem de pacientes.
+
+    idade_min/idade_max (em dias) viram limites na data de nascimento, que
+    tem índice: ?idade_max=180 traz os filhotes com até 6 meses.
+    """
+
+    idade_min = django_filters.NumberFilter(method="filtrar_idade_min", min_value=0)
+    idade_max = django_filters.NumberFilter(method="filtrar_idade_max", min_value=0)
+
+    class Meta:
+        model = Paciente
+        fields = {
+            "tutor": ["exact"],
+            "tutor__nome_completo": ["icontains"],
+            "especie": ["exact"],
+            "raca": ["icontains"],
+            "status": ["exact"],
+            "sexo": ["exact"],
+            "nome": ["icontains"],
+            "total_consultas": ["exact", "gte", "lte"],
+        }
+
+    def filtrar_idade_min(self, queryset, name, value):
+        limite = timezone.localdate() - timedelta(days=int(value))
+        return queryset.filter(data_nascimento__lte=limite)
+
+    def filtrar_idade_max(self, queryset, name, value):
+        limite = timezone.localdate() - timedelta(days=int(value))
+        return queryset.filter(data_nascimento__gte=limite)
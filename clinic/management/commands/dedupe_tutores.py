@@ -0,0 +1,59 @@
+# clinic/management/commands/dedupe_tutores.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from clinic.constants import DEDUPE_LIMIAR_PADRAO
+from clinic.services import DeduplicacaoTutoresService
+
+
+class Command(BaseCommand):
+    help = (
+        "Encontra tutores cadastrados mais de uma vez e funde cada grupo no "
+        "cadastro mais antigo, transferindo os pacientes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limiar",
+            type=float,
+            default=DEDUPE_LIMIAR_PADRAO,
+            help=f"Score mínimo para fundir (padrão: {DEDUPE_LIMIAR_PADRAO}).",
+        )
+        parser.add_argument(
+            "--saida",
+            help="Grava o plano de fusão neste arquivo (JSON Lines).",
+        )
+        parser.add_argument(
+            "--aplicar",
+            action="store_true",
+            help="Aplica o plano. Sem esta opção, apenas exibe o plano.",
+        )
+
+    def handle(self, *args, **options):
+        service = DeduplicacaoTutoresService(limiar=options["limiar"])
+        plano = service.planejar()
+
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                for fusao in plano:
+                    arquivo.write(json.dumps(fusao._asdict()) + "\n")
+        if options["verbosity"] >= 2:
+            for fusao in plano:
+                self.stdout.write(
+                    f"Tutor {fusao.principal} <- {list(fusao.duplicados)} "
+                    f"(score {fusao.score})"
+                )
+        duplicados = sum(len(fusao.duplicados) for fusao in plano)
+        self.stdout.write(f"{len(plano)} grupos, {duplicados} tutores duplicados")
+
+        if not options["aplicar"]:
+            self.stdout.write(self.style.WARNING("Dry-run: nada foi alterado."))
+            return
+        resumo = service.aplicar(plano)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resumo['tutores_removidos']} tutores fundidos, "
+                f"{resumo['pacientes_transferidos']} pacientes transferidos."
+            )
+        )
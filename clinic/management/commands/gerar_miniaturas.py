@@ -0,0 +1,32 @@
+# clinic/management/commands/gerar_miniaturas.py
+import os
+
+from django.core.management.base import BaseCommand
+
+from clinic.services import MiniaturaService
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as miniaturas das fotos de pacientes que ainda não as têm "
+        "(ex: fotos enviadas antes das miniaturas existirem)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos usados para gerar as imagens (padrão: CPUs).",
+        )
+        parser.add_argument(
+            "--todas",
+            action="store_true",
+            help="Regera também as miniaturas já existentes.",
+        )
+
+    def handle(self, *args, **options):
+        total = MiniaturaService().preencher_existentes(
+            processos=options["processos"], todas=options["todas"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Miniaturas geradas: {total} pacientes"))
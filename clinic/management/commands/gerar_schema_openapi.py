@@ -0,0 +1,19 @@
+# clinic/management/commands/gerar_schema_openapi.py
+from django.core.management.base import BaseCommand
+
+from clinic.services import SchemaService
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o schema OpenAPI (YAML e JSON) da versão atual do código e o "
+        "grava em SCHEMA_OPENAPI_DIR, para que /api/schema/ não precise "
+        "gerá-lo no primeiro acesso."
+    )
+
+    def handle(self, *args, **options):
+        service = SchemaService()
+        self.stdout.write(f"Versão do código: {service.versao_codigo()}")
+        for caminho in service.gravar_arquivos():
+            self.stdout.write(f"Schema gravado em {caminho}")
+        self.stdout.write(self.style.SUCCESS("Schema OpenAPI gerado com sucesso!"))
@@ -0,0 +1,83 @@
+# clinic/management/commands/importar_clinica.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.services import ImportacaoService
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa em massa tutores, pacientes e consultas de arquivos CSV/JSONL "
+        "exportados por outra clínica."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tutores", help="Arquivo CSV/JSONL de tutores.")
+        parser.add_argument("--pacientes", help="Arquivo CSV/JSONL de pacientes.")
+        parser.add_argument("--consultas", help="Arquivo CSV/JSONL de consultas.")
+        parser.add_argument(
+            "--rejeitos",
+            default="rejeitos.jsonl",
+            help="Arquivo JSONL onde os registros rejeitados serão gravados.",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=1000,
+            help="Quantidade de registros por lote (padrão: 1000).",
+        )
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos usados na validação (1 desativa o pool).",
+        )
+        parser.add_argument(
+            "--diagnosticos",
+            action="store_true",
+            help="Calcula os diagnósticos suspeitos das consultas importadas.",
+        )
+
+    def handle(self, *args, **options):
+        if not any(options[chave] for chave in ("tutores", "pacientes", "consultas")):
+            raise CommandError(
+                "Informe ao menos um arquivo: --tutores, --pacientes ou --consultas."
+            )
+        if options["lote"] < 1:
+            raise CommandError("--lote deve ser maior que zero.")
+
+        with open(options["rejeitos"], "w", encoding="utf-8") as rejeitos:
+            service = ImportacaoService(
+                rejeitos,
+                tamanho_lote=options["lote"],
+                processos=options["processos"],
+            )
+
+            # A ordem importa: pacientes referenciam tutores e consultas
+            # referenciam pacientes importados no mesmo processo.
+            etapas = [
+                ("tutores", service.importar_tutores),
+                ("pacientes", service.importar_pacientes),
+                ("consultas", service.importar_consultas),
+            ]
+            for nome, importar in etapas:
+                if options[nome]:
+                    self.stdout.write(f"Importando {nome} de {options[nome]}...")
+                    criados = importar(options[nome])
+                    self.stdout.write(self.style.SUCCESS(f"{criados} {nome} criados."))
+
+            if options["diagnosticos"] and service.consultas_importadas:
+                self.stdout.write("Calculando diagnósticos suspeitos...")
+                total = service.calcular_diagnosticos()
+                self.stdout.write(
+                    self.style.SUCCESS(f"{total} diagnósticos suspeitos gravados.")
+                )
+
+        if service.rejeitados:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{service.rejeitados} registros rejeitados "
+                    f"(detalhes em {options['rejeitos']})."
+                )
+            )
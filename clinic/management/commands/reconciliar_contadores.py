@@ -0,0 +1,35 @@
+# clinic/management/commands/reconciliar_contadores.py
+from django.core.management.base import BaseCommand
+
+from clinic.services import ContadorService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara os contadores (total_consultas, total_pacientes, "
+        "total_sintomas) com a contagem real e corrige os divergentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--contador",
+            action="append",
+            choices=list(ContadorService.contadores),
+            help="Verifica apenas este contador (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas informa as divergências, sem corrigir.",
+        )
+
+    def handle(self, *args, **options):
+        resumo = ContadorService().reconciliar(
+            options["contador"], corrigir=not options["dry_run"]
+        )
+        for contador, divergentes in resumo.items():
+            self.stdout.write(f"{contador}: {divergentes} divergentes")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry-run: nada foi alterado."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Contadores reconciliados!"))
@@ -0,0 +1,31 @@
+# clinic/management/commands/reindexar_busca.py
+from django.core.management.base import BaseCommand
+
+from clinic.services import BuscaService
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói o índice da busca global (/busca/) a partir de tutores, "
+        "pacientes e consultas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tipo",
+            action="append",
+            choices=BuscaService.tipos,
+            help="Reindexa apenas este tipo (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=1000,
+            help="Quantidade de registros por lote (padrão: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        resumo = BuscaService().reindexar(options["tipo"], options["lote"])
+        for tipo, total in resumo.items():
+            self.stdout.write(f"{tipo}: {total} registros indexados")
+        self.stdout.write(self.style.SUCCESS("Índice de busca reconstruído!"))
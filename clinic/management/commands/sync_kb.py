@@ -0,0 +1,68 @@
+# clinic/management/commands/sync_kb.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.services import BaseConhecimentoService
+
+
+class Command(BaseCommand):
+    help = (
+        "Sincroniza a base de conhecimento (sintomas, doenças e associações) "
+        "com um arquivo JSON versionado, aplicando apenas as diferenças."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo JSON da base.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas exibe as diferenças, sem gravar nada no banco.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help=(
+                "Remove sintomas e doenças ausentes do arquivo (exceto os "
+                "registrados em consultas, que são mantidos e listados)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["arquivo"], encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Não foi possível ler o arquivo: {e}")
+
+        if not isinstance(dados, dict):
+            raise CommandError("O arquivo deve conter um objeto JSON.")
+
+        service = BaseConhecimentoService()
+        try:
+            resumo = service.sincronizar(
+                dados, dry_run=options["dry_run"], remover=options["prune"]
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for chave, valor in resumo.items():
+            self.stdout.write(f"{chave}: {valor}")
+
+        for tipo, nomes in service.em_uso.items():
+            if nomes:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{tipo} ausentes do arquivo e registrados em consultas "
+                        f"(não removidos): {', '.join(nomes)}"
+                    )
+                )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING("Dry-run: nenhuma alteração foi gravada.")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS("Base de conhecimento sincronizada com sucesso!")
+            )
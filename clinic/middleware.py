@@ -0,0 +1,87 @@
+"""
+Middlewares da API.
+
+CompressaoAPIMiddleware comprime as respostas de /api/ com brotli ou gzip,
+conforme o Accept-Encoding do cliente. Os arquivos estáticos continuam
+sendo servidos pelo WhiteNoise, que já entrega as versões pré-comprimidas.
+
+BREACH: uma resposta comprimida que reflete parâmetros da requisição e
+contém dados do usuário autenticado deixa o tamanho revelar esses dados.
+O gzip do Django mitiga com bytes aleatórios no cabeçalho; o brotli não tem
+onde colocá-los, então essas respostas usam sempre o gzip.
+"""
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    # Mesma dependência do whitenoise[brotli]
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+re_aceita_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressaoAPIMiddleware(GZipMiddleware):
+    """
+    Comprime respostas da API: brotli quando o cliente aceita e o pacote
+    está instalado, senão gzip (comportamento do GZipMiddleware do Django).
+
+    Respostas em streaming (exportações) sempre usam gzip, que o Django já
+    comprime em blocos, assim como as que refletem a query string de um
+    usuário autenticado (busca, autocomplete...), pela mitigação do BREACH.
+    Como o formato da resposta também depende do cabeçalho Accept (JSON ou
+    MessagePack), ele entra no Vary.
+    """
+
+    prefixo = "/api/"
+    tamanho_minimo = 200
+    # Qualidade intermediária: a 11 (padrão) é lenta demais para respostas
+    # geradas a cada requisição
+    qualidade_brotli = 5
+
+    def process_response(self, request, response):
+        if not request.path.startswith(self.prefixo):
+            return response
+        patch_vary_headers(response, ("Accept",))
+
+        aceita_brotli = re_aceita_brotli.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if (
+            brotli is None
+            or not aceita_brotli
+            or response.streaming
+            or self._reflete_entrada_autenticada(request)
+        ):
+            return super().process_response(request, response)
+
+        if len(response.content) < self.tamanho_minimo:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        comprimido = brotli.compress(response.content, quality=self.qualidade_brotli)
+        if len(comprimido) >= len(response.content):
+            return response
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+
+        # ETag forte vira fraca, como no GZipMiddleware
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    @staticmethod
+    def _reflete_entrada_autenticada(request) -> bool:
+        """Query string (entrada refletida) em requisição com credenciais."""
+        if not request.META.get("QUERY_STRING"):
+            return False
+        usuario = getattr(request, "user", None)
+        autenticado = usuario is not None and usuario.is_authenticated
+        return autenticado or "HTTP_AUTHORIZATION" in request.META
@@ -0,0 +1,185 @@
+"""
+Entrega dos arquivos de mídia (MEDIA_URL): fotos, miniaturas e anexos.
+
+Substitui o helper static() do Django, que só funciona com DEBUG e não
+foi feito para produção:
+
+- ETag forte e Last-Modified a partir do stat() do arquivo, com respostas
+  304/412 sem abrir o arquivo
+- Cache-Control de longa duração (MIDIA_CACHE_CONTROL): o storage nunca
+  sobrescreve um arquivo, um conteúdo novo sempre recebe outro nome
+- Requisições Range (um intervalo por requisição; 206/416), usadas por
+  navegadores e players para retomar downloads e buscar trechos
+- Com MIDIA_ENVIO = "x-accel-redirect" (nginx) ou "x-sendfile" (Apache,
+  lighttpd) a transferência fica com o proxy e o worker é liberado na
+  hora; sem proxy, FileResponse usa o wsgi.file_wrapper do servidor
+  (sendfile no gunicorn), inclusive para intervalos
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_http_methods
+
+from .constants import MIDIA_CACHE_CONTROL
+
+_RE_INTERVALO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _Trecho:
+    """
+    Arquivo limitado a 'tamanho' bytes a partir da posição atual.
+
+    Expõe fileno() para que o servidor (gunicorn) envie o intervalo com
+    sendfile, a partir da posição do arquivo e até o Content-Length.
+    """
+
+    def __init__(self, arquivo, tamanho: int):
+        self.arquivo = arquivo
+        self.restante = tamanho
+
+    def read(self, tamanho: int = -1) -> bytes:
+        if tamanho < 0 or tamanho > self.restante:
+            tamanho = self.restante
+        dados = self.arquivo.read(tamanho)
+        self.restante -= len(dados)
+        return dados
+
+    def fileno(self) -> int:
+        return self.arquivo.fileno()
+
+    def close(self) -> None:
+        self.arquivo.close()
+
+
+def ler_intervalo(cabecalho: str, tamanho: int):
+    """
+    Interpreta o cabeçalho Range para um arquivo de 'tamanho' bytes.
+
+    Returns:
+        (início, fim) inclusivo; None se o cabeçalho deve ser ignorado
+        (ausente, inválido ou com vários intervalos: responde o arquivo
+        inteiro); ou False se o intervalo não pode ser atendido (416)
+    """
+    encontrado = _RE_INTERVALO.match(cabecalho.replace(" ", ""))
+    if not encontrado or encontrado.groups() == ("", ""):
+        return None
+    inicio, fim = encontrado.groups()
+    if inicio == "":
+        # Sufixo: os últimos N bytes
+        sufixo = int(fim)
+        if sufixo == 0:
+            return False
+        return max(tamanho - sufixo, 0), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or fim < inicio:
+        return False
+    return inicio, fim
+
+
+def _intervalo_vale(request, etag: str, modificado: float) -> bool:
+    """If-Range: o intervalo só vale se o arquivo não mudou desde então."""
+    condicao = request.META.get("HTTP_IF_RANGE")
+    if not condicao:
+        return True
+    if condicao.startswith('"'):
+        return condicao == etag
+    data = parse_http_date_safe(condicao)
+    return data is not None and int(modificado) <= data
+
+
+@require_http_methods(["GET", "HEAD"])
+def servir_midia(request, caminho):
+    """
+    GET/HEAD MEDIA_URL<caminho>: entrega um arquivo de MEDIA_ROOT.
+
+    Retorna:
+    - 200: Arquivo inteiro
+    - 206: Intervalo pedido em Range (Content-Range)
+    - 304/412: Pré-condições If-None-Match/If-Modified-Since/If-Match
+    - 404: Arquivo inexistente ou fora de MEDIA_ROOT
+    - 416: Intervalo fora do arquivo
+    """
+    try:
+        absoluto = safe_join(settings.MEDIA_ROOT, caminho)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        info = os.stat(absoluto)
+    except OSError:
+        raise Http404
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404
+
+    etag = f'"{info.st_mtime_ns:x}-{info.st_size:x}"'
+    condicional = get_conditional_response(
+        request, etag=etag, last_modified=int(info.st_mtime)
+    )
+    if condicional is not None:
+        condicional["Cache-Control"] = MIDIA_CACHE_CONTROL
+        return condicional
+
+    tipo, codificacao = mimetypes.guess_type(absoluto)
+    tipo = tipo or "application/octet-stream"
+    if codificacao:
+        # Arquivo comprimido (.gz etc.) é entregue como está
+        tipo = "application/octet-stream"
+
+    envio = settings.MIDIA_ENVIO
+    if envio:
+        # O proxy lê o arquivo e trata Range; o worker só devolve cabeçalhos
+        response = HttpResponse(content_type=tipo)
+        if envio == "x-accel-redirect":
+            interno = settings.MIDIA_PREFIXO_INTERNO.rstrip("/")
+            response["X-Accel-Redirect"] = f"{interno}/{quote(caminho)}"
+        else:
+            response["X-Sendfile"] = absoluto
+    else:
+        response = _responder_arquivo(request, absoluto, info, etag)
+        if response.status_code == 416:
+            return response
+        response["Content-Type"] = tipo
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(info.st_mtime)
+    response["Cache-Control"] = MIDIA_CACHE_CONTROL
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _responder_arquivo(request, absoluto, info, etag):
+    """Resposta com o arquivo inteiro ou o intervalo pedido em Range."""
+    tamanho = info.st_size
+    intervalo = None
+    if "HTTP_RANGE" in request.META and _intervalo_vale(request, etag, info.st_mtime):
+        intervalo = ler_intervalo(request.META["HTTP_RANGE"], tamanho)
+    if intervalo is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{tamanho}"
+        return response
+
+    if request.method == "HEAD":
+        response = HttpResponse()
+        response["Content-Length"] = tamanho
+        return response
+
+    arquivo = open(absoluto, "rb")
+    if intervalo is None:
+        return FileResponse(arquivo)
+
+    inicio, fim = intervalo
+    arquivo.seek(inicio)
+    response = FileResponse(_Trecho(arquivo, fim - inicio + 1), status=206)
+    response["Content-Length"] = fim - inicio + 1
+    response["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+    return response
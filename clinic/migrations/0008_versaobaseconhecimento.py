@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0007_alter_paciente_microchip_alter_paciente_nome_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoBaseConhecimento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('versao', models.PositiveIntegerField(default=0, verbose_name='Versão')),
+                ('origem', models.CharField(blank=True, help_text='Identificador da versão do arquivo da base de conhecimento', max_length=100, null=True, verbose_name='Origem')),
+                ('data_atualizacao', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Atualização')),
+            ],
+            options={
+                'verbose_name': 'Versão da Base de Conhecimento',
+                'verbose_name_plural': 'Versões da Base de Conhecimento',
+            },
+        ),
+    ]
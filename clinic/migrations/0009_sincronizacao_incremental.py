@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0008_versaobaseconhecimento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroExclusao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tabela', models.CharField(max_length=50, verbose_name='Tabela')),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID do Registro')),
+                ('data_exclusao', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Exclusão')),
+            ],
+            options={
+                'verbose_name': 'Registro de Exclusão',
+                'verbose_name_plural': 'Registros de Exclusão',
+            },
+        ),
+        migrations.AddField(
+            model_name='paciente',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Data de Atualização'),
+        ),
+        migrations.AddField(
+            model_name='tutor',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Data de Atualização'),
+        ),
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['data_ultima_modificacao', 'id'], name='consulta_atualizacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paciente',
+            index=models.Index(fields=['data_atualizacao', 'id'], name='paciente_atualizacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutor',
+            index=models.Index(fields=['data_atualizacao', 'id'], name='tutor_atualizacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroexclusao',
+            index=models.Index(fields=['tabela', 'data_exclusao', 'id'], name='exclusao_tabela_data_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0009_sincronizacao_incremental'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('tutor', 'Tutor'), ('paciente', 'Paciente'), ('consulta', 'Consulta')], max_length=20)),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID do Registro')),
+                ('rotulo', models.CharField(max_length=255, verbose_name='Rótulo')),
+                ('detalhe', models.CharField(blank=True, max_length=255, verbose_name='Detalhe')),
+            ],
+            options={
+                'verbose_name': 'Item de Busca',
+                'verbose_name_plural': 'Itens de Busca',
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='item_busca_tipo_objeto_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TokenBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='clinic.itembusca')),
+            ],
+            options={
+                'verbose_name': 'Token de Busca',
+                'verbose_name_plural': 'Tokens de Busca',
+                'indexes': [models.Index(fields=['token', 'item'], name='token_busca_token_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0010_indice_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sintoma',
+            name='sinonimos',
+            field=models.TextField(blank=True, default='', help_text="Um sinônimo por linha, usados no autocompletar (ex: 'Êmese' para 'Vômito').", verbose_name='Sinônimos'),
+        ),
+    ]
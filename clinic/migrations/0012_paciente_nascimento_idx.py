@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0011_sintoma_sinonimos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paciente',
+            index=models.Index(fields=['data_nascimento'], name='paciente_nascimento_idx'),
+        ),
+    ]
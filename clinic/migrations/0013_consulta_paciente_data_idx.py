@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-19 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0012_paciente_nascimento_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consulta',
+            index=models.Index(fields=['paciente', 'data_hora_agendamento'], name='consulta_paciente_data_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 06:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (modelo, contador, modelo contado, FK do contado)
+CONTADORES = [
+    ("paciente", "total_consultas", "consulta", "paciente_id"),
+    ("veterinario", "total_consultas", "consulta", "veterinario_responsavel_id"),
+    ("tutor", "total_pacientes", "paciente", "tutor_id"),
+    ("doenca", "total_sintomas", "doenca_sintomas_associados", "doenca_id"),
+]
+
+
+def preencher_contadores(apps, schema_editor):
+    """Calcula os contadores dos registros já existentes."""
+    for modelo, campo, contado, fk in CONTADORES:
+        Modelo = apps.get_model("clinic", modelo)
+        if contado == "doenca_sintomas_associados":
+            Contado = Modelo.sintomas_associados.through
+        else:
+            Contado = apps.get_model("clinic", contado)
+        contagem = (
+            Contado.objects.filter(**{fk: OuterRef("pk")})
+            .order_by()
+            .values(fk)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        Modelo.objects.update(**{campo: Coalesce(Subquery(contagem), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0013_consulta_paciente_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doenca',
+            name='total_sintomas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Sintomas'),
+        ),
+        migrations.AddField(
+            model_name='paciente',
+            name='total_consultas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Consultas'),
+        ),
+        migrations.AddField(
+            model_name='tutor',
+            name='total_pacientes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Pacientes'),
+        ),
+        migrations.AddField(
+            model_name='veterinario',
+            name='total_consultas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de Consultas'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
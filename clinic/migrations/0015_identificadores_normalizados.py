@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 06:11
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0014_contadores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paciente',
+            name='microchip_normalizado',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Upper(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('microchip'), models.Value(' '), models.Value('')), models.Value('-'), models.Value('')), models.Value('.'), models.Value(''))), output_field=models.CharField(max_length=50), verbose_name='Microchip (normalizado)'),
+        ),
+        migrations.AddField(
+            model_name='tutor',
+            name='cpf_digitos',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('cpf'), models.Value('.'), models.Value('')), models.Value('-'), models.Value('')), output_field=models.CharField(max_length=14), verbose_name='CPF (dígitos)'),
+        ),
+        migrations.AddField(
+            model_name='veterinario',
+            name='crmv_normalizado',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Upper(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('crmv'), models.Value(' '), models.Value('')), models.Value('-'), models.Value('')), models.Value('.'), models.Value('')), models.Value('/'), models.Value(''))), output_field=models.CharField(max_length=20), verbose_name='CRMV (normalizado)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0015_identificadores_normalizados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paciente',
+            name='miniaturas',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Miniaturas da Foto'),
+        ),
+    ]
@@ -0,0 +1,148 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+LOTE = 1000
+TAMANHO_MAXIMO_TOKEN = 64
+PESO_IDENTIFICADOR = 3
+PESO_NOME = 2
+PESO_RELACIONADO = 1
+
+_RE_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+# Cópia da tokenização do BuscaService no momento desta migração: a
+# migração usa só os modelos históricos e não muda junto com o serviço
+
+
+def tokenizar(texto):
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    normalizado = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return [
+        token[:TAMANHO_MAXIMO_TOKEN]
+        for token in _RE_NAO_ALFANUMERICO.split(normalizado.lower())
+        if token
+    ]
+
+
+def compactar(texto):
+    return "".join(tokenizar(texto))[:TAMANHO_MAXIMO_TOKEN]
+
+
+def pesar(*grupos):
+    """Tokens únicos de (tokens, peso), cada um com o maior peso."""
+    pesos = {}
+    for tokens, peso in grupos:
+        for token in tokens:
+            if token:
+                pesos[token] = max(peso, pesos.get(token, 0))
+    return list(pesos.items())
+
+
+def documentos_tutores(apps):
+    Tutor = apps.get_model("clinic", "Tutor")
+    for pk, nome, cpf in Tutor.objects.order_by("pk").values_list(
+        "pk", "nome_completo", "cpf"
+    ):
+        tokens = pesar(
+            (tokenizar(nome), PESO_NOME), ([compactar(cpf)], PESO_IDENTIFICADOR)
+        )
+        yield pk, nome, cpf or "", tokens
+
+
+def documentos_pacientes(apps):
+    Paciente = apps.get_model("clinic", "Paciente")
+    especies = dict(Paciente._meta.get_field("especie").flatchoices)
+    registros = Paciente.objects.order_by("pk").values_list(
+        "pk", "nome", "microchip", "especie", "tutor__nome_completo"
+    )
+    for pk, nome, microchip, especie, tutor in registros:
+        tokens = pesar(
+            (tokenizar(nome), PESO_NOME),
+            ([compactar(microchip)], PESO_IDENTIFICADOR),
+            (tokenizar(tutor), PESO_RELACIONADO),
+        )
+        detalhe = f"{especies.get(especie, especie)} - Tutor: {tutor}"
+        yield pk, nome, detalhe, tokens
+
+
+def documentos_consultas(apps):
+    Consulta = apps.get_model("clinic", "Consulta")
+    tipos = dict(Consulta._meta.get_field("tipo_consulta").flatchoices)
+    registros = Consulta.objects.order_by("pk").values_list(
+        "pk",
+        "data_hora_agendamento",
+        "tipo_consulta",
+        "paciente__nome",
+        "paciente__tutor__nome_completo",
+    )
+    for pk, data_hora, tipo, paciente, tutor in registros:
+        tokens = pesar((tokenizar(f"{paciente} {tutor}"), PESO_RELACIONADO))
+        rotulo = f"Consulta de {paciente} em {data_hora.strftime('%d/%m/%Y %H:%M')}"
+        detalhe = f"{tipos.get(tipo, tipo)} - Tutor: {tutor}"
+        yield pk, rotulo, detalhe, tokens
+
+
+DOCUMENTOS = {
+    "tutor": ("Tutor", documentos_tutores),
+    "paciente": ("Paciente", documentos_pacientes),
+    "consulta": ("Consulta", documentos_consultas),
+}
+
+
+def preencher_indice_busca(apps, schema_editor):
+    """
+    Indexa os registros que já existiam quando o índice foi criado (0010),
+    para a busca global não começar vazia em bancos com dados.
+
+    Gera os mesmos rótulos, detalhes e tokens da indexação feita pelos
+    sinais; tipos já indexados (ex: por um reindexar_busca manual) são
+    mantidos.
+    """
+    ItemBusca = apps.get_model("clinic", "ItemBusca")
+    TokenBusca = apps.get_model("clinic", "TokenBusca")
+
+    for tipo, (modelo, documentos) in DOCUMENTOS.items():
+        if (
+            not apps.get_model("clinic", modelo).objects.exists()
+            or ItemBusca.objects.filter(tipo=tipo).exists()
+        ):
+            continue
+        lote = []
+        for documento in documentos(apps):
+            lote.append(documento)
+            if len(lote) >= LOTE:
+                gravar_lote(ItemBusca, TokenBusca, tipo, lote)
+                lote = []
+        if lote:
+            gravar_lote(ItemBusca, TokenBusca, tipo, lote)
+
+
+def gravar_lote(ItemBusca, TokenBusca, tipo, documentos):
+    itens = ItemBusca.objects.bulk_create(
+        [
+            ItemBusca(
+                tipo=tipo, objeto_id=pk, rotulo=rotulo[:255], detalhe=detalhe[:255]
+            )
+            for pk, rotulo, detalhe, _ in documentos
+        ]
+    )
+    TokenBusca.objects.bulk_create(
+        [
+            TokenBusca(item=item, token=token, peso=peso)
+            for item, (_, _, _, tokens) in zip(itens, documentos)
+            for token, peso in tokens
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0016_paciente_miniaturas'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_indice_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,665 @@
+"""
+Mixins reutilizáveis para os ViewSets da aplicação clinic.
+"""
+
+import base64
+import binascii
+import csv
+import hashlib
+import json
+from datetime import timedelta
+from collections import defaultdict
+from itertools import islice
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .cache import incrementar_versao_tabela, versoes_tabelas
+from .constants import (
+    CACHE_RESPOSTA_TIMEOUT,
+    ERROR_LOTE_FORMATO,
+    ERROR_LOTE_ID_OBRIGATORIO,
+    ERROR_LOTE_ID_REPETIDO,
+    ERROR_LOTE_LIMITE,
+    ERROR_LOTE_NAO_ENCONTRADO,
+    ERROR_LOTE_VALOR_REPETIDO,
+    ERROR_LOTE_VAZIO,
+    ERROR_SYNC_CURSOR_INVALIDO,
+    ERROR_SYNC_DATA_INVALIDA,
+    EXPORT_CHUNK_SIZE,
+    MAX_ITENS_LOTE,
+    SYNC_MARGEM_SEGUNDOS,
+    SYNC_MAX_PAGE_SIZE,
+    SYNC_PAGE_SIZE,
+)
+from .models import RegistroExclusao
+from .renderers import CSVRenderer, NDJSONRenderer
+from .services import BaseConhecimentoService, BuscaService, ContadorService
+
+
+def _timestamp_http(valor):
+    """Converte uma data HTTP (Last-Modified) em timestamp, se houver."""
+    return parse_http_date_safe(valor) if valor else None
+
+
+def _erro_lote(indice, campo, mensagem):
+    return {"indice": indice, "erros": {campo: [mensagem]}}
+
+
+class _Eco:
+    """Pseudo-arquivo cujo write() devolve a linha escrita (usado com csv.writer)."""
+
+    def write(self, valor):
+        return valor
+
+
+class ExportacaoStreamingMixin:
+    """
+    Adiciona o endpoint GET /<recurso>/export/?format=ndjson|csv.
+
+    A exportação percorre o queryset já filtrado (filterset, busca e
+    ordenação) com um cursor do lado do servidor via .iterator(), lendo
+    apenas dicionários de values(). Os IDs de relacionamentos muitos-para-muitos
+    (ou reversos) são agregados com uma consulta extra por bloco, de modo
+    que a memória usada não depende do total de linhas exportadas.
+
+    Atributos de configuração:
+        export_campos: Campos lidos com values(). Padrão: todas as colunas
+            concretas do modelo (chaves estrangeiras como '<campo>_id').
+        export_relacionados: {nome_da_coluna: (manager, campo_fk, campo_valor)}
+            Ex: {"pacientes_ids": (Paciente.objects, "tutor_id", "id")}
+    """
+
+    export_campos = None
+    export_relacionados = {}
+
+    def get_export_campos(self):
+        if self.export_campos is not None:
+            return list(self.export_campos)
+        modelo = self.get_queryset().model
+        return [
+            campo.attname
+            for campo in modelo._meta.concrete_fields
+            if not campo.generated
+        ]
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+        pagination_class=None,
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Exporta todos os registros filtrados em NDJSON (padrão) ou CSV.
+
+        Aceita os mesmos filtros, busca e ordenação da listagem.
+        """
+        formato = request.accepted_renderer.format
+        campos = self.get_export_campos()
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*campos)
+        )
+
+        if formato == "csv":
+            linhas = self._linhas_csv(queryset, campos)
+        else:
+            linhas = self._linhas_ndjson(queryset)
+
+        response = StreamingHttpResponse(
+            linhas, content_type=request.accepted_renderer.media_type
+        )
+        nome = f"{self.basename}.{formato}"
+        response["Content-Disposition"] = f'attachment; filename="{nome}"'
+        return response
+
+    def _registros(self, queryset):
+        """Percorre o queryset em blocos, anexando os IDs relacionados."""
+        iterador = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        while True:
+            bloco = list(islice(iterador, EXPORT_CHUNK_SIZE))
+            if not bloco:
+                return
+            ids = [registro["id"] for registro in bloco]
+            for nome, (manager, campo_fk, campo_valor) in self.export_relacionados.items():
+                relacionados = defaultdict(list)
+                for origem_id, valor in manager.filter(
+                    **{f"{campo_fk}__in": ids}
+                ).values_list(campo_fk, campo_valor):
+                    relacionados[origem_id].append(valor)
+                for registro in bloco:
+                    registro[nome] = relacionados.get(registro["id"], [])
+            yield from bloco
+
+    def _linhas_ndjson(self, queryset):
+        for registro in self._registros(queryset):
+            yield json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+    def _linhas_csv(self, queryset, campos):
+        escritor = csv.writer(_Eco())
+        relacionados = list(self.export_relacionados)
+        yield escritor.writerow(campos + relacionados)
+        for registro in self._registros(queryset):
+            linha = [registro[campo] for campo in campos]
+            linha += ["|".join(map(str, registro[nome])) for nome in relacionados]
+            yield escritor.writerow(linha)
+
+
+class OperacoesEmLoteMixin:
+    """
+    Permite criar e atualizar vários registros em uma única requisição.
+
+    - POST /<recurso>/ com uma lista de objetos cria todos em lote
+    - PATCH /<recurso>/ com uma lista de objetos (cada um com 'id')
+      atualiza parcialmente todos em lote (requer OperacoesEmLoteRouter)
+
+    Todos os itens são validados pelo serializer do ViewSet; os erros são
+    reportados por item (com o índice na lista) e os itens válidos são
+    gravados com bulk_create/bulk_update em uma única transação.
+
+    Status da resposta:
+    - 201/200: todos os itens foram gravados
+    - 207: parte dos itens foi gravada, parte tem erros
+    - 400: nenhum item foi gravado
+
+    Observação: bulk_create/bulk_update não chamam save() nem disparam
+    sinais (a versão da tabela no cache é incrementada em apos_gravar_lote),
+    e o mixin não grava relacionamentos muitos-para-muitos.
+    """
+
+    max_itens_lote = MAX_ITENS_LOTE
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.create_em_lote(request)
+        return super().create(request, *args, **kwargs)
+
+    def create_em_lote(self, request):
+        """Valida e cria todos os itens válidos da lista enviada."""
+        itens = self._validar_lote(request.data)
+        serializer = self.get_serializer()
+        modelo = serializer.Meta.model
+
+        validos, erros = [], []
+        for indice, item in enumerate(itens):
+            try:
+                validos.append((indice, serializer.run_validation(item)))
+            except ValidationError as e:
+                erros.append({"indice": indice, "erros": e.detail})
+        validos = self._remover_valores_repetidos(modelo, validos, erros)
+
+        objetos = [modelo(**dados) for _, dados in validos]
+        with transaction.atomic():
+            modelo.objects.bulk_create(objetos)
+            self.apos_gravar_lote(objetos)
+
+        return self._resposta_lote(
+            "criados", objetos, erros, status.HTTP_201_CREATED
+        )
+
+    def partial_update_em_lote(self, request, *args, **kwargs):
+        """Valida e atualiza parcialmente todos os itens válidos da lista."""
+        itens = self._validar_lote(request.data)
+        modelo = self.get_queryset().model
+
+        ids = [item.get("id") for item in itens if isinstance(item, dict)]
+        instancias = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+
+        validos, erros, campos, vistos = [], [], set(), set()
+        for indice, item in enumerate(itens):
+            pk = item.get("id") if isinstance(item, dict) else None
+            if pk is None:
+                erros.append(_erro_lote(indice, "id", ERROR_LOTE_ID_OBRIGATORIO))
+                continue
+            if not isinstance(pk, int):
+                erros.append(_erro_lote(indice, "id", ERROR_LOTE_NAO_ENCONTRADO))
+                continue
+            if pk in vistos:
+                erros.append(_erro_lote(indice, "id", ERROR_LOTE_ID_REPETIDO))
+                continue
+            vistos.add(pk)
+            instancia = instancias.get(pk)
+            if instancia is None:
+                erros.append(_erro_lote(indice, "id", ERROR_LOTE_NAO_ENCONTRADO))
+                continue
+            self.check_object_permissions(request, instancia)
+
+            serializer = self.get_serializer(instancia, data=item, partial=True)
+            if not serializer.is_valid():
+                erros.append({"indice": indice, "erros": serializer.errors})
+                continue
+            validos.append((indice, serializer.validated_data))
+
+        validos = self._remover_valores_repetidos(modelo, validos, erros)
+        # bulk_update não preenche campos auto_now (ex: data_atualizacao)
+        campos_auto_now = [
+            campo.name
+            for campo in modelo._meta.concrete_fields
+            if getattr(campo, "auto_now", False)
+        ]
+        agora = timezone.now()
+        objetos = []
+        for indice, dados in validos:
+            instancia = instancias[itens[indice]["id"]]
+            for campo, valor in dados.items():
+                setattr(instancia, campo, valor)
+                campos.add(campo)
+            for campo in campos_auto_now:
+                setattr(instancia, campo, agora)
+            objetos.append(instancia)
+
+        with transaction.atomic():
+            if objetos and campos:
+                campos.update(campos_auto_now)
+                modelo.objects.bulk_update(objetos, list(campos))
+            self.apos_gravar_lote(objetos)
+
+        return self._resposta_lote("atualizados", objetos, erros, status.HTTP_200_OK)
+
+    def apos_gravar_lote(self, objetos):
+        """
+        Gancho chamado após bulk_create/bulk_update.
+
+        Como as operações em lote não disparam sinais, invalida aqui o cache
+        de respostas da tabela, atualiza o índice da busca global e reconta
+        os contadores que dependem dos registros (ex: total_pacientes).
+        Subclasses podem estendê-lo para manter outros dados derivados
+        atualizados.
+        """
+        if objetos:
+            tabela = objetos[0]._meta.model_name
+            incrementar_versao_tabela(tabela)
+            if tabela in BuscaService.tipos:
+                BuscaService().indexar(tabela, [objeto.pk for objeto in objetos])
+            ContadorService().recontar_afetados(objetos)
+
+    def _validar_lote(self, itens):
+        if not isinstance(itens, list):
+            raise ValidationError({"detail": ERROR_LOTE_FORMATO})
+        if not itens:
+            raise ValidationError({"detail": ERROR_LOTE_VAZIO})
+        if len(itens) > self.max_itens_lote:
+            raise ValidationError(
+                {"detail": ERROR_LOTE_LIMITE.format(limite=self.max_itens_lote)}
+            )
+        return itens
+
+    def _remover_valores_repetidos(self, modelo, validos, erros):
+        """
+        Rejeita itens que repetem, dentro do próprio lote, o valor de um
+        campo único (os validadores do serializer só comparam com o banco).
+        """
+        campos_unicos = [
+            campo.name
+            for campo in modelo._meta.concrete_fields
+            if campo.unique and not campo.primary_key
+        ]
+        vistos = {campo: set() for campo in campos_unicos}
+        resultado = []
+        for indice, dados in validos:
+            repetidos = [
+                campo
+                for campo in campos_unicos
+                if dados.get(campo) is not None and dados[campo] in vistos[campo]
+            ]
+            if repetidos:
+                erros.append(
+                    {
+                        "indice": indice,
+                        "erros": {c: [ERROR_LOTE_VALOR_REPETIDO] for c in repetidos},
+                    }
+                )
+                continue
+            for campo in campos_unicos:
+                if dados.get(campo) is not None:
+                    vistos[campo].add(dados[campo])
+            resultado.append((indice, dados))
+        return resultado
+
+    def _resposta_lote(self, chave, objetos, erros, status_sucesso):
+        if objetos:
+            # Recarrega pelo queryset do ViewSet para aproveitar seus
+            # select_related/prefetch_related na serialização da resposta.
+            ordem = {objeto.pk: posicao for posicao, objeto in enumerate(objetos)}
+            objetos = sorted(
+                self.get_queryset().filter(pk__in=ordem), key=lambda o: ordem[o.pk]
+            )
+        erros.sort(key=lambda erro: erro["indice"])
+
+        if not objetos:
+            status_resposta = status.HTTP_400_BAD_REQUEST
+        elif erros:
+            status_resposta = status.HTTP_207_MULTI_STATUS
+        else:
+            status_resposta = status_sucesso
+
+        return Response(
+            {chave: self.get_serializer(objetos, many=True).data, "erros": erros},
+            status=status_resposta,
+        )
+
+
+class RespostaCondicionalMixin:
+    """
+    Adiciona ETag (e Last-Modified, quando há data) às respostas de
+    list/retrieve e responde 304 (Not Modified) a GETs condicionais
+    (If-None-Match/If-Modified-Since).
+
+    A verificação acontece antes de qualquer consulta ao queryset ou
+    serialização: o ETag vem apenas de get_versao_recurso(), que por
+    padrão combina as versões das tabelas em tabelas_versao (ver
+    clinic.cache). O formato da resposta entra no ETag, pois JSON e a API
+    navegável são representações diferentes da mesma URL.
+
+    Atributos de configuração:
+        tabelas_versao: Tabelas lógicas das quais a resposta depende
+            (obrigatório nas subclasses).
+    """
+
+    tabelas_versao = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.tabelas_versao:
+            raise ImproperlyConfigured(
+                f"{cls.__name__} deve definir tabelas_versao "
+                "(tabelas das quais a resposta depende)."
+            )
+
+    def get_versao_recurso(self):
+        """
+        Returns:
+            Tupla (identificador_da_versao, data_atualizacao ou None)
+        """
+        versoes = versoes_tabelas(self.tabelas_versao)
+        return "-".join(str(versoes[tabela]) for tabela in self.tabelas_versao), None
+
+    def list(self, request, *args, **kwargs):
+        return self._resposta_condicional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._resposta_condicional(super().retrieve, request, *args, **kwargs)
+
+    def _resposta_condicional(self, view, request, *args, **kwargs):
+        versao, data_atualizacao = self.get_versao_recurso()
+        etag = f'"{versao}-{request.accepted_renderer.format}"'
+        ultima_modificacao = (
+            int(data_atualizacao.timestamp()) if data_atualizacao else None
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=ultima_modificacao
+        )
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response["ETag"] = etag
+        if ultima_modificacao is not None:
+            response["Last-Modified"] = http_date(ultima_modificacao)
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class BaseConhecimentoCondicionalMixin(RespostaCondicionalMixin):
+    """
+    GET condicional para os endpoints da base de conhecimento.
+
+    Em vez do contador em cache, usa VersaoBaseConhecimento, incrementada
+    pelo sync_kb e pelos sinais de Sintoma/Doenca (que também incrementam
+    a tabela 'base_conhecimento'): a versão sobrevive à limpeza do cache,
+    é a mesma em todos os processos e traz a data para o Last-Modified,
+    ao custo de uma consulta a uma tabela de uma linha.
+    """
+
+    tabelas_versao = ("base_conhecimento",)
+
+    def get_versao_recurso(self):
+        versao = BaseConhecimentoService().versao_atual()
+        return f"kb-{versao.versao}", versao.data_atualizacao
+
+
+class CacheRespostaMixin:
+    """
+    Guarda no cache do Django as respostas já renderizadas da listagem.
+
+    A chave combina o ViewSet, o host, o formato, os parâmetros da query
+    string normalizados e as versões das tabelas em cache_tabelas (ver
+    clinic.cache). Em um acerto, a resposta é montada direto do cache,
+    sem consultar o banco nem rodar serializers; ETag e Last-Modified
+    guardados junto permitem responder 304 também nesse caminho.
+
+    Só use em listagens cujo conteúdo não depende do usuário autenticado.
+    A API navegável (HTML) não é guardada.
+
+    Atributos de configuração:
+        cache_tabelas: Tabelas lógicas das quais a listagem depende.
+        cache_formatos: Formatos de resposta que podem ser guardados.
+        cache_timeout: Tempo máximo (segundos) de cada entrada.
+    """
+
+    cache_tabelas = ()
+    cache_formatos = ("json",)
+    cache_timeout = CACHE_RESPOSTA_TIMEOUT
+    cabecalhos_em_cache = ("ETag", "Last-Modified", "Cache-Control")
+
+    def list(self, request, *args, **kwargs):
+        chave = self._chave_cache_resposta(request)
+        if chave is None:
+            return super().list(request, *args, **kwargs)
+
+        armazenado = cache.get(chave)
+        if armazenado is not None:
+            return self._resposta_do_cache(request, armazenado)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            # A resposta só é renderizada em finalize_response().
+            response.chave_cache_resposta = chave
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        chave = getattr(response, "chave_cache_resposta", None)
+        if chave is not None:
+            response.render()
+            cabecalhos = {
+                nome: response[nome]
+                for nome in self.cabecalhos_em_cache
+                if nome in response
+            }
+            cache.set(
+                chave,
+                {
+                    "conteudo": response.content,
+                    "content_type": response["Content-Type"],
+                    "cabecalhos": cabecalhos,
+                },
+                self.cache_timeout,
+            )
+        return response
+
+    def _chave_cache_resposta(self, request):
+        formato = request.accepted_renderer.format
+        if formato not in self.cache_formatos:
+            return None
+
+        parametros = sorted(
+            (nome, valores)
+            for nome, valores in request.query_params.lists()
+            if nome != "format" and any(valores)
+        )
+        versoes = versoes_tabelas(self.cache_tabelas)
+        # A data entra na chave porque há campos calculados a partir dela
+        # (ex: idade do paciente).
+        assinatura = json.dumps(
+            [
+                request.get_host(),
+                str(timezone.localdate()),
+                parametros,
+                sorted(versoes.items()),
+            ]
+        )
+        resumo = hashlib.md5(assinatura.encode("utf-8")).hexdigest()
+        return f"clinic:resposta:{self.basename}:{formato}:{resumo}"
+
+    def _resposta_do_cache(self, request, armazenado):
+        cabecalhos = armazenado["cabecalhos"]
+        response = get_conditional_response(
+            request,
+            etag=cabecalhos.get("ETag"),
+            last_modified=_timestamp_http(cabecalhos.get("Last-Modified")),
+        )
+        if response is None:
+            response = HttpResponse(
+                armazenado["conteudo"], content_type=armazenado["content_type"]
+            )
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        return response
+
+
+class SincronizacaoIncrementalMixin:
+    """
+    Adiciona o endpoint GET /<recurso>/sync/ para sincronização incremental.
+
+    Primeira chamada: ?modified_since=<ISO 8601> (ou sem parâmetros, para
+    baixar tudo). As seguintes: ?cursor=<valor devolvido na anterior>.
+
+    Resposta:
+        {
+            "alterados": [...],   # registros criados/alterados, serializados
+            "excluidos": [ids],   # IDs removidos (RegistroExclusao)
+            "cursor": "...",      # guardar para a próxima chamada
+            "tem_mais": true      # se verdadeiro, chamar de novo já
+        }
+
+    Alterados e excluídos são paginados por keyset sobre (data, id), com
+    índices compostos, então o custo de cada chamada depende do tamanho
+    da página e não do total de registros. Só são devolvidas alterações
+    com mais de SYNC_MARGEM_SEGUNDOS, para não pular registros de
+    transações que ainda não tinham sido confirmadas.
+
+    Atributos de configuração:
+        sync_campo_atualizacao: Campo auto_now usado como marca de alteração.
+    """
+
+    sync_campo_atualizacao = "data_atualizacao"
+
+    @action(detail=False, methods=["get"], url_path="sync", pagination_class=None)
+    def sync(self, request, *args, **kwargs):
+        """Retorna os registros alterados e excluídos desde o cursor."""
+        posicao_alterados, posicao_excluidos = self._posicoes_sync(request)
+        tamanho = self._tamanho_pagina_sync(request)
+        limite = timezone.now() - timedelta(seconds=SYNC_MARGEM_SEGUNDOS)
+        campo = self.sync_campo_atualizacao
+
+        alterados, mais_alterados = self._pagina_keyset(
+            self.get_queryset(), campo, posicao_alterados, limite, tamanho
+        )
+        excluidos, mais_excluidos = self._pagina_keyset(
+            RegistroExclusao.objects.filter(
+                tabela=self.get_queryset().model._meta.model_name
+            ).only("id", "objeto_id", "data_exclusao"),
+            "data_exclusao",
+            posicao_excluidos,
+            limite,
+            tamanho,
+        )
+
+        if alterados:
+            ultimo = alterados[-1]
+            posicao_alterados = (getattr(ultimo, campo), ultimo.pk)
+        if excluidos:
+            ultimo = excluidos[-1]
+            posicao_excluidos = (ultimo.data_exclusao, ultimo.pk)
+
+        return Response(
+            {
+                "alterados": self.get_serializer(alterados, many=True).data,
+                "excluidos": [registro.objeto_id for registro in excluidos],
+                "cursor": _codificar_cursor(posicao_alterados, posicao_excluidos),
+                "tem_mais": mais_alterados or mais_excluidos,
+            }
+        )
+
+    def _posicoes_sync(self, request):
+        """Lê o cursor ou modified_since e retorna as posições iniciais."""
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            return _decodificar_cursor(cursor)
+
+        valor = request.query_params.get("modified_since")
+        if not valor:
+            return None, None
+        data = parse_datetime(valor)
+        if data is None:
+            raise ValidationError({"modified_since": [ERROR_SYNC_DATA_INVALIDA]})
+        if timezone.is_naive(data):
+            data = timezone.make_aware(data)
+        # id 0: inclui os registros com data exatamente igual a modified_since
+        return (data, 0), (data, 0)
+
+    def _tamanho_pagina_sync(self, request):
+        try:
+            tamanho = int(request.query_params.get("limit", SYNC_PAGE_SIZE))
+        except ValueError:
+            tamanho = SYNC_PAGE_SIZE
+        return max(1, min(tamanho, SYNC_MAX_PAGE_SIZE))
+
+    def _pagina_keyset(self, queryset, campo, posicao, limite, tamanho):
+        """Retorna (registros, tem_mais) após a posição (data, id)."""
+        queryset = queryset.filter(**{f"{campo}__lt": limite})
+        if posicao is not None:
+            data, pk = posicao
+            queryset = queryset.filter(
+                Q(**{f"{campo}__gt": data}) | Q(**{campo: data, "pk__gt": pk})
+            )
+        registros = list(queryset.order_by(campo, "pk")[: tamanho + 1])
+        return registros[:tamanho], len(registros) > tamanho
+
+
+def _codificar_cursor(posicao_alterados, posicao_excluidos):
+    def serializar(posicao):
+        return None if posicao is None else [posicao[0].isoformat(), posicao[1]]
+
+    conteudo = json.dumps(
+        [serializar(posicao_alterados), serializar(posicao_excluidos)]
+    )
+    return base64.urlsafe_b64encode(conteudo.encode("utf-8")).decode("ascii")
+
+
+def _decodificar_cursor(cursor):
+    try:
+        conteudo = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        posicoes = []
+        for posicao in conteudo:
+            if posicao is None:
+                posicoes.append(None)
+                continue
+            data = parse_datetime(posicao[0])
+            if data is None:
+                raise ValueError(posicao[0])
+            posicoes.append((data, int(posicao[1])))
+        posicao_alterados, posicao_excluidos = posicoes
+    except (ValueError, TypeError, IndexError, binascii.Error, UnicodeError):
+        raise ValidationError({"cursor": [ERROR_SYNC_CURSOR_INVALIDO]})
+    return posicao_alterados, posicao_excluidos
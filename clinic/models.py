@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models.functions import Replace, Upper
 from django.utils import timezone
 
 from .constants import (
@@ -6,14 +9,68 @@ from .constants import (
     HELP_TEXT_CEP_FORMAT,
     HELP_TEXT_CPF_FORMAT,
     HELP_TEXT_PACIENTE_FOTO,
+    HELP_TEXT_SINTOMA_SINONIMOS,
     HELP_TEXT_TUTOR_OBSERVACOES,
+    SEPARADORES_CPF,
+    SEPARADORES_CRMV,
+    SEPARADORES_MICROCHIP,
     SEXO_CHOICES,
     STATUS_CHOICES,
+    TIPO_BUSCA_CHOICES,
     TIPO_CONSULTA_CHOICES,
 )
 
 
-class Tutor(models.Model):
+def sem_separadores(campo, separadores):
+    """
+    Expressão do banco com o valor do campo sem os separadores informados.
+
+    Usada nas colunas geradas de identificadores (cpf_digitos etc.), que
+    o banco mantém sozinho, inclusive em bulk_create/update e SQL direto.
+    """
+    expressao = models.F(campo)
+    for separador in separadores:
+        expressao = Replace(expressao, models.Value(separador), models.Value(""))
+    return expressao
+
+
+class ModeloComContadores(models.Model):
+    """
+    Base para modelos com colunas contadoras (ex: Tutor.total_pacientes).
+
+    Os contadores são alterados só por UPDATE (ContadorService); save() de
+    um registro já existente não regrava essas colunas, para não trocar o
+    valor do banco pelo que estava em memória quando o registro foi lido.
+    O mesmo vale para outras colunas derivadas listadas em campos_derivados
+    (ex: Paciente.miniaturas, gravada pelo worker de miniaturas).
+    """
+
+    campos_contadores = ()
+    campos_derivados = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            adiados = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                campo.name
+                for campo in self._meta.concrete_fields
+                if not campo.primary_key
+                and not campo.generated
+                and campo.name not in self.campos_contadores
+                and campo.name not in self.campos_derivados
+                and campo.attname not in adiados
+            ]
+        super().save(*args, **kwargs)
+
+
+class Tutor(ModeloComContadores):
     """
     Modelo que representa o tutor (proprietário) de um paciente.
 
@@ -29,6 +86,14 @@ class Tutor(models.Model):
         help_text=HELP_TEXT_CPF_FORMAT,
         db_index=True,  # Índice para buscas rápidas por CPF
     )
+    # CPF só com dígitos, para consultas por identificador sem a máscara
+    cpf_digitos = models.GeneratedField(
+        expression=sem_separadores("cpf", SEPARADORES_CPF),
+        output_field=models.CharField(max_length=14),
+        db_persist=True,
+        db_index=True,
+        verbose_name="CPF (dígitos)",
+    )
     telefone_principal = models.CharField(
         max_length=20, blank=True, null=True, verbose_name="Telefone Principal"
     )
@@ -79,6 +144,14 @@ class Tutor(models.Model):
         verbose_name="Observações",
         help_text=HELP_TEXT_TUTOR_OBSERVACOES,
     )
+    data_atualizacao = models.DateTimeField(
+        auto_now=True, verbose_name="Data de Atualização"
+    )
+    # Contador mantido por ContadorService (ver clinic.services.contador_service)
+    total_pacientes = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Total de Pacientes"
+    )
+    campos_contadores = ("total_pacientes",)
 
     class Meta:
         verbose_name = "Tutor"
@@ -87,13 +160,92 @@ class Tutor(models.Model):
         indexes = [
             models.Index(fields=["cpf"], name="tutor_cpf_idx"),
             models.Index(fields=["email"], name="tutor_email_idx"),
+            # Sincronização incremental (keyset por data de atualização + id)
+            models.Index(
+                fields=["data_atualizacao", "id"], name="tutor_atualizacao_idx"
+            ),
         ]
 
     def __str__(self):
         return self.nome_completo
 
 
-class Paciente(models.Model):
+class DiasDesde(models.Func):
+    """
+    Dias inteiros entre uma data do banco e uma data de referência.
+
+    Ex: DiasDesde("data_nascimento", hoje) é a idade em dias.
+    """
+
+    output_field = models.IntegerField()
+    # Padrão (PostgreSQL/Oracle): date - date já resulta em dias
+    template = "(%(expressions)s)"
+    arg_joiner = " - "
+
+    def __init__(self, campo, referencia, **extra):
+        super().__init__(
+            models.Value(referencia, output_field=models.DateField()), campo, **extra
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="DATEDIFF(%(expressions)s)",
+            arg_joiner=", ",
+            **extra_context,
+        )
+
+
+def formatar_idade(dias, hoje=None):
+    """
+    Converte a idade em dias no texto exibido ("2 ano(s)", "3 mes(es)"...).
+
+    Anos e meses são contados no calendário, a partir da data de
+    nascimento correspondente (hoje - dias).
+    """
+    if dias is None:
+        return "Não informada"
+    if dias < 0:
+        return "Data futura"  # Para evitar idade negativa se data_nascimento for no futuro
+    if dias == 0:
+        return "Hoje"
+
+    hoje = hoje or timezone.localdate()
+    nascimento = hoje - timedelta(days=dias)
+    meses = (hoje.year - nascimento.year) * 12 + hoje.month - nascimento.month
+    if hoje.day < nascimento.day:
+        meses -= 1
+    if meses >= 12:
+        return f"{meses // 12} ano(s)"
+    if meses > 0:
+        return f"{meses} mes(es)"
+    return f"{dias} dia(s)"
+
+
+class PacienteQuerySet(models.QuerySet):
+    def com_idade(self, hoje=None):
+        """
+        Anota 'idade_dias' (calculada no banco) em cada paciente.
+
+        Para filtrar ou ordenar por idade, use a data de nascimento (que tem
+        índice): idade >= N dias equivale a data_nascimento <= hoje - N.
+        """
+        return self.annotate(
+            idade_dias=DiasDesde("data_nascimento", hoje or timezone.localdate())
+        )
+
+
+class Paciente(ModeloComContadores):
     """
     Modelo que representa um paciente (animal) da clínica.
 
@@ -129,6 +281,14 @@ class Paciente(models.Model):
         verbose_name="Microchip",
         db_index=True,
     )
+    # Microchip sem espaços/traços/pontos e em maiúsculas
+    microchip_normalizado = models.GeneratedField(
+        expression=Upper(sem_separadores("microchip", SEPARADORES_MICROCHIP)),
+        output_field=models.CharField(max_length=50),
+        db_persist=True,
+        db_index=True,
+        verbose_name="Microchip (normalizado)",
+    )
     cor_pelagem = models.CharField(
         max_length=50, blank=True, null=True, verbose_name="Cor da Pelagem"
     )
@@ -176,9 +336,25 @@ class Paciente(models.Model):
         verbose_name="Foto",
         help_text=HELP_TEXT_PACIENTE_FOTO,
     )
+    # Miniaturas da foto geradas em segundo plano (ver MiniaturaService):
+    # {"origem": nome da foto, "arquivos": {tamanho: {formato: nome}}}
+    miniaturas = models.JSONField(
+        default=dict, blank=True, editable=False, verbose_name="Miniaturas da Foto"
+    )
     observacoes_clinicas_relevantes = models.TextField(
         blank=True, null=True, verbose_name="Outras Observações Clínicas Relevantes"
     )
+    data_atualizacao = models.DateTimeField(
+        auto_now=True, verbose_name="Data de Atualização"
+    )
+    # Contador mantido por ContadorService (ver clinic.services.contador_service)
+    total_consultas = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Total de Consultas"
+    )
+    campos_contadores = ("total_consultas",)
+    campos_derivados = ("miniaturas",)
+
+    objects = PacienteQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Paciente"
@@ -188,11 +364,30 @@ class Paciente(models.Model):
             models.Index(fields=["nome"], name="paciente_nome_idx"),
             models.Index(fields=["microchip"], name="paciente_microchip_idx"),
             models.Index(fields=["tutor", "nome"], name="paciente_tutor_nome_idx"),
+            models.Index(
+                fields=["data_atualizacao", "id"], name="paciente_atualizacao_idx"
+            ),
+            models.Index(fields=["data_nascimento"], name="paciente_nascimento_idx"),
         ]
 
     def __str__(self):
         return f"{self.nome} (Espécie: {self.get_especie_display()}) - Tutor: {self.tutor.nome_completo}"  # type: ignore
 
+    @property
+    def idade_em_dias(self):
+        """
+        Idade em dias: o valor anotado por Paciente.objects.com_idade() ou,
+        sem a anotação, calculado a partir da data de hoje.
+
+        Returns:
+            int ou None se a data de nascimento não foi informada
+        """
+        if hasattr(self, "idade_dias"):
+            return self.idade_dias
+        if not self.data_nascimento:
+            return None
+        return (timezone.localdate() - self.data_nascimento).days
+
     @property
     def idade(self):
         """
@@ -201,43 +396,27 @@ class Paciente(models.Model):
         Returns:
             str: Idade em anos, meses ou dias, dependendo da idade
         """
-        if self.data_nascimento:
-            hoje = timezone.now().date()
-            anos = (
-                hoje.year
-                - self.data_nascimento.year
-                - (
-                    (hoje.month, hoje.day)
-                    < (self.data_nascimento.month, self.data_nascimento.day)
-                )
-            )
-            if anos > 0:
-                return f"{anos} ano(s)"
-            else:
-                meses = (
-                    (hoje.year - self.data_nascimento.year) * 12
-                    + hoje.month
-                    - self.data_nascimento.month
-                )
-                if hoje.day < self.data_nascimento.day:
-                    meses -= 1
-                if meses > 0:
-                    return f"{meses} mes(es)"
-                else:
-                    dias = (hoje - self.data_nascimento).days
-                    if dias == 0:
-                        return "Hoje"
-                    if dias < 0:
-                        return "Data futura"  # Para evitar idade negativa se data_nascimento for no futuro
-                    return f"{dias} dia(s)"
-        return "Não informada"
+        return formatar_idade(self.idade_em_dias)
 
 
-class Veterinario(models.Model):
+class Veterinario(ModeloComContadores):
     nome_completo = models.CharField(max_length=255, verbose_name="Nome do Veterinário")
     crmv = models.CharField(
         max_length=20, blank=True, null=True, unique=True, verbose_name="CRMV"
     )
+    # CRMV sem espaços/traços/pontos/barras e em maiúsculas ('SP-12345' -> 'SP12345')
+    crmv_normalizado = models.GeneratedField(
+        expression=Upper(sem_separadores("crmv", SEPARADORES_CRMV)),
+        output_field=models.CharField(max_length=20),
+        db_persist=True,
+        db_index=True,
+        verbose_name="CRMV (normalizado)",
+    )
+    # Contador mantido por ContadorService (ver clinic.services.contador_service)
+    total_consultas = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Total de Consultas"
+    )
+    campos_contadores = ("total_consultas",)
 
     class Meta:
         verbose_name = "Veterinário"
@@ -253,6 +432,12 @@ class Sintoma(models.Model):
     descricao = models.TextField(
         blank=True, null=True, verbose_name="Descrição do Sintoma (opcional)"
     )
+    sinonimos = models.TextField(
+        blank=True,
+        default="",
+        verbose_name="Sinônimos",
+        help_text=HELP_TEXT_SINTOMA_SINONIMOS,
+    )
 
     class Meta:
         verbose_name = "Sintoma"
@@ -263,7 +448,7 @@ class Sintoma(models.Model):
         return self.nome  # type: ignore
 
 
-class Doenca(models.Model):
+class Doenca(ModeloComContadores):
     """
     Representa uma condição ou doença que serve como base de conhecimento.
     Ex: 'Cinomose', 'Gastrite', 'Otite'.
@@ -280,6 +465,11 @@ class Doenca(models.Model):
     sintomas_associados = models.ManyToManyField(
         "Sintoma", blank=True, verbose_name="Sintomas Típicos Associados"
     )
+    # Contador mantido por ContadorService (ver clinic.services.contador_service)
+    total_sintomas = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Total de Sintomas"
+    )
+    campos_contadores = ("total_sintomas",)
 
     class Meta:
         verbose_name = "Doença"
@@ -290,6 +480,64 @@ class Doenca(models.Model):
         return self.nome
 
 
+class VersaoBaseConhecimento(models.Model):
+    """
+    Registro único com a versão corrente da base de conhecimento
+    (Sintomas, Doenças e suas associações).
+
+    A versão é incrementada uma vez a cada alteração aplicada na base,
+    permitindo identificar rapidamente se os dados mudaram.
+    """
+
+    versao = models.PositiveIntegerField(default=0, verbose_name="Versão")
+    origem = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        verbose_name="Origem",
+        help_text="Identificador da versão do arquivo da base de conhecimento",
+    )
+    data_atualizacao = models.DateTimeField(
+        default=timezone.now, verbose_name="Data de Atualização"
+    )
+
+    class Meta:
+        verbose_name = "Versão da Base de Conhecimento"
+        verbose_name_plural = "Versões da Base de Conhecimento"
+
+    def __str__(self):
+        return f"Base de conhecimento v{self.versao}"
+
+
+class RegistroExclusao(models.Model):
+    """
+    Marca ("tombstone") de um registro excluído.
+
+    Permite que clientes com sincronização incremental (endpoints /sync/)
+    saibam quais registros devem ser removidos das suas cópias locais.
+    Gravado pelo sinal post_delete de Tutor, Paciente e Consulta.
+    """
+
+    tabela = models.CharField(max_length=50, verbose_name="Tabela")
+    objeto_id = models.BigIntegerField(verbose_name="ID do Registro")
+    data_exclusao = models.DateTimeField(
+        default=timezone.now, verbose_name="Data de Exclusão"
+    )
+
+    class Meta:
+        verbose_name = "Registro de Exclusão"
+        verbose_name_plural = "Registros de Exclusão"
+        indexes = [
+            models.Index(
+                fields=["tabela", "data_exclusao", "id"],
+                name="exclusao_tabela_data_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tabela} #{self.objeto_id} excluído em {self.data_exclusao}"
+
+
 class Consulta(models.Model):
     """
     Modelo que representa uma consulta veterinária.
@@ -552,6 +800,71 @@ class Consulta(models.Model):
         verbose_name = "Consulta"
         verbose_name_plural = "Consultas"
         ordering = ["-data_hora_agendamento"]
+        indexes = [
+            models.Index(
+                fields=["data_ultima_modificacao", "id"],
+                name="consulta_atualizacao_idx",
+            ),
+            # Histórico do paciente (/pacientes/{id}/historico/)
+            models.Index(
+                fields=["paciente", "data_hora_agendamento"],
+                name="consulta_paciente_data_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Consulta de {self.paciente.nome} em {self.data_hora_agendamento.strftime('%d/%m/%Y %H:%M')}"
+
+
+class ItemBusca(models.Model):
+    """
+    Registro (tutor, paciente ou consulta) no índice da busca global.
+
+    Guarda o rótulo e o detalhe exibidos nos resultados, para que a busca
+    não precise consultar as tabelas de origem. Mantido pelos sinais de
+    Tutor, Paciente e Consulta e reconstruído pelo comando reindexar_busca.
+    """
+
+    tipo = models.CharField(max_length=20, choices=TIPO_BUSCA_CHOICES)
+    objeto_id = models.BigIntegerField(verbose_name="ID do Registro")
+    rotulo = models.CharField(max_length=255, verbose_name="Rótulo")
+    detalhe = models.CharField(max_length=255, blank=True, verbose_name="Detalhe")
+
+    class Meta:
+        verbose_name = "Item de Busca"
+        verbose_name_plural = "Itens de Busca"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tipo", "objeto_id"], name="item_busca_tipo_objeto_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id}: {self.rotulo}"
+
+
+class TokenBusca(models.Model):
+    """
+    Token normalizado (minúsculas, sem acentos, só letras e dígitos) de um
+    ItemBusca: palavras do nome, dígitos do CPF, microchip...
+
+    A busca por prefixo é feita como intervalo (token >= 'ana' e
+    token < 'anb'), que usa o índice em qualquer banco e collation, em vez
+    de só LIKE.
+    """
+
+    item = models.ForeignKey(
+        ItemBusca, on_delete=models.CASCADE, related_name="tokens"
+    )
+    token = models.CharField(max_length=64)
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Token de Busca"
+        verbose_name_plural = "Tokens de Busca"
+        indexes = [
+            models.Index(fields=["token", "item"], name="token_busca_token_idx"),
+        ]
+
+    def __str__(self):
+        return self.token
@@ -0,0 +1,101 @@
+"""
+Renderers adicionais da API.
+
+O DRF usa o parâmetro '?format=' para escolher o renderer. Os renderers
+NDJSON e CSV permitem que os endpoints de exportação aceitem '?format=ndjson'
+e '?format=csv'; o corpo da exportação em si é gerado em streaming pela
+view, e estes renderers só são usados para respostas de erro.
+
+JSONRapidoRenderer e MessagePackRenderer são opcionais (settings
+API_RENDERERS_RAPIDOS): o primeiro usa orjson quando instalado e o segundo é
+escolhido pelo cliente com 'Accept: application/msgpack'.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+
+def _valor_serializavel(obj):
+    """
+    Converte tipos que orjson/msgpack não conhecem (Decimal, datas, textos
+    traduzíveis...) exatamente como o encoder JSON do DRF.
+    """
+    return JSONEncoder().default(obj)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer para JSON delimitado por quebra de linha (um objeto por linha)."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (
+            json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+        ).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """Renderer para CSV. Erros são devolvidos como uma única linha JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(
+            self.charset
+        )
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """
+    JSONRenderer que serializa com orjson quando ele está instalado.
+
+    A saída é a mesma do JSONRenderer padrão (datas continuam no formato do
+    DRF). Sem orjson, ou quando o cliente pede JSON indentado, usa o
+    renderer padrão.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_valor_serializavel,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer MessagePack, escolhido com 'Accept: application/msgpack'."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_valor_serializavel, use_bin_type=True)
@@ -0,0 +1,26 @@
+"""
+Routers da API.
+"""
+
+from rest_framework.routers import DefaultRouter
+
+
+class OperacoesEmLoteRouter(DefaultRouter):
+    """
+    DefaultRouter que também mapeia PATCH na rota de listagem.
+
+    PATCH /<recurso>/ é encaminhado para a ação 'partial_update_em_lote',
+    quando o ViewSet a implementa (ver OperacoesEmLoteMixin). ViewSets sem
+    essa ação continuam com as rotas padrão.
+    """
+
+    routes = [
+        (
+            rota._replace(
+                mapping={**rota.mapping, "patch": "partial_update_em_lote"}
+            )
+            if getattr(rota, "name", "") == "{basename}-list"
+            else rota
+        )
+        for rota in DefaultRouter.routes
+    ]
@@ -6,7 +6,7 @@ from .constants import (
     HELP_TEXT_DOENCA_SINTOMAS,
 )
 from .models import Consulta, Doenca, Paciente, Sintoma, Tutor, Veterinario
-from .services import TutorService
+from .services import MiniaturaService, TutorService
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -69,6 +69,19 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         return user
 
 
+class PacienteResumoSerializer(serializers.ModelSerializer):
+    """
+    Resumo do paciente embutido no tutor.
+
+    Os campos devem constar no only() do Prefetch em TutorViewSet.
+    """
+
+    class Meta:
+        model = Paciente
+        fields = ["id", "nome", "especie", "status"]
+        read_only_fields = fields
+
+
 class TutorSerializer(serializers.ModelSerializer):
     """
     Serializer para o modelo Tutor.
@@ -76,9 +89,11 @@ class TutorSerializer(serializers.ModelSerializer):
     Delega validação de CPF para TutorService, seguindo o princípio
     de Single Responsibility (SRP). O Serializer apenas serializa/deserializa,
     sem lógica de negócio.
+
+    'pacientes' traz um resumo de cada paciente do tutor (somente leitura).
     """
 
-    pacientes = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    pacientes = PacienteResumoSerializer(many=True, read_only=True)
 
     class Meta:
         model = Tutor
@@ -97,10 +112,12 @@ class TutorSerializer(serializers.ModelSerializer):
             "endereco_uf",
             "endereco_cep",
             "data_cadastro",
+            "data_atualizacao",
             "observacoes",
             "pacientes",
+            "total_pacientes",
         ]
-        read_only_fields = ["id", "data_cadastro"]
+        read_only_fields = ["id", "data_cadastro", "data_atualizacao"]
 
     def __init__(self, *args, **kwargs):
         """
@@ -141,27 +158,38 @@ class PacienteSerializer(serializers.ModelSerializer):
     """
     Serializer para o modelo Paciente.
 
-    Inclui campos calculados como nome do tutor e idade atual do paciente.
+    Inclui campos calculados como nome do tutor e idade atual do paciente
+    (texto em 'idade_atual' e dias em 'idade_dias'). 'miniaturas' traz as
+    URLs das versões reduzidas da foto, para listagens não baixarem a
+    original ({} enquanto não forem geradas).
     """
 
     tutor_nome_completo = serializers.CharField(
         source="tutor.nome_completo", read_only=True
     )
     idade_atual = serializers.CharField(source="idade", read_only=True)
+    idade_dias = serializers.IntegerField(
+        source="idade_em_dias", read_only=True, allow_null=True
+    )
+    miniaturas = serializers.SerializerMethodField()
 
     class Meta:
         model = Paciente
-        fields = "__all__"
+        # Coluna gerada pelo banco, usada apenas em /identificadores/
+        exclude = ["microchip_normalizado"]
         read_only_fields = ["id", "data_cadastro"]
 
+    def get_miniaturas(self, paciente):
+        return MiniaturaService.urls(paciente, self.context.get("request"))
+
 
 class VeterinarioSerializer(serializers.ModelSerializer):
     """Serializer para o modelo Veterinário."""
 
     class Meta:
         model = Veterinario
-        fields = ["id", "nome_completo", "crmv"]
-        read_only_fields = ["id"]
+        fields = ["id", "nome_completo", "crmv", "total_consultas"]
+        read_only_fields = ["id", "total_consultas"]
 
 
 class SintomaSerializer(serializers.ModelSerializer):
@@ -169,7 +197,7 @@ class SintomaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Sintoma
-        fields = ["id", "nome", "descricao"]
+        fields = ["id", "nome", "descricao", "sinonimos"]
 
 
 class DoencaSerializer(serializers.ModelSerializer):
@@ -201,7 +229,9 @@ class DoencaSerializer(serializers.ModelSerializer):
             "descricao",
             "sintomas_associados",  # Usado na resposta (GET)
             "sintomas_ids",  # Usado na requisição (POST/PUT)
+            "total_sintomas",
         ]
+        read_only_fields = ["total_sintomas"]
 
 
 class ConsultaSerializer(serializers.ModelSerializer):
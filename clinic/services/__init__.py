@@ -13,9 +13,20 @@ Os serviços são responsáveis por:
 As Views devem ser finas e apenas delegar para os serviços.
 """
 
+from .autocomplete_service import AutocompleteSintomasService
+from .base_conhecimento_service import BaseConhecimentoService
+from .busca_service import BuscaService
 from .consulta_service import ConsultaService
+from .contador_service import ContadorService
+from .deduplicacao_service import DeduplicacaoTutoresService
 from .diagnostico_service import DiagnosticoService
+from .historico_service import HistoricoPacienteService
+from .identificador_service import IdentificadorService
+from .importacao_service import ImportacaoService
+from .miniatura_service import MiniaturaService
+from .schema_service import SchemaService
 from .tutor_service import TutorService
+from .upload_foto_service import UploadFotoService
 
 # Importar função deprecated para backward compatibility
 import sys
@@ -36,8 +47,19 @@ except ImportError:
         return service.sugerir_diagnosticos(sintomas)
 
 __all__ = [
+    "AutocompleteSintomasService",
+    "BaseConhecimentoService",
+    "BuscaService",
     "ConsultaService",
+    "ContadorService",
+    "DeduplicacaoTutoresService",
     "DiagnosticoService",
+    "HistoricoPacienteService",
+    "IdentificadorService",
+    "ImportacaoService",
+    "MiniaturaService",
+    "SchemaService",
     "TutorService",
+    "UploadFotoService",
     "sugerir_diagnosticos",  # Backward compatibility
 ]
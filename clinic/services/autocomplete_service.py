@@ -0,0 +1,125 @@
+"""
+Serviço de Autocompletar Sintomas
+
+Responde ao type-ahead do formulário de consulta a partir de um índice em
+memória (lista ordenada + bisect) dos nomes e sinônimos dos sintomas, sem
+acentos e em minúsculas.
+
+O índice é reconstruído (uma consulta ao banco) quando a versão da base
+de conhecimento no cache muda; as demais buscas não acessam o banco.
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional, Tuple
+
+from ..cache import versoes_tabelas
+from ..constants import AUTOCOMPLETE_LIMITE_PADRAO, AUTOCOMPLETE_MAX_VARREDURA
+from ..models import Sintoma
+from .busca_service import tokenizar
+
+logger = logging.getLogger(__name__)
+
+# Prioridade do casamento (menor = melhor)
+INICIO_NOME = 0
+PALAVRA_NOME = 1
+INICIO_SINONIMO = 2
+PALAVRA_SINONIMO = 3
+
+
+class _Indice(NamedTuple):
+    versao: Optional[int]
+    # Chaves normalizadas em ordem e, na mesma posição,
+    # (prioridade, sintoma_id, nome, sinônimo ou None)
+    chaves: List[str]
+    entradas: List[Tuple[int, int, str, Optional[str]]]
+
+
+class AutocompleteSintomasService:
+    """
+    Serviço de sugestões de sintomas por prefixo, sem acentos.
+
+    Cada nome e sinônimo entra no índice uma vez por palavra ('Diarreia
+    sanguinolenta' casa com 'diar' e com 'sang'). O índice é compartilhado
+    pelo processo e trocado de uma vez quando a base muda.
+
+    Example:
+        >>> AutocompleteSintomasService().sugerir("vom")
+        [{'id': 3, 'nome': 'Vômito', 'sinonimo': None}]
+    """
+
+    _indice = _Indice(None, [], [])
+    _trava = threading.Lock()
+
+    def sugerir(self, termo: str, limite: int = AUTOCOMPLETE_LIMITE_PADRAO):
+        """
+        Retorna até 'limite' sintomas cujo nome ou sinônimo tem uma palavra
+        começando por 'termo', dos melhores casamentos para os piores.
+
+        Returns:
+            Lista de {"id", "nome", "sinonimo"} ('sinonimo' indica o
+            sinônimo que casou, quando o nome não casou)
+        """
+        chave = " ".join(tokenizar(termo))
+        if not chave:
+            return []
+        indice = self._indice_atual()
+
+        melhores = {}
+        posicao = bisect_left(indice.chaves, chave)
+        fim = min(len(indice.chaves), posicao + AUTOCOMPLETE_MAX_VARREDURA)
+        while posicao < fim and indice.chaves[posicao].startswith(chave):
+            entrada = indice.entradas[posicao]
+            sintoma_id = entrada[1]
+            if sintoma_id not in melhores or entrada[0] < melhores[sintoma_id][0]:
+                melhores[sintoma_id] = entrada
+            posicao += 1
+
+        ordenadas = sorted(
+            melhores.values(), key=lambda entrada: (entrada[0], entrada[2].lower())
+        )
+        return [
+            {"id": sintoma_id, "nome": nome, "sinonimo": sinonimo}
+            for _, sintoma_id, nome, sinonimo in ordenadas[:limite]
+        ]
+
+    def _indice_atual(self) -> _Indice:
+        versao = versoes_tabelas(("base_conhecimento",))["base_conhecimento"]
+        indice = AutocompleteSintomasService._indice
+        if indice.versao == versao:
+            return indice
+        with self._trava:
+            # Outra thread pode ter reconstruído enquanto esperávamos
+            if AutocompleteSintomasService._indice.versao != versao:
+                AutocompleteSintomasService._indice = self._construir(versao)
+            return AutocompleteSintomasService._indice
+
+    def _construir(self, versao) -> _Indice:
+        entradas = []
+        for sintoma_id, nome, sinonimos in Sintoma.objects.values_list(
+            "id", "nome", "sinonimos"
+        ):
+            textos = [(nome, None, INICIO_NOME, PALAVRA_NOME)]
+            textos += [
+                (sinonimo.strip(), sinonimo.strip(), INICIO_SINONIMO, PALAVRA_SINONIMO)
+                for sinonimo in (sinonimos or "").splitlines()
+                if sinonimo.strip()
+            ]
+            for texto, sinonimo, no_inicio, na_palavra in textos:
+                palavras = tokenizar(texto)
+                for inicio in range(len(palavras)):
+                    prioridade = no_inicio if inicio == 0 else na_palavra
+                    entradas.append(
+                        (
+                            " ".join(palavras[inicio:]),
+                            (prioridade, sintoma_id, nome, sinonimo),
+                        )
+                    )
+        entradas.sort(key=lambda item: item[0])
+        logger.info(f"Índice de autocompletar de sintomas: {len(entradas)} chaves")
+        return _Indice(
+            versao,
+            [chave for chave, _ in entradas],
+            [entrada for _, entrada in entradas],
+        )
@@ -0,0 +1,454 @@
+"""
+Serviço de Base de Conhecimento
+
+Responsável por manter a base de conhecimento (Sintomas, Doenças e suas
+associações) sincronizada com um arquivo versionado.
+
+Princípios aplicados:
+- SRP: Apenas responsável pela sincronização e versionamento da base
+- Idempotência: Aplicar o mesmo arquivo duas vezes não gera alterações
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..cache import incrementar_versao_tabela
+from ..models import Consulta, Doenca, Sintoma, VersaoBaseConhecimento
+from .contador_service import ContadorService
+
+logger = logging.getLogger(__name__)
+
+# Marca sintomas citados por doenças mas não declarados no arquivo:
+# existem na base, porém sua descrição e sinônimos atuais são preservados.
+_MANTER_CAMPOS = object()
+
+# Quando verdadeiro, os sinais de Sintoma/Doenca não incrementam a versão:
+# quem abriu o bloco incrementa uma única vez ao final (ver sincronizar()).
+_versionamento_manual = ContextVar("versionamento_manual", default=False)
+
+
+class BaseConhecimentoService:
+    """
+    Serviço para sincronizar e versionar a base de conhecimento.
+
+    A sincronização carrega o arquivo inteiro e o estado atual do banco
+    em memória, calcula a diferença e aplica inserções, atualizações e
+    remoções em lote dentro de uma única transação.
+
+    Sintomas e doenças ausentes do arquivo só são removidos com
+    remover=True, e nunca os registrados em consultas: a remoção apagaria
+    em cascata os sintomas e diagnósticos dessas consultas. Os mantidos
+    por esse motivo ficam em 'em_uso' após a sincronização.
+
+    Formato esperado do arquivo (JSON):
+        {
+            "versao": "2025.11",
+            "sintomas": [
+                {"nome": "Vômito", "descricao": "...", "sinonimos": ["Êmese"]}
+            ],
+            "doencas": [
+                {"nome": "Gastrite", "descricao": "...", "sintomas": ["Vômito"]}
+            ]
+        }
+
+    Example:
+        >>> service = BaseConhecimentoService()
+        >>> resumo = service.sincronizar(json.load(arquivo))
+        >>> print(resumo["doencas_criadas"])
+    """
+
+    def versao_atual(self) -> VersaoBaseConhecimento:
+        """
+        Retorna o registro de versão da base, criando-o se necessário.
+
+        Returns:
+            Instância única de VersaoBaseConhecimento
+        """
+        versao, _ = VersaoBaseConhecimento.objects.get_or_create(pk=1)
+        return versao
+
+    @staticmethod
+    def versionamento_automatico() -> bool:
+        """Indica se alterações isoladas devem incrementar a versão (sinais)."""
+        return not _versionamento_manual.get()
+
+    @contextmanager
+    def versionamento_manual(self):
+        """
+        Suspende o incremento automático de versão feito pelos sinais.
+
+        Usado em operações que alteram vários registros e incrementam a
+        versão uma única vez ao final.
+        """
+        token = _versionamento_manual.set(True)
+        try:
+            yield
+        finally:
+            _versionamento_manual.reset(token)
+
+    def incrementar_versao(self, origem: Optional[str] = None) -> int:
+        """
+        Incrementa a versão da base de conhecimento.
+
+        Também invalida as respostas da base guardadas em cache.
+
+        Args:
+            origem: Identificador da versão do arquivo aplicado (opcional)
+
+        Returns:
+            Novo número de versão
+        """
+        VersaoBaseConhecimento.objects.get_or_create(pk=1)
+        campos = {"versao": F("versao") + 1, "data_atualizacao": timezone.now()}
+        if origem is not None:
+            campos["origem"] = origem
+        VersaoBaseConhecimento.objects.filter(pk=1).update(**campos)
+        incrementar_versao_tabela("base_conhecimento")
+        return VersaoBaseConhecimento.objects.values_list("versao", flat=True).get(
+            pk=1
+        )
+
+    def __init__(self):
+        self.em_uso: Dict[str, List[str]] = {"sintomas": [], "doencas": []}
+
+    def sincronizar(
+        self, dados: dict, dry_run: bool = False, remover: bool = False
+    ) -> Dict[str, int]:
+        """
+        Sincroniza o banco com o conteúdo de um arquivo da base de conhecimento.
+
+        Args:
+            dados: Conteúdo do arquivo já decodificado (dict)
+            dry_run: Se True, apenas calcula a diferença sem gravar nada
+            remover: Se True, remove sintomas e doenças ausentes do arquivo
+                que não estão registrados em consultas
+
+        Returns:
+            Dicionário com a contagem de cada operação e a versão resultante
+
+        Raises:
+            ValueError: Se o arquivo tiver formato inválido ou nomes duplicados
+        """
+        sintomas_arquivo = self._ler_sintomas(dados)
+        doencas_arquivo = self._ler_doencas(dados)
+
+        # Sintomas citados pelas doenças também fazem parte da base
+        for doenca in doencas_arquivo.values():
+            for nome_sintoma in doenca["sintomas"]:
+                sintomas_arquivo.setdefault(nome_sintoma, _MANTER_CAMPOS)
+
+        with transaction.atomic(), self.versionamento_manual():
+            resumo = self._aplicar_diferenca(
+                sintomas_arquivo, doencas_arquivo, dry_run, remover
+            )
+
+            alterou = any(resumo.values())
+            resumo["versao"] = self.versao_atual().versao
+            if alterou and not dry_run:
+                resumo["versao"] = self.incrementar_versao(
+                    origem=str(dados.get("versao", "")) or None
+                )
+
+        logger.info(f"Sincronização da base de conhecimento concluída: {resumo}")
+        return resumo
+
+    def _ler_sintomas(self, dados: dict) -> dict:
+        """
+        Lê a seção de sintomas do arquivo.
+
+        Returns:
+            Dicionário {nome: {"descricao": str, "sinonimos": str}}, com os
+            sinônimos um por linha, como em Sintoma.sinonimos
+        """
+        sintomas = {}
+        for item in dados.get("sintomas", []):
+            nome = self._nome_obrigatorio(item, "sintoma")
+            if nome in sintomas:
+                raise ValueError(f"Sintoma duplicado no arquivo: {nome}")
+            sinonimos = item.get("sinonimos", [])
+            if not isinstance(sinonimos, list) or not all(
+                isinstance(sinonimo, str) for sinonimo in sinonimos
+            ):
+                raise ValueError(
+                    f"Sintoma {nome}: 'sinonimos' deve ser uma lista de nomes: "
+                    f"{sinonimos!r}"
+                )
+            sintomas[nome] = {
+                "descricao": item.get("descricao") or None,
+                "sinonimos": "\n".join(
+                    dict.fromkeys(s.strip() for s in sinonimos if s.strip())
+                ),
+            }
+        return sintomas
+
+    def _ler_doencas(self, dados: dict) -> dict:
+        """
+        Lê a seção de doenças do arquivo.
+
+        Returns:
+            Dicionário {nome: {"descricao": str, "sintomas": set}}
+        """
+        doencas = {}
+        for item in dados.get("doencas", []):
+            nome = self._nome_obrigatorio(item, "doença")
+            if nome in doencas:
+                raise ValueError(f"Doença duplicada no arquivo: {nome}")
+            sintomas = item.get("sintomas", [])
+            if not isinstance(sintomas, list) or not all(
+                isinstance(sintoma, str) for sintoma in sintomas
+            ):
+                raise ValueError(
+                    f"Doença {nome}: 'sintomas' deve ser uma lista de nomes: "
+                    f"{sintomas!r}"
+                )
+            doencas[nome] = {
+                "descricao": item.get("descricao") or None,
+                "sintomas": {s.strip() for s in sintomas if s.strip()},
+            }
+        return doencas
+
+    def _nome_obrigatorio(self, item: dict, tipo: str) -> str:
+        nome = (item.get("nome") or "").strip() if isinstance(item, dict) else ""
+        if not nome:
+            raise ValueError(f"Registro de {tipo} sem nome: {item!r}")
+        return nome
+
+    def _aplicar_diferenca(
+        self,
+        sintomas_arquivo: dict,
+        doencas_arquivo: dict,
+        dry_run: bool,
+        remover: bool,
+    ) -> Dict[str, int]:
+        """
+        Calcula e aplica a diferença entre o arquivo e o banco.
+
+        Todas as leituras são feitas de uma vez (uma consulta por tabela)
+        e todas as escritas são feitas em lote.
+        """
+        resumo = {}
+        relacoes = Consulta._meta
+        sintomas_em_uso = self._ids_em_uso(
+            relacoes.get_field("sintomas_apresentados"), "sintoma_id"
+        )
+        doencas_em_uso = self._ids_em_uso(
+            relacoes.get_field("diagnosticos_suspeitos"), "doenca_id"
+        ) | self._ids_em_uso(
+            relacoes.get_field("diagnosticos_definitivos"), "doenca_id"
+        )
+
+        # Associações são lidas antes das remoções para que o resumo
+        # conte também as que serão apagadas em cascata.
+        Associacao = Doenca.sintomas_associados.through
+        associacoes_banco = {
+            (doenca_nome, sintoma_nome): pk
+            for pk, doenca_nome, sintoma_nome in Associacao.objects.values_list(
+                "id", "doenca__nome", "sintoma__nome"
+            )
+        }
+
+        # --- Sintomas ---
+        sintomas_banco = {
+            s.nome: s
+            for s in Sintoma.objects.only("id", "nome", "descricao", "sinonimos")
+        }
+        (
+            resumo["sintomas_criados"],
+            resumo["sintomas_atualizados"],
+            sintomas_removidos,
+            self.em_uso["sintomas"],
+        ) = self._sincronizar_tabela(
+            Sintoma,
+            sintomas_banco,
+            sintomas_arquivo,
+            dry_run,
+            remover,
+            sintomas_em_uso,
+        )
+        resumo["sintomas_removidos"] = len(sintomas_removidos)
+        resumo["sintomas_mantidos_em_uso"] = len(self.em_uso["sintomas"])
+
+        # --- Doenças ---
+        doencas_banco = {
+            d.nome: d for d in Doenca.objects.only("id", "nome", "descricao")
+        }
+        descricoes_doencas = {
+            nome: {"descricao": doenca["descricao"]}
+            for nome, doenca in doencas_arquivo.items()
+        }
+        (
+            resumo["doencas_criadas"],
+            resumo["doencas_atualizadas"],
+            doencas_removidas,
+            self.em_uso["doencas"],
+        ) = self._sincronizar_tabela(
+            Doenca,
+            doencas_banco,
+            descricoes_doencas,
+            dry_run,
+            remover,
+            doencas_em_uso,
+        )
+        resumo["doencas_removidas"] = len(doencas_removidas)
+        resumo["doencas_mantidas_em_uso"] = len(self.em_uso["doencas"])
+
+        # --- Associações Doença x Sintoma ---
+        resumo.update(
+            self._sincronizar_associacoes(
+                doencas_arquivo,
+                associacoes_banco,
+                dry_run,
+                doencas_removidas,
+                sintomas_removidos,
+            )
+        )
+        return resumo
+
+    @staticmethod
+    def _ids_em_uso(campo, coluna: str) -> Set[int]:
+        """IDs de sintomas/doenças registrados em alguma consulta."""
+        return set(
+            campo.remote_field.through.objects.values_list(coluna, flat=True).distinct()
+        )
+
+    def _sincronizar_tabela(
+        self,
+        modelo,
+        registros_banco: dict,
+        registros_arquivo: dict,
+        dry_run: bool,
+        remover: bool,
+        em_uso: Set[int],
+    ) -> Tuple[int, int, Set[str], List[str]]:
+        """
+        Aplica inserções, atualizações e remoções de uma tabela com chave 'nome'.
+
+        Args:
+            registros_arquivo: {nome: {campo: valor}}; _MANTER_CAMPOS
+                preserva os valores atuais do registro
+
+        Returns:
+            Tupla (criados, atualizados, nomes removidos, nomes ausentes do
+            arquivo mantidos por estarem em consultas)
+        """
+        novos = [
+            modelo(nome=nome, **({} if valores is _MANTER_CAMPOS else valores))
+            for nome, valores in registros_arquivo.items()
+            if nome not in registros_banco
+        ]
+
+        alterados = []
+        campos = set()
+        for nome, registro in registros_banco.items():
+            valores = registros_arquivo.get(nome, _MANTER_CAMPOS)
+            if valores is _MANTER_CAMPOS:
+                continue
+            diferentes = [
+                campo
+                for campo, valor in valores.items()
+                if getattr(registro, campo) != valor
+            ]
+            for campo in diferentes:
+                setattr(registro, campo, valores[campo])
+            if diferentes:
+                campos.update(diferentes)
+                alterados.append(registro)
+
+        removidos = {}
+        mantidos = []
+        if remover:
+            for nome, registro in registros_banco.items():
+                if nome in registros_arquivo:
+                    continue
+                if registro.pk in em_uso:
+                    mantidos.append(nome)
+                else:
+                    removidos[nome] = registro.pk
+            if mantidos:
+                logger.warning(
+                    f"{modelo._meta.verbose_name_plural} ausentes do arquivo e "
+                    f"registrados em consultas (não removidos): "
+                    f"{', '.join(sorted(mantidos))}"
+                )
+
+        if not dry_run:
+            if removidos:
+                modelo.objects.filter(pk__in=removidos.values()).delete()
+            if alterados:
+                modelo.objects.bulk_update(alterados, sorted(campos))
+            if novos:
+                modelo.objects.bulk_create(novos)
+
+        return len(novos), len(alterados), set(removidos), sorted(mantidos)
+
+    def _sincronizar_associacoes(
+        self,
+        doencas_arquivo: dict,
+        associacoes_banco: dict,
+        dry_run: bool,
+        doencas_removidas: Set[str],
+        sintomas_removidos: Set[str],
+    ) -> Dict[str, int]:
+        """
+        Aplica inserções e remoções na tabela de associação Doença x Sintoma.
+
+        As associações são comparadas pelos nomes, pois doenças e sintomas
+        novos só recebem ID depois de inseridos. Doenças ausentes do arquivo
+        e mantidas no banco conservam as suas associações.
+        """
+        Associacao = Doenca.sintomas_associados.through
+        associacoes_arquivo = {
+            (doenca_nome, sintoma_nome)
+            for doenca_nome, doenca in doencas_arquivo.items()
+            for sintoma_nome in doenca["sintomas"]
+        }
+
+        novas = associacoes_arquivo - associacoes_banco.keys()
+        removidas = [
+            pk
+            for (doenca_nome, sintoma_nome), pk in associacoes_banco.items()
+            if (
+                doenca_nome in doencas_arquivo
+                and (doenca_nome, sintoma_nome) not in associacoes_arquivo
+            )
+            or doenca_nome in doencas_removidas
+            or sintoma_nome in sintomas_removidos
+        ]
+
+        if not dry_run:
+            if removidas:
+                Associacao.objects.filter(pk__in=removidas).delete()
+            if novas:
+                ids_doencas = dict(
+                    Doenca.objects.filter(
+                        nome__in={d for d, _ in novas}
+                    ).values_list("nome", "id")
+                )
+                ids_sintomas = dict(
+                    Sintoma.objects.filter(
+                        nome__in={s for _, s in novas}
+                    ).values_list("nome", "id")
+                )
+                Associacao.objects.bulk_create(
+                    [
+                        Associacao(
+                            doenca_id=ids_doencas[doenca_nome],
+                            sintoma_id=ids_sintomas[sintoma_nome],
+                        )
+                        for doenca_nome, sintoma_nome in novas
+                    ]
+                )
+            if novas or removidas:
+                # bulk_create/delete na tabela de associação não disparam sinais
+                ContadorService().recontar("doenca.total_sintomas")
+
+        return {
+            "associacoes_criadas": len(novas),
+            "associacoes_removidas": len(removidas),
+        }
@@ -0,0 +1,358 @@
+"""
+Serviço de Busca Global
+
+Mantém o índice de busca (ItemBusca/TokenBusca) de tutores, pacientes e
+consultas e responde à busca da recepção: nome do tutor, nome do pet, CPF
+ou microchip em um único campo.
+
+Princípios aplicados:
+- Busca por prefixo como intervalo no índice (nunca LIKE '%termo%')
+- Custo limitado: poucos termos, linhas lidas por termo com LIMIT e
+  orçamento de tempo; quando algum limite é atingido o resultado é marcado
+  como parcial
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+
+from ..constants import (
+    BUSCA_LIMITE_PADRAO,
+    BUSCA_MAX_CANDIDATOS,
+    BUSCA_MAX_TERMOS,
+    BUSCA_ORCAMENTO_MS,
+    BUSCA_TAMANHO_MINIMO,
+    TIPO_BUSCA_CHOICES,
+)
+from ..models import Consulta, ItemBusca, Paciente, TokenBusca, Tutor
+
+logger = logging.getLogger(__name__)
+
+# Pesos dos tokens: identificadores (CPF, microchip) valem mais que palavras
+# do nome, que valem mais que nomes relacionados (tutor do paciente etc.)
+PESO_IDENTIFICADOR = 3
+PESO_NOME = 2
+PESO_RELACIONADO = 1
+
+TAMANHO_MAXIMO_TOKEN = 64
+
+# Termo da busca formado só por dígitos e separadores (CPF, microchip)
+_RE_NUMERICO = re.compile(r"[\d.\-/\s]+")
+_RE_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+# Últimos caracteres de cada classe (letras, dígitos): não têm sucessor
+# que ordene logo depois deles em todas as collations
+_SEM_SUCESSOR = "z9"
+
+# Documento do índice: (objeto_id, rótulo, detalhe, [(token, peso), ...])
+Documento = Tuple[int, str, str, List[Tuple[str, int]]]
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Remove acentos e converte para minúsculas ('Conceição' -> 'conceicao')."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Divide o texto normalizado em palavras (só letras e dígitos)."""
+    return [
+        token[:TAMANHO_MAXIMO_TOKEN]
+        for token in _RE_NAO_ALFANUMERICO.split(normalizar(texto))
+        if token
+    ]
+
+
+def limite_prefixo(termo: str) -> Optional[str]:
+    """
+    Menor string maior que todos os tokens que começam com 'termo', para a
+    busca por prefixo como intervalo [termo, limite).
+
+    Incrementa o último caractere que não é 'z' nem '9' ('ana' -> 'anb',
+    'luiz' -> 'luj'): a ordem de letras e dígitos é a mesma em collations
+    binárias e linguísticas (ICU, en_US.UTF-8), ao contrário de limites como
+    termo + '\x7f', ignorados pelas linguísticas. None se não houver (só 'z'
+    e '9').
+    """
+    posicao = len(termo.rstrip(_SEM_SUCESSOR))
+    if not posicao:
+        return None
+    return termo[: posicao - 1] + chr(ord(termo[posicao - 1]) + 1)
+
+
+def compactar(texto: Optional[str]) -> str:
+    """Identificador sem separadores ('985-112.003' -> '985112003')."""
+    return "".join(tokenizar(texto))[:TAMANHO_MAXIMO_TOKEN]
+
+
+class BuscaService:
+    """
+    Serviço para indexar registros e executar a busca global.
+
+    Example:
+        >>> service = BuscaService()
+        >>> service.indexar("paciente", [paciente.id])
+        >>> service.buscar("rex silva")["resultados"][0]["tipo"]
+        'paciente'
+    """
+
+    tipos = [tipo for tipo, _ in TIPO_BUSCA_CHOICES]
+
+    # ------------------------------------------------------------------
+    # Indexação
+    # ------------------------------------------------------------------
+
+    def indexar(self, tipo: str, ids: Iterable[int], cascata: bool = True) -> int:
+        """
+        (Re)indexa os registros informados de um tipo.
+
+        Com cascata, se o rótulo ou o detalhe de um tutor/paciente mudou
+        (ex.: nome alterado), reindexa também os registros cujos tokens
+        dependem dele (pacientes do tutor, consultas do paciente).
+
+        Returns:
+            Quantidade de registros indexados
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        anteriores = {
+            objeto_id: (rotulo, detalhe)
+            for objeto_id, rotulo, detalhe in ItemBusca.objects.filter(
+                tipo=tipo, objeto_id__in=ids
+            ).values_list("objeto_id", "rotulo", "detalhe")
+        }
+        documentos = list(self._documentos(tipo, ids))
+
+        with transaction.atomic():
+            ItemBusca.objects.filter(tipo=tipo, objeto_id__in=ids).delete()
+            itens = ItemBusca.objects.bulk_create(
+                [
+                    ItemBusca(
+                        tipo=tipo,
+                        objeto_id=objeto_id,
+                        rotulo=rotulo[:255],
+                        detalhe=detalhe[:255],
+                    )
+                    for objeto_id, rotulo, detalhe, _ in documentos
+                ]
+            )
+            TokenBusca.objects.bulk_create(
+                [
+                    TokenBusca(item=item, token=token, peso=peso)
+                    for item, (_, _, _, tokens) in zip(itens, documentos)
+                    for token, peso in tokens
+                ]
+            )
+
+        if cascata:
+            alterados = [
+                objeto_id
+                for objeto_id, rotulo, detalhe, _ in documentos
+                if anteriores.get(objeto_id, (rotulo, detalhe)) != (rotulo, detalhe)
+            ]
+            self._indexar_dependentes(tipo, alterados)
+        return len(documentos)
+
+    def remover(self, tipo: str, ids: Iterable[int]) -> None:
+        """Remove registros do índice (os tokens são removidos em cascata)."""
+        ItemBusca.objects.filter(tipo=tipo, objeto_id__in=list(ids)).delete()
+
+    def reindexar(self, tipos: Optional[List[str]] = None, tamanho_lote=1000):
+        """
+        Reconstrói o índice dos tipos informados (todos por padrão).
+
+        Returns:
+            Dict {tipo: quantidade de registros indexados}
+        """
+        resumo = {}
+        for tipo in tipos or self.tipos:
+            modelo = self._modelos()[tipo]
+            ItemBusca.objects.filter(tipo=tipo).delete()
+            ids = list(modelo.objects.order_by("pk").values_list("pk", flat=True))
+            resumo[tipo] = sum(
+                self.indexar(tipo, ids[inicio : inicio + tamanho_lote], cascata=False)
+                for inicio in range(0, len(ids), tamanho_lote)
+            )
+            logger.info(f"Índice de busca: {resumo[tipo]} registros de {tipo}")
+        return resumo
+
+    def _modelos(self):
+        return {"tutor": Tutor, "paciente": Paciente, "consulta": Consulta}
+
+    def _indexar_dependentes(self, tipo, ids):
+        if not ids:
+            return
+        if tipo == "tutor":
+            pacientes = Paciente.objects.filter(tutor_id__in=ids)
+            self.indexar("paciente", pacientes.values_list("pk", flat=True))
+        elif tipo == "paciente":
+            consultas = Consulta.objects.filter(paciente_id__in=ids)
+            self.indexar("consulta", consultas.values_list("pk", flat=True))
+
+    def _documentos(self, tipo: str, ids: List[int]) -> Iterator[Documento]:
+        """
+        Monta rótulo, detalhe e tokens de cada registro.
+
+        Só os campos usados são lidos (only()), sem carregar as fichas
+        inteiras. A migração 0017 tem uma cópia desta montagem, sobre os
+        modelos históricos.
+        """
+        if tipo == "tutor":
+            tutores = Tutor.objects.filter(pk__in=ids).only("nome_completo", "cpf")
+            for tutor in tutores:
+                tokens = self._pesar(tokenizar(tutor.nome_completo), PESO_NOME)
+                tokens += self._pesar([compactar(tutor.cpf)], PESO_IDENTIFICADOR)
+                rotulo, detalhe = tutor.nome_completo, tutor.cpf or ""
+                yield tutor.pk, rotulo, detalhe, self._unicos(tokens)
+
+        elif tipo == "paciente":
+            pacientes = (
+                Paciente.objects.filter(pk__in=ids)
+                .select_related("tutor")
+                .only("nome", "microchip", "especie", "tutor__nome_completo")
+            )
+            for paciente in pacientes:
+                tutor = paciente.tutor.nome_completo
+                tokens = self._pesar(tokenizar(paciente.nome), PESO_NOME)
+                tokens += self._pesar(
+                    [compactar(paciente.microchip)], PESO_IDENTIFICADOR
+                )
+                tokens += self._pesar(tokenizar(tutor), PESO_RELACIONADO)
+                detalhe = f"{paciente.get_especie_display()} - Tutor: {tutor}"
+                yield paciente.pk, paciente.nome, detalhe, self._unicos(tokens)
+
+        elif tipo == "consulta":
+            consultas = (
+                Consulta.objects.filter(pk__in=ids)
+                .select_related("paciente__tutor")
+                .only(
+                    "data_hora_agendamento",
+                    "tipo_consulta",
+                    "paciente__nome",
+                    "paciente__tutor__nome_completo",
+                )
+            )
+            for consulta in consultas:
+                paciente, tutor = consulta.paciente, consulta.paciente.tutor
+                tokens = self._pesar(
+                    tokenizar(f"{paciente.nome} {tutor.nome_completo}"),
+                    PESO_RELACIONADO,
+                )
+                detalhe = (
+                    f"{consulta.get_tipo_consulta_display()} - "
+                    f"Tutor: {tutor.nome_completo}"
+                )
+                yield consulta.pk, str(consulta), detalhe, self._unicos(tokens)
+
+    @staticmethod
+    def _pesar(tokens, peso):
+        return [(token, peso) for token in tokens if token]
+
+    @staticmethod
+    def _unicos(tokens):
+        """Mantém cada token uma vez, com o maior peso."""
+        pesos: Dict[str, int] = {}
+        for token, peso in tokens:
+            pesos[token] = max(peso, pesos.get(token, 0))
+        return list(pesos.items())
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def termos(self, consulta: str) -> List[str]:
+        """
+        Termos usados na busca, do mais longo (mais seletivo) ao mais curto.
+
+        Um termo só de dígitos e separadores ('123.456.789-00') vira um
+        único termo compacto, como CPF e microchip são indexados.
+        """
+        if _RE_NUMERICO.fullmatch(consulta.strip() or "-"):
+            termos = [compactar(consulta)]
+        else:
+            termos = tokenizar(consulta)
+        termos = {termo for termo in termos if len(termo) >= BUSCA_TAMANHO_MINIMO}
+        return sorted(termos, key=len, reverse=True)[:BUSCA_MAX_TERMOS]
+
+    def buscar(self, consulta: str, limite: int = BUSCA_LIMITE_PADRAO) -> dict:
+        """
+        Busca registros cujos tokens começam com todos os termos informados.
+
+        Cada termo lê no máximo BUSCA_MAX_CANDIDATOS linhas do índice (a
+        partir do token exato, em ordem) e a busca para de refinar os
+        candidatos quando o orçamento de BUSCA_ORCAMENTO_MS se esgota.
+
+        Returns:
+            Dict com 'resultados' (tipo, id, rotulo, detalhe, score, em ordem
+            de relevância) e 'parcial' (True se algum limite foi atingido)
+        """
+        inicio = time.monotonic()
+        candidatos: Optional[set] = None
+        scores: Dict[int, int] = defaultdict(int)
+        parcial = False
+
+        for termo in self.termos(consulta):
+            if candidatos is not None:
+                if not candidatos:
+                    break
+                if (time.monotonic() - inicio) * 1000 > BUSCA_ORCAMENTO_MS:
+                    parcial = True
+                    break
+
+            # Intervalo [termo, fim): prefixo usando o índice
+            linhas = TokenBusca.objects.filter(token__gte=termo)
+            fim = limite_prefixo(termo)
+            if fim is not None:
+                linhas = linhas.filter(token__lt=fim)
+            if termo.endswith(tuple(_SEM_SUCESSOR)):
+                # Intervalo alargado ('luiz' -> 'luj'): o LIKE descarta o
+                # que não começa com o termo
+                linhas = linhas.filter(token__startswith=termo)
+            if candidatos is not None:
+                linhas = linhas.filter(item_id__in=candidatos)
+            linhas = list(
+                linhas.order_by("token").values_list("item_id", "token", "peso")[
+                    :BUSCA_MAX_CANDIDATOS
+                ]
+            )
+            parcial = parcial or len(linhas) == BUSCA_MAX_CANDIDATOS
+
+            # Melhor pontuação do termo em cada item (token exato vale o dobro)
+            melhores: Dict[int, int] = {}
+            for item_id, token, peso in linhas:
+                pontos = peso * 2 if token == termo else peso
+                melhores[item_id] = max(pontos, melhores.get(item_id, 0))
+            for item_id, pontos in melhores.items():
+                scores[item_id] += pontos
+            candidatos = (
+                set(melhores) if candidatos is None else candidatos & set(melhores)
+            )
+
+        if not candidatos:
+            return {"resultados": [], "parcial": parcial}
+
+        melhores_ids = sorted(candidatos, key=lambda item_id: -scores[item_id])
+        itens = ItemBusca.objects.in_bulk(melhores_ids[:limite])
+        ordem_tipo = {tipo: posicao for posicao, tipo in enumerate(self.tipos)}
+        resultados = sorted(
+            itens.values(),
+            key=lambda item: (-scores[item.pk], ordem_tipo[item.tipo], item.rotulo),
+        )
+        return {
+            "resultados": [
+                {
+                    "tipo": item.tipo,
+                    "id": item.objeto_id,
+                    "rotulo": item.rotulo,
+                    "detalhe": item.detalhe,
+                    "score": scores[item.pk],
+                }
+                for item in resultados
+            ],
+            "parcial": parcial,
+        }
@@ -12,7 +12,12 @@ Princípios aplicados:
 import logging
 from typing import List, Optional
 
+from django.db import transaction
+from django.utils import timezone
+
+from ..cache import incrementar_versao_tabela
 from ..models import Consulta, Doenca, Sintoma
+from .historico_service import HistoricoPacienteService
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +101,66 @@ class ConsultaService:
 
         return doencas_sugeridas
 
+    def processar_diagnosticos_em_lote(
+        self, consulta_ids: List[int], tamanho_lote: int = 1000
+    ) -> int:
+        """
+        Recalcula os diagnósticos suspeitos de muitas consultas em lote.
+
+        Diferente de processar_diagnosticos(), não instancia as consultas:
+        lê os sintomas direto da tabela de associação, calcula os scores com
+        a base de conhecimento carregada uma vez por lote e regrava as
+        suspeitas com bulk_create.
+
+        Args:
+            consulta_ids: IDs das consultas a processar
+            tamanho_lote: Quantidade de consultas processadas por vez
+
+        Returns:
+            Total de associações de diagnóstico suspeito gravadas
+        """
+        SintomasConsulta = Consulta.sintomas_apresentados.through
+        SuspeitasConsulta = Consulta.diagnosticos_suspeitos.through
+        total = 0
+
+        for inicio in range(0, len(consulta_ids), tamanho_lote):
+            lote = consulta_ids[inicio : inicio + tamanho_lote]
+            sintomas_por_consulta = {consulta_id: set() for consulta_id in lote}
+            for consulta_id, sintoma_id in SintomasConsulta.objects.filter(
+                consulta_id__in=lote
+            ).values_list("consulta_id", "sintoma_id"):
+                sintomas_por_consulta[consulta_id].add(sintoma_id)
+
+            sugestoes = self.diagnostico_service.sugerir_diagnosticos_em_lote(
+                sintomas_por_consulta
+            )
+
+            with transaction.atomic():
+                SuspeitasConsulta.objects.filter(consulta_id__in=lote).delete()
+                novas = SuspeitasConsulta.objects.bulk_create(
+                    [
+                        SuspeitasConsulta(consulta_id=consulta_id, doenca_id=doenca_id)
+                        for consulta_id, doencas_ids in sugestoes.items()
+                        for doenca_id in doencas_ids
+                    ]
+                )
+                # Marca as consultas como alteradas para a sincronização
+                Consulta.objects.filter(pk__in=lote).update(
+                    data_ultima_modificacao=timezone.now()
+                )
+                incrementar_versao_tabela("consulta")
+                HistoricoPacienteService.invalidar(
+                    Consulta.objects.filter(pk__in=lote)
+                    .values_list("paciente_id", flat=True)
+                    .distinct()
+                )
+            total += len(novas)
+
+        logger.info(
+            f"Diagnósticos em lote: {len(consulta_ids)} consultas, {total} suspeitas"
+        )
+        return total
+
     def criar_consulta_com_diagnosticos(
         self, consulta: Consulta, sintomas_ids: Optional[List[int]] = None
     ) -> Consulta:
@@ -0,0 +1,204 @@
+"""
+Serviço de Contadores
+
+Mantém as colunas de contagem desnormalizadas (Paciente.total_consultas,
+Veterinario.total_consultas, Tutor.total_pacientes e Doenca.total_sintomas),
+usadas nas listagens, filtros e ordenações sem COUNT por linha.
+
+Princípios aplicados:
+- Gravações individuais ajustam o contador com UPDATE ... SET campo =
+  campo + 1 (expressões F()), atômico mesmo com requisições concorrentes
+- Operações em lote e associações many-to-many recontam os registros
+  afetados com uma subconsulta COUNT
+- reconciliar() (comando reconciliar_contadores) corrige qualquer desvio
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..cache import incrementar_versao_tabela
+from ..models import Consulta, Doenca, Paciente, Tutor, Veterinario
+
+logger = logging.getLogger(__name__)
+
+
+class Contador(NamedTuple):
+    modelo: type  # Tabela que guarda o contador
+    campo: str  # Coluna do contador
+    contado: type  # Tabela cujos registros são contados
+    fk: str  # Coluna de 'contado' que aponta para 'modelo'
+
+
+CONTADORES = {
+    "paciente.total_consultas": Contador(
+        Paciente, "total_consultas", Consulta, "paciente_id"
+    ),
+    "veterinario.total_consultas": Contador(
+        Veterinario, "total_consultas", Consulta, "veterinario_responsavel_id"
+    ),
+    "tutor.total_pacientes": Contador(Tutor, "total_pacientes", Paciente, "tutor_id"),
+    "doenca.total_sintomas": Contador(
+        Doenca, "total_sintomas", Doenca.sintomas_associados.through, "doenca_id"
+    ),
+}
+
+
+def campos_rastreados(modelo) -> List[str]:
+    """Colunas de 'modelo' cujas mudanças alteram algum contador."""
+    return [
+        contador.fk for contador in CONTADORES.values() if contador.contado is modelo
+    ]
+
+
+class ContadorService:
+    """
+    Serviço para manter e reconciliar os contadores.
+
+    Example:
+        >>> service = ContadorService()
+        >>> service.registrar_gravacao(consulta, criado=True)
+        >>> service.reconciliar()
+        {'paciente.total_consultas': 0, ...}
+    """
+
+    contadores = CONTADORES
+
+    # ------------------------------------------------------------------
+    # Gravações individuais (sinais)
+    # ------------------------------------------------------------------
+
+    def registrar_gravacao(
+        self, objeto, criado: bool = False, originais: Optional[dict] = None
+    ) -> None:
+        """
+        Ajusta os contadores após salvar um registro contado.
+
+        Args:
+            objeto: Registro salvo (ex: uma Consulta)
+            criado: True se o registro acabou de ser inserido
+            originais: Valores das colunas rastreadas quando o registro foi
+                carregado (colunas ausentes não são ajustadas)
+        """
+        originais = originais or {}
+        for nome, contador in self._contadores_de(type(objeto)):
+            novo = objeto.__dict__.get(contador.fk)
+            if criado:
+                self.ajustar(nome, {novo: 1})
+            elif contador.fk in originais and originais[contador.fk] != novo:
+                self.ajustar(nome, {originais[contador.fk]: -1, novo: 1})
+
+    def registrar_remocao(self, objeto) -> None:
+        """Ajusta os contadores após remover um registro contado."""
+        for nome, contador in self._contadores_de(type(objeto)):
+            self.ajustar(nome, {objeto.__dict__.get(contador.fk): -1})
+
+    def ajustar(self, nome: str, deltas: Dict[Optional[int], int]) -> None:
+        """
+        Soma 'delta' ao contador de cada registro com um UPDATE por delta.
+
+        Args:
+            nome: Chave em CONTADORES (ex: 'paciente.total_consultas')
+            deltas: {pk: delta}; chaves None (FK vazia) são ignoradas
+        """
+        contador = self.contadores[nome]
+        por_delta = defaultdict(list)
+        for pk, delta in deltas.items():
+            if pk is not None and delta:
+                por_delta[delta].append(pk)
+        for delta, pks in por_delta.items():
+            contador.modelo.objects.filter(pk__in=pks).update(
+                **{contador.campo: F(contador.campo) + delta}
+            )
+        if por_delta:
+            incrementar_versao_tabela(contador.modelo._meta.model_name)
+
+    # ------------------------------------------------------------------
+    # Recontagem (lotes, many-to-many e reconciliação)
+    # ------------------------------------------------------------------
+
+    def recontar(self, nome: str, ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recalcula o contador dos registros informados (todos por padrão)
+        com um único UPDATE com subconsulta.
+
+        Returns:
+            Quantidade de registros atualizados
+        """
+        contador = self.contadores[nome]
+        registros = contador.modelo.objects.all()
+        if ids is not None:
+            ids = {pk for pk in ids if pk is not None}
+            if not ids:
+                return 0
+            registros = registros.filter(pk__in=ids)
+        atualizados = registros.update(**{contador.campo: self._contagem(contador)})
+        if atualizados:
+            incrementar_versao_tabela(contador.modelo._meta.model_name)
+        return atualizados
+
+    def recontar_afetados(self, objetos: List) -> None:
+        """
+        Reconta os contadores que dependem dos registros gravados em lote
+        (bulk_create/bulk_update), inclusive os do valor anterior da FK.
+        """
+        if not objetos:
+            return
+        for nome, contador in self._contadores_de(type(objetos[0])):
+            ids = set()
+            for objeto in objetos:
+                ids.add(objeto.__dict__.get(contador.fk))
+                originais = getattr(objeto, "_valores_originais", {})
+                ids.add(originais.get(contador.fk))
+            self.recontar(nome, ids)
+
+    def reconciliar(
+        self, nomes: Optional[Iterable[str]] = None, corrigir: bool = True
+    ) -> Dict[str, int]:
+        """
+        Compara cada contador com a contagem real e corrige os divergentes.
+
+        Args:
+            nomes: Contadores a verificar (todos por padrão)
+            corrigir: Se False, apenas conta as divergências
+
+        Returns:
+            Dict {contador: quantidade de registros divergentes}
+        """
+        resumo = {}
+        for nome in nomes or self.contadores:
+            contador = self.contadores[nome]
+            divergentes = list(
+                contador.modelo.objects.annotate(real=self._contagem(contador))
+                .exclude(**{contador.campo: F("real")})
+                .values_list("pk", flat=True)
+            )
+            if divergentes and corrigir:
+                self.recontar(nome, divergentes)
+            resumo[nome] = len(divergentes)
+            if divergentes:
+                logger.warning(f"Contador {nome}: {len(divergentes)} divergentes")
+        return resumo
+
+    def _contadores_de(self, modelo):
+        return [
+            (nome, contador)
+            for nome, contador in self.contadores.items()
+            if contador.contado is modelo
+        ]
+
+    @staticmethod
+    def _contagem(contador: Contador):
+        """Subconsulta COUNT dos registros contados de cada linha."""
+        contagem = (
+            contador.contado.objects.filter(**{contador.fk: OuterRef("pk")})
+            .order_by()
+            .values(contador.fk)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(contagem), 0)
+
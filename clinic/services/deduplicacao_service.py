@@ -0,0 +1,398 @@
+"""
+Serviço de Deduplicação de Tutores
+
+Encontra cadastros duplicados de tutores (a mesma pessoa cadastrada mais
+de uma vez, com outro e-mail ou telefone) e funde cada grupo no cadastro
+mais antigo, transferindo os pacientes em lote.
+
+Princípios aplicados:
+- Sem comparação par a par de todos os tutores: só são comparados os
+  pares que compartilham uma chave de bloco (banda do MinHash dos
+  trigramas do nome, telefone, primeiro + último nome ou CEP)
+- Blocos maiores que DEDUPE_MAX_BLOCO (nomes ou CEPs muito comuns) são
+  ignorados, mantendo o custo proporcional à quantidade de tutores
+- Os tutores são lidos uma vez, em blocos, como tuplas (values_list)
+- O plano pode ser revisado antes de aplicado (dry-run do comando)
+"""
+
+import logging
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from ..cache import incrementar_versao_tabela
+from ..constants import (
+    DEDUPE_BANDAS,
+    DEDUPE_LIMIAR_PADRAO,
+    DEDUPE_LINHAS_POR_BANDA,
+    DEDUPE_MAX_BLOCO,
+    DEDUPE_PESO_CEP,
+    DEDUPE_PESO_EMAIL,
+    DEDUPE_PESO_NOME,
+    DEDUPE_PESO_TELEFONE,
+    DEDUPE_TAMANHO_SHINGLE,
+)
+from ..models import Paciente, Tutor
+from .busca_service import BuscaService, compactar, tokenizar
+from .contador_service import ContadorService
+
+logger = logging.getLogger(__name__)
+
+# Partículas ignoradas na comparação de nomes ('Maria da Silva')
+PARTICULAS = {"de", "da", "do", "das", "dos", "e"}
+
+# Dígitos finais do telefone usados como chave (sem DDD e sem o nono dígito)
+DIGITOS_TELEFONE = 8
+
+# Campos copiados de um duplicado para o cadastro principal quando vazios.
+# Os telefones são tratados juntos: só entram números que o principal não tem
+CAMPOS_TELEFONE = ("telefone_principal", "telefone_secundario")
+CAMPOS_COMPLEMENTARES = (
+    "email",
+    "endereco_rua",
+    "endereco_numero",
+    "endereco_complemento",
+    "endereco_bairro",
+    "endereco_cidade",
+    "endereco_uf",
+    "endereco_cep",
+)
+
+# Permutações do MinHash: (a * h + b) mod primo de Mersenne, com
+# coeficientes fixos para que o plano seja reproduzível entre execuções
+_PRIMO = (1 << 61) - 1
+_gerador = random.Random(20240611)
+_PERMUTACOES = [
+    (_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO))
+    for _ in range(DEDUPE_BANDAS * DEDUPE_LINHAS_POR_BANDA)
+]
+
+_RE_NAO_DIGITO = re.compile(r"\D+")
+
+
+class FusaoTutores(NamedTuple):
+    principal: int  # Tutor mantido (o cadastro mais antigo do grupo)
+    duplicados: Tuple[int, ...]  # Tutores fundidos no principal
+    score: float  # Menor score entre os pares que formaram o grupo
+
+
+class _Tutor(NamedTuple):
+    id: int
+    nome: str  # Nome normalizado, sem partículas
+    telefones: Tuple[str, ...]
+    email: str  # Parte local do e-mail, normalizada
+    cep: str
+
+
+def normalizar_nome(nome: Optional[str]) -> str:
+    """Nome sem acentos, pontuação e partículas ('José da Silva' -> 'jose silva')."""
+    return " ".join(token for token in tokenizar(nome) if token not in PARTICULAS)
+
+
+def shingles(nome: str) -> set:
+    """Trigramas de caracteres do nome normalizado."""
+    if len(nome) <= DEDUPE_TAMANHO_SHINGLE:
+        return {nome} if nome else set()
+    return {
+        nome[inicio : inicio + DEDUPE_TAMANHO_SHINGLE]
+        for inicio in range(len(nome) - DEDUPE_TAMANHO_SHINGLE + 1)
+    }
+
+
+def assinatura_minhash(conjunto: Iterable[str]) -> List[int]:
+    """Assinatura MinHash (um mínimo por permutação) de um conjunto."""
+    hashes = [zlib.crc32(item.encode()) for item in conjunto]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIMO for h in hashes) for a, b in _PERMUTACOES]
+
+
+def jaccard(primeiro: set, segundo: set) -> float:
+    if not primeiro or not segundo:
+        return 0.0
+    return len(primeiro & segundo) / len(primeiro | segundo)
+
+
+def _digitos(valor: Optional[str]) -> str:
+    return _RE_NAO_DIGITO.sub("", valor or "")
+
+
+class DeduplicacaoTutoresService:
+    """
+    Serviço para planejar e aplicar a fusão de tutores duplicados.
+
+    Example:
+        >>> service = DeduplicacaoTutoresService()
+        >>> plano = service.planejar()
+        >>> plano[0]
+        FusaoTutores(principal=12, duplicados=(845,), score=0.85)
+        >>> service.aplicar(plano)
+        {'tutores_removidos': 1, 'pacientes_transferidos': 2}
+    """
+
+    def __init__(self, limiar: float = DEDUPE_LIMIAR_PADRAO, lote: int = 2000):
+        self.limiar = limiar
+        self.lote = lote
+
+    # ------------------------------------------------------------------
+    # Plano
+    # ------------------------------------------------------------------
+
+    def planejar(self) -> List[FusaoTutores]:
+        """
+        Gera o plano de fusão (sem alterar o banco).
+
+        Returns:
+            Grupos de duplicados, cada um com o tutor principal, em ordem
+            do principal
+        """
+        tutores, chaves = self._carregar()
+        pares = self._candidatos(chaves)
+        logger.info(
+            f"Deduplicação: {len(tutores)} tutores, {len(pares)} pares candidatos"
+        )
+
+        aceitos = []
+        for primeiro, segundo in pares:
+            score = self.pontuar(tutores[primeiro], tutores[segundo])
+            if score >= self.limiar:
+                aceitos.append((primeiro, segundo, score))
+        plano = self._agrupar(tutores, aceitos)
+        logger.info(f"Deduplicação: {len(plano)} grupos de duplicados")
+        return plano
+
+    @staticmethod
+    def pontuar(primeiro: _Tutor, segundo: _Tutor) -> float:
+        """
+        Score de 0 a 1 de dois cadastros serem a mesma pessoa: similaridade
+        dos nomes (Jaccard dos trigramas) mais evidências de contato.
+        """
+        score = DEDUPE_PESO_NOME * jaccard(
+            shingles(primeiro.nome), shingles(segundo.nome)
+        )
+        if set(primeiro.telefones) & set(segundo.telefones):
+            score += DEDUPE_PESO_TELEFONE
+        if primeiro.cep and primeiro.cep == segundo.cep:
+            score += DEDUPE_PESO_CEP
+        if primeiro.email and primeiro.email == segundo.email:
+            score += DEDUPE_PESO_EMAIL
+        return round(score, 4)
+
+    def _carregar(self) -> Tuple[List[_Tutor], List[List[Tuple]]]:
+        """
+        Lê os tutores (do mais antigo para o mais novo) e calcula as chaves
+        de bloco de cada um.
+
+        Returns:
+            (tutores, chaves), com chaves[familia][posição do tutor] = tupla
+            das chaves do tutor naquela família
+        """
+        tutores = []
+        familias = DEDUPE_BANDAS + 3  # bandas, telefone, nome, CEP
+        chaves = [[] for _ in range(familias)]
+        assinaturas = {}  # Nomes repetidos são comuns: assinatura calculada 1x
+
+        registros = (
+            Tutor.objects.order_by("data_cadastro", "pk")
+            .values_list(
+                "pk",
+                "nome_completo",
+                "telefone_principal",
+                "telefone_secundario",
+                "email",
+                "endereco_cep",
+            )
+            .iterator(chunk_size=self.lote)
+        )
+        for pk, nome, telefone, telefone_2, email, cep in registros:
+            nome = normalizar_nome(nome)
+            telefones = tuple(
+                {
+                    digitos[-DIGITOS_TELEFONE:]
+                    for digitos in (_digitos(telefone), _digitos(telefone_2))
+                    if len(digitos) >= DIGITOS_TELEFONE
+                }
+            )
+            email = compactar((email or "").split("@")[0])
+            tutor = _Tutor(pk, nome, telefones, email, _digitos(cep))
+            tutores.append(tutor)
+
+            if nome not in assinaturas:
+                assinaturas[nome] = self._bandas(nome)
+            for banda, chave in enumerate(assinaturas[nome]):
+                chaves[banda].append((chave,) if chave is not None else ())
+            tokens = nome.split()
+            chaves[-3].append(telefones)
+            chaves[-2].append((f"{tokens[0]} {tokens[-1]}",) if tokens else ())
+            chaves[-1].append((tutor.cep,) if tutor.cep else ())
+        return tutores, chaves
+
+    @staticmethod
+    def _bandas(nome: str) -> List[Optional[int]]:
+        """Chave de cada banda da assinatura MinHash do nome."""
+        assinatura = assinatura_minhash(shingles(nome))
+        if not assinatura:
+            return [None] * DEDUPE_BANDAS
+        linhas = DEDUPE_LINHAS_POR_BANDA
+        return [
+            hash(tuple(assinatura[inicio : inicio + linhas]))
+            for inicio in range(0, DEDUPE_BANDAS * linhas, linhas)
+        ]
+
+    @staticmethod
+    def _candidatos(chaves: List[List[Tuple]]) -> List[Tuple[int, int]]:
+        """
+        Pares de tutores (posições) que compartilham alguma chave de bloco,
+        uma família de chaves por vez para limitar a memória.
+        """
+        pares = set()
+        for familia in chaves:
+            blocos = defaultdict(list)
+            for posicao, chaves_tutor in enumerate(familia):
+                for chave in chaves_tutor:
+                    blocos[chave].append(posicao)
+            for bloco in blocos.values():
+                if len(bloco) < 2 or len(bloco) > DEDUPE_MAX_BLOCO:
+                    continue
+                for indice, primeiro in enumerate(bloco):
+                    for segundo in bloco[indice + 1 :]:
+                        pares.add((primeiro, segundo))
+        return sorted(pares)
+
+    @staticmethod
+    def _agrupar(tutores: List[_Tutor], aceitos) -> List[FusaoTutores]:
+        """Une os pares aceitos em grupos (union-find); o principal é o
+        tutor mais antigo, que é a menor posição do grupo."""
+        pais = {}
+
+        def raiz(posicao):
+            pais.setdefault(posicao, posicao)
+            while pais[posicao] != posicao:
+                pais[posicao] = pais[pais[posicao]]
+                posicao = pais[posicao]
+            return posicao
+
+        for primeiro, segundo, _ in aceitos:
+            raiz_1, raiz_2 = raiz(primeiro), raiz(segundo)
+            if raiz_1 != raiz_2:
+                pais[max(raiz_1, raiz_2)] = min(raiz_1, raiz_2)
+
+        grupos = defaultdict(list)
+        scores = {}
+        for posicao in list(pais):
+            grupos[raiz(posicao)].append(posicao)
+        for primeiro, _, score in aceitos:
+            grupo = raiz(primeiro)
+            scores[grupo] = min(scores.get(grupo, score), score)
+
+        return [
+            FusaoTutores(
+                principal=tutores[principal].id,
+                duplicados=tuple(
+                    tutores[posicao].id
+                    for posicao in sorted(membros)
+                    if posicao != principal
+                ),
+                score=scores[principal],
+            )
+            for principal, membros in sorted(grupos.items())
+        ]
+
+    # ------------------------------------------------------------------
+    # Fusão
+    # ------------------------------------------------------------------
+
+    def aplicar(self, plano: List[FusaoTutores]) -> Dict[str, int]:
+        """
+        Funde os grupos do plano: transfere os pacientes dos duplicados para
+        o principal (UPDATE em lote), completa os campos vazios do principal
+        com os dos duplicados e remove os duplicados.
+
+        Returns:
+            Dict com 'tutores_removidos' e 'pacientes_transferidos'
+        """
+        destino = {
+            duplicado: fusao.principal
+            for fusao in plano
+            for duplicado in fusao.duplicados
+        }
+        if not destino:
+            return {"tutores_removidos": 0, "pacientes_transferidos": 0}
+        principais = sorted({fusao.principal for fusao in plano})
+        duplicados = list(destino)
+        agora = timezone.now()
+
+        with transaction.atomic():
+            pacientes = []
+            for inicio in range(0, len(duplicados), self.lote):
+                bloco = duplicados[inicio : inicio + self.lote]
+                registros = Paciente.objects.filter(tutor_id__in=bloco)
+                pacientes += registros.values_list("pk", flat=True)
+                registros.update(
+                    tutor_id=Case(
+                        *[When(tutor_id=pk, then=Value(destino[pk])) for pk in bloco],
+                        output_field=IntegerField(),
+                    ),
+                    data_atualizacao=agora,
+                )
+
+            complementos = self._complementos(plano)
+            Tutor.objects.filter(pk__in=duplicados).delete()
+            for principal, campos in complementos.items():
+                Tutor.objects.filter(pk=principal).update(
+                    **campos, data_atualizacao=agora
+                )
+
+            # UPDATE em lote não dispara sinais: dados derivados atualizados aqui
+            ContadorService().recontar("tutor.total_pacientes", principais)
+            busca = BuscaService()
+            busca.indexar("tutor", principais, cascata=False)
+            busca.indexar("paciente", pacientes)
+            incrementar_versao_tabela("tutor", "paciente")
+
+        resumo = {
+            "tutores_removidos": len(duplicados),
+            "pacientes_transferidos": len(pacientes),
+        }
+        logger.info(f"Deduplicação aplicada: {resumo}")
+        return resumo
+
+    @staticmethod
+    def _complementos(plano: List[FusaoTutores]) -> Dict[int, dict]:
+        """Campos vazios de cada principal preenchidos pelos duplicados
+        (do mais antigo para o mais novo)."""
+        ids = [pk for fusao in plano for pk in (fusao.principal, *fusao.duplicados)]
+        valores = {
+            registro["pk"]: registro
+            for registro in Tutor.objects.filter(pk__in=ids).values(
+                "pk", *CAMPOS_TELEFONE, *CAMPOS_COMPLEMENTARES
+            )
+        }
+        complementos = {}
+        for fusao in plano:
+            principal = valores.get(fusao.principal)
+            if principal is None:
+                continue
+            campos = {}
+            conhecidos = {_digitos(principal[campo]) for campo in CAMPOS_TELEFONE}
+            vagas = [campo for campo in CAMPOS_TELEFONE if not principal[campo]]
+            for duplicado in fusao.duplicados:
+                registro = valores.get(duplicado, {})
+                for campo in CAMPOS_TELEFONE:
+                    telefone = registro.get(campo)
+                    if vagas and telefone and _digitos(telefone) not in conhecidos:
+                        campos[vagas.pop(0)] = telefone
+                        conhecidos.add(_digitos(telefone))
+                for campo in CAMPOS_COMPLEMENTARES:
+                    valor = registro.get(campo)
+                    if valor and not principal[campo] and campo not in campos:
+                        campos[campo] = valor
+            if campos:
+                complementos[fusao.principal] = campos
+        return complementos
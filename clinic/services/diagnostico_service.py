@@ -10,7 +10,7 @@ Princípios aplicados:
 """
 
 import logging
-from typing import List
+from typing import Dict, List, Set, Tuple
 
 from ..models import Doenca, Sintoma
 
@@ -136,38 +136,107 @@ class DiagnosticoService:
         if not sintomas_da_doenca:
             return 0.0
 
-        sintomas_em_comum = sintomas_apresentados_set.intersection(
-            sintomas_da_doenca
+        score = self._score_por_conjuntos(
+            sintomas_da_doenca, sintomas_apresentados_set
         )
 
+        logger.debug(f"Doença: {doenca.nome} | SCORE: {score:.2f}")
+
+        return score
+
+    def _score_por_conjuntos(
+        self, sintomas_da_doenca: set, sintomas_apresentados: set
+    ) -> float:
+        """
+        Calcula o score entre dois conjuntos de sintomas.
+
+        Os conjuntos podem conter objetos Sintoma ou apenas IDs, o que permite
+        reutilizar a mesma fórmula no processamento em lote.
+
+        Args:
+            sintomas_da_doenca: Conjunto de sintomas associados à doença
+            sintomas_apresentados: Conjunto de sintomas do paciente
+
+        Returns:
+            Score composto (0.0 a 100.0+), ou 0.0 se não houver interseção
+        """
+        if not sintomas_da_doenca or not sintomas_apresentados:
+            return 0.0
+
+        sintomas_em_comum = sintomas_apresentados.intersection(sintomas_da_doenca)
+
         if not sintomas_em_comum:
             return 0.0
 
         # Cobertura: % dos sintomas da doença que o paciente tem
         cobertura = len(sintomas_em_comum) / len(sintomas_da_doenca)
-        
+
         # Precisão: % dos sintomas do paciente que pertencem à doença
-        precisao = len(sintomas_em_comum) / len(sintomas_apresentados_set)
-        
+        precisao = len(sintomas_em_comum) / len(sintomas_apresentados)
+
         # Score balanceado usando média harmônica (F1-Score)
         # Prioriza casos onde ambos cobertura e precisão são altos
-        if cobertura + precisao == 0:
-            score = 0.0
-        else:
-            f1_score = 2 * (cobertura * precisao) / (cobertura + precisao)
-            # Multiplica por 100 para ter valores mais legíveis
-            # Adiciona um pequeno bônus pela quantidade absoluta de sintomas
-            score = (f1_score * 100) + (len(sintomas_em_comum) * 0.1)
+        f1_score = 2 * (cobertura * precisao) / (cobertura + precisao)
+        # Multiplica por 100 para ter valores mais legíveis
+        # Adiciona um pequeno bônus pela quantidade absoluta de sintomas
+        return (f1_score * 100) + (len(sintomas_em_comum) * 0.1)
+
+    def sugerir_diagnosticos_em_lote(
+        self, sintomas_por_consulta: Dict[int, Set[int]]
+    ) -> Dict[int, List[int]]:
+        """
+        Sugere diagnósticos para várias consultas de uma só vez.
 
-        logger.debug(
-            f"Doença: {doenca.nome} | "
-            f"Sintomas em comum: {len(sintomas_em_comum)} | "
-            f"Cobertura: {cobertura:.2f} | "
-            f"Precisão: {precisao:.2f} | "
-            f"SCORE: {score:.2f}"
+        A base de conhecimento é carregada uma única vez (duas consultas ao
+        banco) e o cálculo é feito apenas com IDs, sem instanciar modelos.
+
+        Args:
+            sintomas_por_consulta: {consulta_id: conjunto de IDs de sintomas}
+
+        Returns:
+            {consulta_id: lista de IDs de Doenca ordenada por score decrescente}
+        """
+        Associacao = Doenca.sintomas_associados.through
+        sintomas_por_doenca: Dict[int, Set[int]] = {}
+        for doenca_id, sintoma_id in Associacao.objects.values_list(
+            "doenca_id", "sintoma_id"
+        ):
+            sintomas_por_doenca.setdefault(doenca_id, set()).add(sintoma_id)
+
+        resultado = {}
+        for consulta_id, sintomas in sintomas_por_consulta.items():
+            ranking = self.ranquear_doencas(sintomas_por_doenca, sintomas)
+            resultado[consulta_id] = [doenca_id for doenca_id, _ in ranking]
+
+        logger.info(
+            f"Diagnósticos em lote calculados para {len(resultado)} consultas"
         )
+        return resultado
 
-        return score
+    def ranquear_doencas(
+        self, sintomas_por_doenca: Dict[int, Set[int]], sintomas: Set[int]
+    ) -> List[Tuple[int, float]]:
+        """
+        Calcula o ranking de doenças para um conjunto de IDs de sintomas.
+
+        Não acessa o banco: recebe a base de conhecimento já carregada, o que
+        permite usá-lo tanto no processamento em lote quanto nas views
+        assíncronas.
+
+        Args:
+            sintomas_por_doenca: {doenca_id: conjunto de IDs de sintomas}
+            sintomas: IDs dos sintomas apresentados
+
+        Returns:
+            Lista de (doenca_id, score) com score > 0, em ordem decrescente
+        """
+        scores = []
+        for doenca_id, sintomas_da_doenca in sintomas_por_doenca.items():
+            score = self._score_por_conjuntos(sintomas_da_doenca, sintomas)
+            if score > 0:
+                scores.append((doenca_id, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
 
     def _ordenar_por_score(self, suspeitas: List[dict]) -> List[Doenca]:
         """
@@ -0,0 +1,161 @@
+"""
+Serviço de Histórico Clínico do Paciente
+
+Monta a linha do tempo compacta das consultas de um paciente (data, tipo,
+veterinário, sintomas, diagnósticos e sinais vitais) para a tela de
+histórico, sem serializar as consultas completas.
+
+Princípios aplicados:
+- Duas consultas ao banco: as consultas do paciente (índice paciente +
+  data) e os nomes de sintomas/diagnósticos de todas elas em um UNION
+- Cache por paciente, invalidado quando uma consulta do paciente é gravada
+  ou removida (ver clinic.signals) ou quando a base de conhecimento muda
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Value
+from django.utils import timezone
+
+from ..cache import incrementar_versao_tabela, versoes_tabelas
+from ..constants import CACHE_RESPOSTA_TIMEOUT, TIPO_CONSULTA_CHOICES
+from ..models import Consulta, Paciente
+
+SINAIS_VITAIS = (
+    "temperatura_celsius",
+    "frequencia_cardiaca_bpm",
+    "frequencia_respiratoria_mpm",
+    "tpc_segundos",
+    "hidratacao_status",
+    "escore_condicao_corporal",
+)
+
+# Associações da consulta incluídas na linha do tempo:
+# (chave na resposta, relação many-to-many, campo do nome no through)
+ASSOCIACOES = (
+    ("sintomas", Consulta.sintomas_apresentados, "sintoma__nome"),
+    ("diagnosticos_suspeitos", Consulta.diagnosticos_suspeitos, "doenca__nome"),
+    ("diagnosticos_definitivos", Consulta.diagnosticos_definitivos, "doenca__nome"),
+)
+
+_TIPOS_CONSULTA = dict(TIPO_CONSULTA_CHOICES)
+
+
+def _tabela_historico(paciente_id) -> str:
+    """Tabela lógica (clinic.cache) do histórico de um paciente."""
+    return f"historico_paciente:{paciente_id}"
+
+
+class HistoricoPacienteService:
+    """
+    Serviço para obter a linha do tempo clínica de um paciente.
+
+    Example:
+        >>> HistoricoPacienteService().obter(paciente.id)["consultas"][0]
+        {'id': 7, 'data_hora': '2025-03-10T14:00:00-03:00', 'tipo': 'ROTINA', ...}
+    """
+
+    timeout = CACHE_RESPOSTA_TIMEOUT
+
+    @staticmethod
+    def invalidar(paciente_ids: Iterable[Optional[int]]) -> None:
+        """Descarta o histórico em cache dos pacientes informados."""
+        tabelas = {_tabela_historico(pk) for pk in paciente_ids if pk is not None}
+        if tabelas:
+            incrementar_versao_tabela(*tabelas)
+
+    def obter(self, paciente_id: int) -> Optional[dict]:
+        """
+        Retorna o histórico do paciente, do cache quando possível.
+
+        Returns:
+            Dict com 'paciente' e 'consultas' (da mais recente para a mais
+            antiga), ou None se o paciente não existe
+        """
+        tabela = _tabela_historico(paciente_id)
+        versoes = versoes_tabelas((tabela, "base_conhecimento"))
+        chave = (
+            f"clinic:historico:{paciente_id}:"
+            f"{versoes[tabela]}:{versoes['base_conhecimento']}"
+        )
+        historico = cache.get(chave)
+        if historico is None:
+            historico = self.montar(paciente_id)
+            if historico is None:
+                return None
+            cache.set(chave, historico, self.timeout)
+        return historico
+
+    def montar(self, paciente_id: int) -> Optional[dict]:
+        """
+        Monta o histórico direto do banco (sem cache).
+
+        Returns:
+            O mesmo formato de obter(), ou None se o paciente não existe
+        """
+        consultas = list(
+            Consulta.objects.filter(paciente_id=paciente_id)
+            .order_by("-data_hora_agendamento", "-id")
+            .values(
+                "id",
+                "data_hora_agendamento",
+                "tipo_consulta",
+                "veterinario_responsavel__nome_completo",
+                *SINAIS_VITAIS,
+            )
+        )
+        if not consultas and not Paciente.objects.filter(pk=paciente_id).exists():
+            return None
+
+        nomes = self._nomes_associados(paciente_id) if consultas else {}
+        return {
+            "paciente": paciente_id,
+            "consultas": [
+                self._entrada(consulta, nomes.get(consulta["id"], {}))
+                for consulta in consultas
+            ],
+        }
+
+    def _nomes_associados(self, paciente_id: int) -> dict:
+        """
+        Nomes de sintomas e diagnósticos de todas as consultas do paciente,
+        lidos em uma única consulta (UNION ALL das tabelas de associação).
+
+        Returns:
+            {consulta_id: {chave: [nomes em ordem alfabética]}}
+        """
+        partes = [
+            relacao.through.objects.filter(consulta__paciente_id=paciente_id)
+            .annotate(grupo=Value(chave))
+            .values_list("consulta_id", campo_nome, "grupo")
+            for chave, relacao, campo_nome in ASSOCIACOES
+        ]
+        nomes = defaultdict(lambda: defaultdict(list))
+        for consulta_id, nome, grupo in partes[0].union(*partes[1:], all=True):
+            nomes[consulta_id][grupo].append(nome)
+        return nomes
+
+    @staticmethod
+    def _entrada(consulta: dict, nomes: dict) -> dict:
+        """Converte uma linha da consulta no item da linha do tempo."""
+        entrada = {
+            "id": consulta["id"],
+            "data_hora": timezone.localtime(
+                consulta["data_hora_agendamento"]
+            ).isoformat(),
+            "tipo": consulta["tipo_consulta"],
+            "tipo_display": _TIPOS_CONSULTA.get(
+                consulta["tipo_consulta"], consulta["tipo_consulta"]
+            ),
+            "veterinario": consulta["veterinario_responsavel__nome_completo"],
+            "sinais_vitais": {campo: consulta[campo] for campo in SINAIS_VITAIS},
+        }
+        # Decimal como texto, como nos serializers da API
+        temperatura = consulta["temperatura_celsius"]
+        if temperatura is not None:
+            entrada["sinais_vitais"]["temperatura_celsius"] = str(temperatura)
+        for chave, _, _ in ASSOCIACOES:
+            entrada[chave] = sorted(nomes.get(chave, []), key=str.lower)
+        return entrada
@@ -0,0 +1,139 @@
+"""
+Serviço de Consulta por Identificador
+
+Localiza o cadastro dono de um CPF (tutor), microchip (paciente) ou CRMV
+(veterinário), digitado com ou sem pontuação, com uma única consulta ao
+banco por índice nas colunas normalizadas (cpf_digitos,
+microchip_normalizado e crmv_normalizado).
+
+Os resultados, inclusive "não encontrado", ficam em cache por
+IDENTIFICADOR_CACHE_TIMEOUT segundos e são descartados antes disso quando
+a tabela correspondente é alterada (ver clinic.cache).
+"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+
+from ..cache import versoes_tabelas
+from ..constants import (
+    IDENTIFICADOR_CACHE_TIMEOUT,
+    SEPARADORES_CPF,
+    SEPARADORES_CRMV,
+    SEPARADORES_MICROCHIP,
+)
+from ..models import Paciente, Tutor, Veterinario
+
+# Formatos (já sem separadores) reconhecidos por detectar(). Microchip:
+# ISO 11784/11785 com 15 dígitos, ou os formatos antigos de 9 dígitos (AVID)
+# e 10 caracteres hexadecimais. CRMV: número de registro com até 6 dígitos,
+# opcionalmente com a UF antes ou depois ('SP-12345', '12345/SP')
+_RE_CPF = re.compile(r"[0-9]{11}")
+_RE_CRMV = re.compile(r"[0-9]{1,6}|[A-Z]{2}[0-9]{1,6}|[0-9]{1,6}[A-Z]{2}")
+_RE_MICROCHIP = re.compile(r"[0-9]{15}|[0-9]{9}|[0-9A-F]{10}")
+
+_NAO_ENCONTRADO = "nao_encontrado"
+
+
+class TipoIdentificador(NamedTuple):
+    modelo: type
+    coluna: str  # Coluna normalizada (indexada) consultada
+    rotulo: str  # Campo exibido no resultado
+    separadores: str
+    formato: re.Pattern  # Valor normalizado aceito como deste tipo
+
+
+# Em ordem de detecção
+TIPOS = {
+    "cpf": TipoIdentificador(
+        Tutor, "cpf_digitos", "nome_completo", SEPARADORES_CPF, _RE_CPF
+    ),
+    "crmv": TipoIdentificador(
+        Veterinario, "crmv_normalizado", "nome_completo", SEPARADORES_CRMV, _RE_CRMV
+    ),
+    "microchip": TipoIdentificador(
+        Paciente, "microchip_normalizado", "nome", SEPARADORES_MICROCHIP, _RE_MICROCHIP
+    ),
+}
+
+
+def normalizar_identificador(valor: str, separadores: str) -> str:
+    """Remove os separadores e converte para maiúsculas, como no banco."""
+    for separador in separadores:
+        valor = valor.replace(separador, "")
+    return valor.upper()
+
+
+class IdentificadorService:
+    """
+    Serviço para detectar o tipo de um identificador e localizar o cadastro.
+
+    Example:
+        >>> IdentificadorService().localizar("123.456.789-09")
+        {'tipo': 'cpf', 'recurso': 'tutor', 'id': 4, 'rotulo': 'Ana Souza'}
+    """
+
+    tipos = TIPOS
+    timeout = IDENTIFICADOR_CACHE_TIMEOUT
+
+    def detectar(self, valor: str) -> Optional[Tuple[str, str]]:
+        """
+        Identifica o tipo do valor pelo formato, depois de remover os
+        separadores daquele tipo (os mesmos da coluna consultada).
+
+        - 11 dígitos: CPF
+        - até 6 dígitos, com ou sem a UF: CRMV
+        - 15 dígitos (ISO), 9 dígitos ou 10 caracteres hexadecimais: microchip
+
+        Returns:
+            Tupla (tipo, valor normalizado), ou None se não reconhecido
+        """
+        valor = (valor or "").strip()
+        for tipo, definicao in self.tipos.items():
+            normalizado = normalizar_identificador(valor, definicao.separadores)
+            if definicao.formato.fullmatch(normalizado):
+                return tipo, normalizado
+        return None
+
+    def localizar(self, valor: str) -> Optional[dict]:
+        """
+        Localiza o cadastro dono do identificador.
+
+        Returns:
+            Dict com 'tipo', 'recurso', 'id' e 'rotulo', ou None se não
+            encontrado
+
+        Raises:
+            ValueError: Se o tipo do identificador não for reconhecido
+        """
+        detectado = self.detectar(valor)
+        if detectado is None:
+            raise ValueError(valor)
+        tipo, normalizado = detectado
+        definicao = self.tipos[tipo]
+
+        tabela = definicao.modelo._meta.model_name
+        versao = versoes_tabelas((tabela,))[tabela]
+        chave = f"clinic:identificador:{tipo}:{versao}:{normalizado}"
+        resultado = cache.get(chave)
+        if resultado is None:
+            resultado = self._consultar(tipo, definicao, normalizado)
+            cache.set(chave, resultado or _NAO_ENCONTRADO, self.timeout)
+        return None if resultado == _NAO_ENCONTRADO else resultado
+
+    def _consultar(self, tipo, definicao, normalizado) -> Optional[dict]:
+        registro = (
+            definicao.modelo.objects.filter(**{definicao.coluna: normalizado})
+            .order_by()
+            .values_list("pk", definicao.rotulo)
+            .first()
+        )
+        if registro is None:
+            return None
+        return {
+            "tipo": tipo,
+            "recurso": definicao.modelo._meta.model_name,
+            "id": registro[0],
+            "rotulo": registro[1],
+        }
@@ -0,0 +1,629 @@
+"""
+Serviço de Importação
+
+Responsável pela importação em massa de tutores, pacientes e consultas a
+partir de exportações (CSV ou JSONL) de outras clínicas.
+
+Princípios aplicados:
+- SRP: Apenas responsável pelo fluxo de importação
+- Streaming: Os arquivos são lidos em lotes, nunca carregados inteiros
+- Paralelismo: A validação campo a campo (CPU) roda em um pool de processos;
+  a resolução de referências usa mapas em memória no processo principal
+"""
+
+import csv
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ..cache import incrementar_versao_tabela
+from ..constants import (
+    ERROR_TUTOR_CPF_INVALIDO,
+    ESPECIE_CHOICES,
+    SEXO_CHOICES,
+    STATUS_CHOICES,
+    TIPO_CONSULTA_CHOICES,
+)
+from ..models import Consulta, Paciente, Sintoma, Tutor, Veterinario
+from .busca_service import BuscaService
+from .contador_service import ContadorService
+from .historico_service import HistoricoPacienteService
+from .processos import inicializar_worker
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_TUTOR = [
+    "nome_completo",
+    "cpf",
+    "telefone_principal",
+    "telefone_secundario",
+    "email",
+    "endereco_rua",
+    "endereco_numero",
+    "endereco_complemento",
+    "endereco_bairro",
+    "endereco_cidade",
+    "endereco_uf",
+    "endereco_cep",
+    "observacoes",
+]
+
+CAMPOS_TEXTO_PACIENTE = [
+    "raca",
+    "microchip",
+    "cor_pelagem",
+    "procedencia",
+    "alimentacao_detalhes",
+    "contactantes_outros_animais",
+    "ambiente_onde_vive",
+    "historico_vacinacao",
+    "historico_vermifugacao",
+    "doencas_pregressas",
+    "cirurgias_anteriores",
+    "alergias_conhecidas",
+    "observacoes_clinicas_relevantes",
+]
+
+CAMPOS_TEXTO_CONSULTA = [
+    "queixa_principal_tutor",
+    "historico_doenca_atual",
+    "exames_complementares_solicitados",
+    "tratamento_prescrito",
+    "procedimentos_realizados",
+    "prognostico",
+    "instrucoes_para_tutor",
+]
+
+CAMPOS_INTEIROS_CONSULTA = [
+    "frequencia_cardiaca_bpm",
+    "frequencia_respiratoria_mpm",
+    "tpc_segundos",
+    "exame_pulso_ppm",
+]
+
+_ESPECIES = {valor for valor, _ in ESPECIE_CHOICES}
+_SEXOS = {valor for valor, _ in SEXO_CHOICES}
+_STATUS = {valor for valor, _ in STATUS_CHOICES}
+_TIPOS_CONSULTA = {valor for valor, _ in TIPO_CONSULTA_CHOICES}
+
+
+# ==================== LEITURA DOS ARQUIVOS ====================
+
+
+def ler_registros(
+    caminho: str, rejeitar: Callable[[int, str, str], None]
+) -> Iterator[Tuple[int, dict]]:
+    """
+    Lê um arquivo CSV ou JSONL registro a registro.
+
+    Args:
+        caminho: Caminho do arquivo (.csv ou .jsonl/.ndjson)
+        rejeitar: Chamado com (linha, erro, conteúdo) para as linhas JSONL
+            que não são JSON válido, que não interrompem a leitura
+
+    Yields:
+        Tuplas (numero_da_linha, registro)
+    """
+    with open(caminho, encoding="utf-8", newline="") as arquivo:
+        if caminho.lower().endswith(".csv"):
+            # Linha 1 é o cabeçalho
+            for numero, registro in enumerate(csv.DictReader(arquivo), start=2):
+                yield numero, registro
+        else:
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError as e:
+                    erro = f"registro: JSON inválido ({e.msg})"
+                    rejeitar(numero, erro, linha.strip())
+                    continue
+                yield numero, registro
+
+
+def em_lotes(iteravel: Iterable, tamanho: int) -> Iterator[list]:
+    """Agrupa um iterável em listas de no máximo 'tamanho' itens."""
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# ==================== VALIDAÇÃO (executada no pool) ====================
+# As funções abaixo são puras (não acessam o banco) para poderem rodar em
+# processos separados. Cada uma recebe um lote [(linha, registro), ...] e
+# devolve [(linha, dados_validados | None, erro | None, registro), ...].
+
+
+def _texto(valor) -> Optional[str]:
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _escolha(valor, opcoes: set, campo: str, obrigatorio: bool = False):
+    valor = _texto(valor)
+    if valor is None:
+        if obrigatorio:
+            raise ValueError(f"{campo}: campo obrigatório")
+        return None
+    valor = valor.upper()
+    if valor not in opcoes:
+        raise ValueError(f"{campo}: valor inválido '{valor}'")
+    return valor
+
+
+def _validar_campos(modelo, dados: dict, excluir: Iterable[str] = ()) -> None:
+    """
+    Aplica as validações dos campos do modelo (tamanho máximo, e-mail,
+    dígitos de decimais...), que o bulk_create não faz: sem elas o banco
+    recusaria a linha e abortaria o lote inteiro.
+
+    Não valida unicidade nem chaves estrangeiras ('excluir'), que exigem
+    consultas ao banco e são resolvidas no processo principal.
+    """
+    campos = {campo.name for campo in modelo._meta.concrete_fields}
+    instancia = modelo(**{campo: v for campo, v in dados.items() if campo in campos})
+    try:
+        instancia.full_clean(
+            exclude=list(excluir), validate_unique=False, validate_constraints=False
+        )
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{campo}: {' '.join(mensagens)}"
+                for campo, mensagens in e.message_dict.items()
+            )
+        )
+
+
+def _validar_lote(lote: list, validador: Callable[[dict], dict]) -> list:
+    resultado = []
+    for linha, registro in lote:
+        if not isinstance(registro, dict):
+            resultado.append((linha, None, "registro: esperado um objeto", registro))
+            continue
+        try:
+            resultado.append((linha, validador(registro), None, registro))
+        except (ValueError, TypeError, InvalidOperation) as e:
+            resultado.append((linha, None, str(e), registro))
+    return resultado
+
+
+def validar_lote_tutores(lote: list) -> list:
+    """Valida um lote de tutores (CPF e campos do modelo, como o e-mail)."""
+    from .tutor_service import TutorService
+
+    # CPFs do lote validados de uma vez, consumidos na ordem dos registros
+    # (só os objetos, os únicos que _validar_lote passa ao validador)
+    cpfs = iter(
+        TutorService().validar_e_formatar_cpfs(
+            _texto(registro.get("cpf")) or ""
+            for _, registro in lote
+            if isinstance(registro, dict)
+        )
+    )
+
+    def validar(registro: dict) -> dict:
+        is_valid, cpf_formatado = next(cpfs)
+        dados = {campo: _texto(registro.get(campo)) for campo in CAMPOS_TUTOR}
+        if not dados["nome_completo"]:
+            raise ValueError("nome_completo: campo obrigatório")
+        if not is_valid:
+            raise ValueError(f"cpf: {ERROR_TUTOR_CPF_INVALIDO}")
+        dados["cpf"] = cpf_formatado
+        _validar_campos(Tutor, dados)
+        return dados
+
+    return _validar_lote(lote, validar)
+
+
+def validar_lote_pacientes(lote: list) -> list:
+    """Valida um lote de pacientes (escolhas, datas, CPF do tutor e campos)."""
+    from .tutor_service import TutorService
+
+    tutor_service = TutorService()
+    hoje = timezone.now().date()
+
+    def validar(registro: dict) -> dict:
+        dados = {campo: _texto(registro.get(campo)) for campo in CAMPOS_TEXTO_PACIENTE}
+        dados["nome"] = _texto(registro.get("nome"))
+        if not dados["nome"]:
+            raise ValueError("nome: campo obrigatório")
+
+        cpf_tutor = _texto(registro.get("tutor_cpf")) or ""
+        if len(tutor_service._limpar_cpf(cpf_tutor)) != 11:
+            raise ValueError("tutor_cpf: campo obrigatório com 11 dígitos")
+        dados["tutor_cpf"] = tutor_service.formatar_cpf(cpf_tutor)
+
+        dados["especie"] = _escolha(
+            registro.get("especie"), _ESPECIES, "especie", obrigatorio=True
+        )
+        dados["sexo"] = _escolha(registro.get("sexo"), _SEXOS, "sexo")
+        dados["status"] = (
+            _escolha(registro.get("status"), _STATUS, "status") or "ATIVO"
+        )
+
+        nascimento = _texto(registro.get("data_nascimento"))
+        if nascimento:
+            dados["data_nascimento"] = parse_date(nascimento)
+            if dados["data_nascimento"] is None:
+                raise ValueError(f"data_nascimento: data inválida '{nascimento}'")
+            if dados["data_nascimento"] > hoje:
+                raise ValueError("data_nascimento: data no futuro")
+
+        peso = _texto(registro.get("peso_kg"))
+        if peso:
+            dados["peso_kg"] = Decimal(peso.replace(",", "."))
+
+        dados["id_origem"] = _texto(registro.get("id_origem"))
+        _validar_campos(Paciente, dados, excluir=["tutor"])
+        return dados
+
+    return _validar_lote(lote, validar)
+
+
+def validar_lote_consultas(lote: list) -> list:
+    """Valida um lote de consultas (data, tipo, sinais vitais e sintomas)."""
+
+    def validar(registro: dict) -> dict:
+        dados = {campo: _texto(registro.get(campo)) for campo in CAMPOS_TEXTO_CONSULTA}
+        dados["paciente_ref"] = _texto(registro.get("paciente_ref"))
+        dados["paciente_microchip"] = _texto(registro.get("paciente_microchip"))
+        if not dados["paciente_ref"] and not dados["paciente_microchip"]:
+            raise ValueError("paciente_ref ou paciente_microchip: campo obrigatório")
+        dados["veterinario_crmv"] = _texto(registro.get("veterinario_crmv"))
+
+        data_hora = _texto(registro.get("data_hora_agendamento"))
+        dados["data_hora_agendamento"] = parse_datetime(data_hora or "")
+        if dados["data_hora_agendamento"] is None:
+            raise ValueError(f"data_hora_agendamento: data inválida '{data_hora}'")
+
+        dados["tipo_consulta"] = (
+            _escolha(registro.get("tipo_consulta"), _TIPOS_CONSULTA, "tipo_consulta")
+            or "ROTINA"
+        )
+
+        temperatura = _texto(registro.get("temperatura_celsius"))
+        if temperatura:
+            dados["temperatura_celsius"] = Decimal(temperatura.replace(",", "."))
+        for campo in CAMPOS_INTEIROS_CONSULTA:
+            valor = _texto(registro.get(campo))
+            if valor:
+                dados[campo] = int(valor)
+
+        sintomas = registro.get("sintomas") or []
+        if isinstance(sintomas, str):
+            sintomas = sintomas.split("|")
+        dados["sintomas"] = [nome for nome in map(_texto, sintomas) if nome]
+        _validar_campos(
+            Consulta, dados, excluir=["paciente", "veterinario_responsavel"]
+        )
+        return dados
+
+    return _validar_lote(lote, validar)
+
+
+# ==================== SERVIÇO ====================
+
+
+class ImportacaoService:
+    """
+    Serviço de importação em massa para migração de clínicas.
+
+    Fluxo de cada arquivo:
+    1. Leitura em streaming, agrupando registros em lotes
+    2. Validação dos lotes em paralelo (pool de processos)
+    3. Resolução de chaves estrangeiras por mapas em memória
+    4. Gravação com bulk_create, um lote por transação
+    5. Registros rejeitados são gravados no arquivo de rejeitos (JSONL)
+
+    Chaves de referência entre arquivos:
+    - Pacientes referenciam o tutor por 'tutor_cpf'
+    - Consultas referenciam o paciente por 'paciente_ref' (o 'id_origem' do
+      paciente no mesmo processo de importação) ou 'paciente_microchip',
+      o veterinário por 'veterinario_crmv' e os sintomas pelo nome
+      (lista JSON ou nomes separados por '|')
+
+    Example:
+        >>> with open("rejeitos.jsonl", "w") as rejeitos:
+        ...     service = ImportacaoService(rejeitos, tamanho_lote=1000)
+        ...     service.importar_tutores("tutores.csv")
+        ...     service.importar_pacientes("pacientes.csv")
+        ...     service.importar_consultas("consultas.jsonl")
+    """
+
+    def __init__(self, arquivo_rejeitos, tamanho_lote: int = 1000, processos: int = 1):
+        """
+        Inicializa o serviço de importação.
+
+        Args:
+            arquivo_rejeitos: Arquivo texto aberto para escrita dos rejeitos
+            tamanho_lote: Quantidade de registros por lote
+            processos: Tamanho do pool de validação (1 = sem pool)
+        """
+        self.arquivo_rejeitos = arquivo_rejeitos
+        self.tamanho_lote = tamanho_lote
+        self.processos = processos
+        self.busca = BuscaService()
+        self.contadores = ContadorService()
+
+        # Mapas de resolução de chaves estrangeiras
+        self.tutores_por_cpf: Dict[str, int] = {}
+        self.pacientes_por_ref: Dict[str, int] = {}
+        self.pacientes_por_microchip: Dict[str, int] = {}
+        self.consultas_importadas: List[int] = []
+        self.rejeitados = 0
+
+    # ---------- Tutores ----------
+
+    def importar_tutores(self, caminho: str) -> int:
+        """
+        Importa tutores de um arquivo CSV/JSONL.
+
+        Returns:
+            Quantidade de tutores criados
+        """
+        self.tutores_por_cpf.update(Tutor.objects.values_list("cpf", "id"))
+        emails = set(
+            Tutor.objects.exclude(email__isnull=True).values_list("email", flat=True)
+        )
+        criados = 0
+
+        for resultados in self._validar_em_paralelo(
+            "tutores", caminho, validar_lote_tutores
+        ):
+            novos = []
+            for linha, dados, erro, registro in resultados:
+                if erro is None and dados["cpf"] in self.tutores_por_cpf:
+                    erro = "cpf: já cadastrado"
+                if erro is None and dados["email"] and dados["email"] in emails:
+                    erro = "email: já cadastrado"
+                if erro is not None:
+                    self._rejeitar("tutores", linha, erro, registro)
+                    continue
+                # Reserva as chaves para detectar duplicados no próprio arquivo
+                self.tutores_por_cpf[dados["cpf"]] = None  # type: ignore
+                if dados["email"]:
+                    emails.add(dados["email"])
+                novos.append(Tutor(**dados))
+
+            with transaction.atomic():
+                Tutor.objects.bulk_create(novos)
+                incrementar_versao_tabela("tutor")
+                self.busca.indexar("tutor", [tutor.pk for tutor in novos])
+            self.tutores_por_cpf.update(
+                Tutor.objects.filter(cpf__in=[t.cpf for t in novos]).values_list(
+                    "cpf", "id"
+                )
+            )
+            criados += len(novos)
+
+        logger.info(f"Importação de tutores concluída: {criados} criados")
+        return criados
+
+    # ---------- Pacientes ----------
+
+    def importar_pacientes(self, caminho: str) -> int:
+        """
+        Importa pacientes de um arquivo CSV/JSONL.
+
+        Returns:
+            Quantidade de pacientes criados
+        """
+        if not self.tutores_por_cpf:
+            self.tutores_por_cpf.update(Tutor.objects.values_list("cpf", "id"))
+        self.pacientes_por_microchip.update(
+            Paciente.objects.exclude(microchip__isnull=True).values_list(
+                "microchip", "id"
+            )
+        )
+        criados = 0
+
+        for resultados in self._validar_em_paralelo(
+            "pacientes", caminho, validar_lote_pacientes
+        ):
+            novos = []
+            refs = []
+            for linha, dados, erro, registro in resultados:
+                if erro is None:
+                    dados["tutor_id"] = self.tutores_por_cpf.get(dados.pop("tutor_cpf"))
+                    if dados["tutor_id"] is None:
+                        erro = "tutor_cpf: tutor não encontrado"
+                if erro is None and dados["microchip"] in self.pacientes_por_microchip:
+                    erro = "microchip: já cadastrado"
+                if (
+                    erro is None
+                    and dados["id_origem"]
+                    and dados["id_origem"] in self.pacientes_por_ref
+                ):
+                    erro = "id_origem: duplicado no arquivo"
+                if erro is not None:
+                    self._rejeitar("pacientes", linha, erro, registro)
+                    continue
+                # Reserva as chaves para detectar duplicados no próprio lote
+                if dados["microchip"]:
+                    self.pacientes_por_microchip[dados["microchip"]] = None  # type: ignore
+                if dados["id_origem"]:
+                    self.pacientes_por_ref[dados["id_origem"]] = None  # type: ignore
+                refs.append(dados.pop("id_origem"))
+                novos.append(Paciente(**dados))
+
+            with transaction.atomic():
+                Paciente.objects.bulk_create(novos)
+                incrementar_versao_tabela("paciente")
+                self.busca.indexar("paciente", [paciente.pk for paciente in novos])
+                self.contadores.recontar_afetados(novos)
+            for ref, paciente in zip(refs, novos):
+                if ref:
+                    self.pacientes_por_ref[ref] = paciente.pk
+                if paciente.microchip:
+                    self.pacientes_por_microchip[paciente.microchip] = paciente.pk
+            criados += len(novos)
+
+        logger.info(f"Importação de pacientes concluída: {criados} criados")
+        return criados
+
+    # ---------- Consultas ----------
+
+    def importar_consultas(self, caminho: str) -> int:
+        """
+        Importa consultas (com sintomas apresentados) de um arquivo CSV/JSONL.
+
+        Returns:
+            Quantidade de consultas criadas
+        """
+        if not self.pacientes_por_microchip:
+            self.pacientes_por_microchip.update(
+                Paciente.objects.exclude(microchip__isnull=True).values_list(
+                    "microchip", "id"
+                )
+            )
+        veterinarios_por_crmv = dict(
+            Veterinario.objects.exclude(crmv__isnull=True).values_list("crmv", "id")
+        )
+        sintomas_por_nome = dict(Sintoma.objects.values_list("nome", "id"))
+        SintomasConsulta = Consulta.sintomas_apresentados.through
+        fuso = timezone.get_current_timezone()
+        criados = 0
+
+        for resultados in self._validar_em_paralelo(
+            "consultas", caminho, validar_lote_consultas
+        ):
+            novas = []
+            sintomas_das_novas = []
+            for linha, dados, erro, registro in resultados:
+                if erro is None:
+                    erro = self._resolver_referencias_consulta(
+                        dados, veterinarios_por_crmv, sintomas_por_nome
+                    )
+                if erro is not None:
+                    self._rejeitar("consultas", linha, erro, registro)
+                    continue
+                if timezone.is_naive(dados["data_hora_agendamento"]):
+                    dados["data_hora_agendamento"] = timezone.make_aware(
+                        dados["data_hora_agendamento"], fuso
+                    )
+                sintomas_das_novas.append(dados.pop("sintomas_ids"))
+                novas.append(Consulta(**dados))
+
+            with transaction.atomic():
+                Consulta.objects.bulk_create(novas)
+                SintomasConsulta.objects.bulk_create(
+                    [
+                        SintomasConsulta(consulta_id=consulta.pk, sintoma_id=sintoma_id)
+                        for consulta, sintomas_ids in zip(novas, sintomas_das_novas)
+                        for sintoma_id in sintomas_ids
+                    ]
+                )
+                incrementar_versao_tabela("consulta")
+                self.busca.indexar("consulta", [consulta.pk for consulta in novas])
+                self.contadores.recontar_afetados(novas)
+                HistoricoPacienteService.invalidar(
+                    {consulta.paciente_id for consulta in novas}
+                )
+            self.consultas_importadas.extend(consulta.pk for consulta in novas)
+            criados += len(novas)
+
+        logger.info(f"Importação de consultas concluída: {criados} criadas")
+        return criados
+
+    def _resolver_referencias_consulta(
+        self, dados: dict, veterinarios_por_crmv: dict, sintomas_por_nome: dict
+    ) -> Optional[str]:
+        """
+        Substitui as chaves externas da consulta por IDs do banco.
+
+        Returns:
+            Mensagem de erro, ou None se todas as referências foram resolvidas
+        """
+        ref = dados.pop("paciente_ref")
+        microchip = dados.pop("paciente_microchip")
+        dados["paciente_id"] = (
+            self.pacientes_por_ref.get(ref) if ref else None
+        ) or self.pacientes_por_microchip.get(microchip)
+        if dados["paciente_id"] is None:
+            return "paciente: paciente não encontrado"
+
+        crmv = dados.pop("veterinario_crmv")
+        dados["veterinario_responsavel_id"] = veterinarios_por_crmv.get(crmv)
+        if crmv and dados["veterinario_responsavel_id"] is None:
+            return f"veterinario_crmv: veterinário não encontrado '{crmv}'"
+
+        nomes = dados.pop("sintomas")
+        desconhecidos = [nome for nome in nomes if nome not in sintomas_por_nome]
+        if desconhecidos:
+            return f"sintomas: sintomas não cadastrados {desconhecidos}"
+        dados["sintomas_ids"] = {sintomas_por_nome[nome] for nome in nomes}
+        return None
+
+    # ---------- Diagnósticos ----------
+
+    def calcular_diagnosticos(self) -> int:
+        """
+        Calcula os diagnósticos suspeitos das consultas importadas, em lote.
+
+        Returns:
+            Total de associações de diagnóstico suspeito gravadas
+        """
+        from .consulta_service import ConsultaService
+
+        return ConsultaService().processar_diagnosticos_em_lote(
+            self.consultas_importadas, tamanho_lote=self.tamanho_lote
+        )
+
+    # ---------- Infraestrutura ----------
+
+    def _validar_em_paralelo(
+        self, arquivo: str, caminho: str, validador: Callable
+    ) -> Iterator[list]:
+        """
+        Valida os lotes do arquivo, mantendo a ordem original.
+
+        No máximo 2 lotes por processo ficam em andamento ao mesmo tempo,
+        para que a memória usada não dependa do tamanho do arquivo.
+        """
+        registros = ler_registros(caminho, partial(self._rejeitar, arquivo))
+        lotes = em_lotes(registros, self.tamanho_lote)
+
+        if self.processos <= 1:
+            for lote in lotes:
+                yield validador(lote)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.processos, initializer=inicializar_worker
+        ) as executor:
+            em_andamento = deque()
+            for lote in lotes:
+                em_andamento.append(executor.submit(validador, lote))
+                if len(em_andamento) >= self.processos * 2:
+                    yield em_andamento.popleft().result()
+            while em_andamento:
+                yield em_andamento.popleft().result()
+
+    def _rejeitar(self, arquivo: str, linha: int, erro: str, registro) -> None:
+        self.rejeitados += 1
+        self.arquivo_rejeitos.write(
+            json.dumps(
+                {"arquivo": arquivo, "linha": linha, "erro": erro, "registro": registro},
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+        )
@@ -0,0 +1,291 @@
+"""
+Serviço de Miniaturas das Fotos dos Pacientes
+
+Gera versões reduzidas de Paciente.foto (WebP e JPEG, em MINIATURA_TAMANHOS)
+para listagens e telas que não precisam da foto original, geralmente com
+vários megabytes.
+
+Princípios aplicados:
+- A geração não acontece na requisição do upload: é agendada para depois
+  do commit e executada por um pool de threads (MINIATURAS_WORKERS)
+- JPEGs são decodificados já reduzidos (Image.draft) e cada tamanho é
+  gerado a partir do anterior, do maior para o menor
+- O resultado é gravado com UPDATE apenas se a foto não mudou nesse meio
+  tempo; as miniaturas de uma foto anterior são removidas do storage
+- Uma foto que não pôde ser processada também é registrada (com 'falha'),
+  para não ser decodificada de novo a cada gravação do paciente; o
+  comando gerar_miniaturas tenta novamente
+- Fotos existentes são processadas em paralelo pelo comando
+  gerar_miniaturas (processos), com a gravação no banco em lote
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..cache import incrementar_versao_tabela
+from ..constants import (
+    MINIATURA_DIRETORIO,
+    MINIATURA_FORMATOS,
+    MINIATURA_QUALIDADE,
+    MINIATURA_TAMANHOS,
+)
+from ..models import Paciente
+from .processos import inicializar_worker
+
+logger = logging.getLogger(__name__)
+
+_EXTENSOES = {"webp": "webp", "jpeg": "jpg"}
+
+# Pool compartilhado pelo processo, criado no primeiro agendamento
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def gerar_miniaturas(nome_foto: str) -> Optional[dict]:
+    """
+    Gera e grava no storage as miniaturas de uma foto.
+
+    Função de módulo (e não método) para poder ser executada em outros
+    processos pelo ProcessPoolExecutor.
+
+    Returns:
+        {"origem": nome_foto, "arquivos": {tamanho: {formato: nome}}}, ou
+        None se o arquivo não existe, não é uma imagem válida ou excede o
+        limite de pixels do Pillow
+    """
+    base = os.path.splitext(os.path.basename(nome_foto))[0]
+    maior = max(MINIATURA_TAMANHOS.values())
+    arquivos = {}
+    try:
+        with default_storage.open(nome_foto, "rb") as arquivo, Image.open(
+            arquivo
+        ) as original:
+            # JPEG: decodifica em escala reduzida (1/2, 1/4, 1/8), bem mais
+            # rápido e com menos memória do que a imagem inteira
+            original.draft("RGB", (maior, maior))
+            imagem = ImageOps.exif_transpose(original)
+            transparente = imagem.mode in ("RGBA", "LA", "P")
+            imagem = imagem.convert("RGBA" if transparente else "RGB")
+
+            for tamanho, lado in sorted(
+                MINIATURA_TAMANHOS.items(), key=lambda item: -item[1]
+            ):
+                imagem.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+                for formato in MINIATURA_FORMATOS:
+                    convertida = imagem
+                    if formato == "jpeg" and imagem.mode != "RGB":
+                        convertida = imagem.convert("RGB")
+                    buffer = BytesIO()
+                    convertida.save(
+                        buffer, format=formato.upper(), quality=MINIATURA_QUALIDADE
+                    )
+                    nome = (
+                        f"{MINIATURA_DIRETORIO}/{base}_{tamanho}."
+                        f"{_EXTENSOES[formato]}"
+                    )
+                    arquivos.setdefault(tamanho, {})[formato] = default_storage.save(
+                        nome, ContentFile(buffer.getvalue())
+                    )
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logger.warning(f"Miniaturas não geradas para {nome_foto}: {e}")
+        _remover_arquivos(arquivos)
+        return None
+    return {"origem": nome_foto, "arquivos": arquivos}
+
+
+def _remover_arquivos(arquivos: Dict[str, Dict[str, str]]) -> None:
+    for formatos in arquivos.values():
+        for nome in formatos.values():
+            default_storage.delete(nome)
+
+
+class MiniaturaService:
+    """
+    Serviço para gerar as miniaturas das fotos e montar suas URLs.
+
+    Example:
+        >>> MiniaturaService().agendar(paciente.pk)  # após salvar a foto
+        >>> MiniaturaService().urls(paciente)
+        {'pequena': {'webp': '/media/...', 'jpeg': '/media/...'}, ...}
+    """
+
+    # ------------------------------------------------------------------
+    # Geração em segundo plano
+    # ------------------------------------------------------------------
+
+    def agendar(self, paciente_id: int) -> None:
+        """Agenda a geração das miniaturas para depois do commit."""
+        transaction.on_commit(lambda: self._executar(paciente_id))
+
+    def _executar(self, paciente_id: int) -> None:
+        global _executor
+        if not settings.MINIATURAS_EM_SEGUNDO_PLANO:
+            self.processar(paciente_id)
+            return
+        if _executor is None:
+            with _executor_lock:
+                # Outra thread pode ter criado o pool enquanto esta esperava
+                if _executor is None:
+                    _executor = ThreadPoolExecutor(
+                        max_workers=settings.MINIATURAS_WORKERS,
+                        thread_name_prefix="miniaturas",
+                    )
+        _executor.submit(self._processar_em_thread, paciente_id)
+
+    def _processar_em_thread(self, paciente_id: int) -> None:
+        try:
+            self.processar(paciente_id)
+        except Exception:
+            logger.exception(f"Erro ao gerar miniaturas do paciente {paciente_id}")
+        finally:
+            # Cada thread tem a sua conexão; não a deixa aberta no pool
+            connection.close()
+
+    def processar(self, paciente_id: int) -> bool:
+        """
+        Gera as miniaturas da foto atual do paciente e grava o resultado.
+
+        Returns:
+            True se as miniaturas foram gravadas (False também quando a foto
+            não pôde ser processada e a falha foi registrada)
+        """
+        registro = (
+            Paciente.objects.filter(pk=paciente_id)
+            .values_list("foto", "miniaturas")
+            .first()
+        )
+        if registro is None or not registro[0]:
+            return False
+        foto, anteriores = registro
+        if anteriores.get("origem") == foto:
+            return False
+
+        miniaturas = gerar_miniaturas(foto)
+        if miniaturas is None:
+            self.gravar([(paciente_id, foto, self._falha(foto), anteriores)])
+            return False
+        gravadas = self.gravar([(paciente_id, foto, miniaturas, anteriores)])
+        if not gravadas:
+            # A foto mudou durante a geração: a nova terá as suas miniaturas
+            _remover_arquivos(miniaturas["arquivos"])
+        return bool(gravadas)
+
+    def gravar(self, resultados: List[Tuple[int, str, dict, dict]]) -> int:
+        """
+        Grava as miniaturas geradas: (paciente_id, foto, miniaturas,
+        miniaturas anteriores) por paciente.
+
+        Returns:
+            Quantidade de pacientes atualizados
+        """
+        gravadas = 0
+        for paciente_id, foto, miniaturas, anteriores in resultados:
+            # UPDATE condicionado à foto: não grava miniaturas de foto antiga
+            if Paciente.objects.filter(pk=paciente_id, foto=foto).update(
+                miniaturas=miniaturas
+            ):
+                gravadas += 1
+                _remover_arquivos(anteriores.get("arquivos", {}))
+        if gravadas:
+            incrementar_versao_tabela("paciente")
+        return gravadas
+
+    @staticmethod
+    def _falha(foto: str) -> dict:
+        """Registro de uma foto que não gerou miniaturas."""
+        return {"origem": foto, "arquivos": {}, "falha": True}
+
+    # ------------------------------------------------------------------
+    # Fotos existentes
+    # ------------------------------------------------------------------
+
+    def pendentes(self, todas: bool = False) -> Iterator[Tuple[int, str, dict]]:
+        """
+        Pacientes com foto sem miniaturas atualizadas, incluindo as que
+        falharam antes (todos com 'todas').
+        """
+        registros = (
+            Paciente.objects.exclude(foto="")
+            .exclude(foto__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "foto", "miniaturas")
+            .iterator()
+        )
+        for paciente_id, foto, miniaturas in registros:
+            if todas or miniaturas.get("origem") != foto or miniaturas.get("falha"):
+                yield paciente_id, foto, miniaturas
+
+    def preencher_existentes(
+        self, processos: int = 1, todas: bool = False, lote: int = 100
+    ) -> int:
+        """
+        Gera as miniaturas das fotos existentes, com as imagens processadas
+        em paralelo e a gravação no banco feita por este processo, em lotes.
+
+        Args:
+            processos: Processos usados na geração (1 = sem paralelismo)
+            todas: Regera também as fotos que já têm miniaturas
+            lote: Pacientes gravados por vez
+
+        Returns:
+            Quantidade de pacientes com miniaturas gravadas
+        """
+        pendentes = list(self.pendentes(todas))
+        fotos = [foto for _, foto, _ in pendentes]
+        if processos > 1:
+            with ProcessPoolExecutor(
+                max_workers=processos, initializer=inicializar_worker
+            ) as executor:
+                geradas = list(executor.map(gerar_miniaturas, fotos, chunksize=4))
+        else:
+            geradas = [gerar_miniaturas(foto) for foto in fotos]
+
+        resultados, falhas = [], []
+        for (paciente_id, foto, anteriores), miniaturas in zip(pendentes, geradas):
+            if miniaturas is None:
+                falhas.append((paciente_id, foto, self._falha(foto), anteriores))
+            else:
+                resultados.append((paciente_id, foto, miniaturas, anteriores))
+        total = 0
+        for inicio in range(0, len(resultados), lote):
+            total += self.gravar(resultados[inicio : inicio + lote])
+        # Registra as fotos que falharam para não reagendá-las a cada gravação
+        for inicio in range(0, len(falhas), lote):
+            self.gravar(falhas[inicio : inicio + lote])
+        logger.info(f"Miniaturas geradas para {total} de {len(pendentes)} pacientes")
+        return total
+
+    # ------------------------------------------------------------------
+    # URLs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def urls(paciente: Paciente, request=None) -> Dict[str, Dict[str, str]]:
+        """
+        URLs das miniaturas da foto atual ({} se ainda não foram geradas).
+
+        Args:
+            request: Se informado, as URLs são absolutas (como as de 'foto')
+        """
+        miniaturas = paciente.miniaturas or {}
+        if not paciente.foto or miniaturas.get("origem") != paciente.foto.name:
+            return {}
+        urls = {}
+        for tamanho, formatos in miniaturas.get("arquivos", {}).items():
+            urls[tamanho] = {}
+            for formato, nome in formatos.items():
+                url = default_storage.url(nome)
+                urls[tamanho][formato] = (
+                    request.build_absolute_uri(url) if request else url
+                )
+        return urls
@@ -0,0 +1,18 @@
+"""
+Pools de processos dos serviços
+
+Funções de apoio aos serviços que distribuem trabalho com
+ProcessPoolExecutor (importação em massa, geração de miniaturas).
+"""
+
+import os
+
+
+def inicializar_worker():
+    """Garante que o Django esteja configurado em processos 'spawn'."""
+    import django
+    from django.apps import apps
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    if not apps.ready:
+        django.setup()
@@ -0,0 +1,131 @@
+"""
+Serviço do Schema OpenAPI
+
+Gerar o schema com o drf-spectacular percorre todos os serializers e
+custa segundos de CPU. Este serviço gera o schema uma vez por versão do
+código e o guarda renderizado em três níveis: memória do processo, cache
+do Django e arquivo em disco (que pode ser gerado no build da imagem com
+'python manage.py gerar_schema_openapi').
+"""
+
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.core.cache import cache
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+logger = logging.getLogger(__name__)
+
+# Pacotes cujo código define o schema (views, serializers e rotas)
+PACOTES_DO_SCHEMA = ("clinic", "config")
+
+
+class SchemaService:
+    """
+    Serviço para obter o schema OpenAPI renderizado sem regerá-lo a cada
+    requisição.
+
+    Example:
+        >>> service = SchemaService()
+        >>> conteudo = service.obter("json")
+        >>> etag = f'"schema-{service.versao_codigo()}-json"'
+    """
+
+    renderers = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+    # Schemas já renderizados neste processo: {(versao, formato): bytes}
+    _memoria: Dict[Tuple[str, str], bytes] = {}
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def versao_codigo() -> str:
+        """
+        Identifica a versão do código que gera o schema.
+
+        Usa a variável VERSAO_CODIGO (ex.: hash do commit) quando definida;
+        senão, um hash do conteúdo dos arquivos .py do projeto e das versões
+        do DRF e do drf-spectacular. Calculada uma vez por processo, já que
+        mudanças de código exigem reiniciar o servidor.
+        """
+        if settings.VERSAO_CODIGO:
+            return settings.VERSAO_CODIGO
+
+        resumo = hashlib.sha256()
+        resumo.update(rest_framework.VERSION.encode())
+        resumo.update(drf_spectacular.__version__.encode())
+        for pacote in PACOTES_DO_SCHEMA:
+            for caminho in sorted(Path(settings.BASE_DIR, pacote).rglob("*.py")):
+                resumo.update(str(caminho.relative_to(settings.BASE_DIR)).encode())
+                resumo.update(caminho.read_bytes())
+        return resumo.hexdigest()[:16]
+
+    def obter(self, formato: str) -> bytes:
+        """
+        Retorna o schema renderizado no formato pedido ('yaml' ou 'json'),
+        gerando-o apenas se não estiver em memória, no cache nem em disco.
+        """
+        versao = self.versao_codigo()
+        chave = (versao, formato)
+        if chave in self._memoria:
+            return self._memoria[chave]
+
+        chave_cache = f"clinic:schema:{versao}:{formato}"
+        conteudo = cache.get(chave_cache)
+        if conteudo is None:
+            conteudo = self._ler_arquivo(versao, formato)
+            if conteudo is None:
+                conteudo = self.gerar(formato)
+                self._gravar_arquivo(versao, formato, conteudo)
+            cache.set(chave_cache, conteudo, None)
+
+        self._memoria[chave] = conteudo
+        return conteudo
+
+    def gerar(self, formato: str) -> bytes:
+        """Gera e renderiza o schema com o drf-spectacular (operação lenta)."""
+        logger.info(f"Gerando schema OpenAPI ({formato})")
+        gerador = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+            urlconf=spectacular_settings.SERVE_URLCONF
+        )
+        schema = gerador.get_schema(request=None, public=True)
+        return self.renderers[formato]().render(schema, renderer_context={})
+
+    def gravar_arquivos(self) -> List[Path]:
+        """Gera o schema em todos os formatos e grava os arquivos em disco."""
+        versao = self.versao_codigo()
+        caminhos = []
+        for formato in self.renderers:
+            conteudo = self.gerar(formato)
+            caminhos.append(self._gravar_arquivo(versao, formato, conteudo))
+            self._memoria[(versao, formato)] = conteudo
+        return caminhos
+
+    def _caminho(self, versao: str, formato: str) -> Path:
+        return Path(settings.SCHEMA_OPENAPI_DIR) / f"openapi-{versao}.{formato}"
+
+    def _ler_arquivo(self, versao, formato):
+        try:
+            return self._caminho(versao, formato).read_bytes()
+        except OSError:
+            return None
+
+    def _gravar_arquivo(self, versao, formato, conteudo):
+        caminho = self._caminho(versao, formato)
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            # Grava em arquivo temporário e renomeia: outro processo nunca
+            # lê um schema pela metade
+            temporario = caminho.with_suffix(f".{formato}.tmp")
+            temporario.write_bytes(conteudo)
+            temporario.replace(caminho)
+        except OSError as e:
+            # O disco é só um nível extra: sem ele, memória e cache bastam
+            logger.warning(f"Não foi possível gravar o schema em {caminho}: {e}")
+        return caminho
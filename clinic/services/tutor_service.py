@@ -10,14 +10,23 @@ Princípios aplicados:
 """
 
 import logging
-from typing import Tuple
+from typing import Iterable, List, Tuple
 
-from validate_docbr import CPF
-
-from ..constants import ERROR_TUTOR_CPF_INVALIDO
+from ..constants import ERROR_TUTOR_CPF_INVALIDO, SEPARADORES_CPF
 
 logger = logging.getLogger(__name__)
 
+# Validação de CPF: tabela de remoção da pontuação e pesos dos dígitos
+# verificadores, calculados uma única vez
+_SEM_PONTUACAO_CPF = str.maketrans("", "", SEPARADORES_CPF)
+_PESOS_PRIMEIRO_DIGITO = tuple(range(10, 1, -1))
+_PESOS_SEGUNDO_DIGITO = tuple(range(11, 1, -1))
+
+
+def _digito_verificador(digitos: List[int], pesos: Tuple[int, ...]) -> int:
+    resto = sum(d * p for d, p in zip(digitos, pesos)) * 10 % 11
+    return 0 if resto == 10 else resto
+
 
 class TutorService:
     """
@@ -33,10 +42,6 @@ class TutorService:
         ...     tutor.cpf = cpf_formatado
     """
 
-    def __init__(self):
-        """Inicializa o serviço com validador de CPF."""
-        self.cpf_validator = CPF()
-
     def validar_e_formatar_cpf(self, cpf_raw: str) -> Tuple[bool, str]:
         """
         Valida e formata um CPF.
@@ -55,19 +60,32 @@ class TutorService:
             >>> if is_valid:
             ...     print(formatted)  # "123.456.789-00"
         """
-        # Remove formatação para validar apenas os números
-        cpf_limpo = self._limpar_cpf(cpf_raw)
-
-        # Valida o CPF
-        if not self._validar_cpf(cpf_limpo):
+        resultado = self._validar_e_formatar(cpf_raw)
+        if resultado[0]:
+            logger.debug(f"CPF validado e formatado: {resultado[1]}")
+        else:
             logger.warning(f"CPF inválido recebido: {cpf_raw}")
-            return False, ""
+        return resultado
+
+    def validar_e_formatar_cpfs(self, cpfs: Iterable[str]) -> List[Tuple[bool, str]]:
+        """
+        Valida e formata vários CPFs de uma vez (ex: importação em lote).
+
+        Usa para cada CPF as mesmas etapas de validar_e_formatar_cpf, sem
+        os logs por CPF.
 
-        # Formata o CPF
-        cpf_formatado = self._formatar_cpf(cpf_limpo)
+        Args:
+            cpfs: CPFs em qualquer formato
+
+        Returns:
+            Lista de tuplas (is_valid, cpf_formatado), na ordem de entrada
 
-        logger.debug(f"CPF validado e formatado: {cpf_formatado}")
-        return True, cpf_formatado
+        Example:
+            >>> service = TutorService()
+            >>> service.validar_e_formatar_cpfs(["52998224725", "123"])
+            [(True, '529.982.247-25'), (False, '')]
+        """
+        return [self._validar_e_formatar(cpf_raw) for cpf_raw in cpfs]
 
     def validar_cpf(self, cpf_raw: str) -> bool:
         """
@@ -107,6 +125,13 @@ class TutorService:
         cpf_limpo = self._limpar_cpf(cpf_raw)
         return self._formatar_cpf(cpf_limpo)
 
+    def _validar_e_formatar(self, cpf_raw: str) -> Tuple[bool, str]:
+        """Etapas comuns à validação individual e em lote."""
+        cpf_limpo = self._limpar_cpf(cpf_raw)
+        if not self._validar_cpf(cpf_limpo):
+            return False, ""
+        return True, self._formatar_cpf(cpf_limpo)
+
     def _limpar_cpf(self, cpf: str) -> str:
         """
         Remove toda formatação do CPF.
@@ -117,11 +142,14 @@ class TutorService:
         Returns:
             CPF apenas com dígitos
         """
-        return cpf.replace(".", "").replace("-", "").strip()
+        return cpf.translate(_SEM_PONTUACAO_CPF).strip()
 
     def _validar_cpf(self, cpf_limpo: str) -> bool:
         """
-        Valida CPF usando biblioteca validate_docbr.
+        Valida os dígitos verificadores do CPF.
+
+        Aceita até 11 dígitos, completando os zeros à esquerda (como a
+        validate_docbr); CPFs com todos os dígitos iguais são rejeitados.
 
         Args:
             cpf_limpo: CPF apenas com dígitos
@@ -129,16 +157,25 @@ class TutorService:
         Returns:
             True se válido, False caso contrário
         """
-        return self.cpf_validator.validate(cpf_limpo)
+        if len(cpf_limpo) > 11 or not (cpf_limpo.isascii() and cpf_limpo.isdigit()):
+            return False
+        cpf = cpf_limpo.zfill(11)
+        digitos = [int(d) for d in cpf]
+        return (
+            cpf != cpf[0] * 11
+            and _digito_verificador(digitos, _PESOS_PRIMEIRO_DIGITO) == digitos[9]
+            and _digito_verificador(digitos, _PESOS_SEGUNDO_DIGITO) == digitos[10]
+        )
 
     def _formatar_cpf(self, cpf_limpo: str) -> str:
         """
         Formata CPF para o padrão XXX.XXX.XXX-XX.
 
         Args:
-            cpf_limpo: CPF apenas com dígitos
+            cpf_limpo: CPF apenas com dígitos (zeros à esquerda são completados)
 
         Returns:
             CPF formatado
         """
-        return self.cpf_validator.mask(cpf_limpo)
+        cpf = cpf_limpo.zfill(11)
+        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
@@ -0,0 +1,288 @@
+"""
+Serviço de Upload da Foto do Paciente em Partes
+
+Recebe a foto em partes sequenciais (retomáveis após uma falha de rede),
+gravadas direto em um arquivo temporário, e ao final anexa o arquivo a
+Paciente.foto.
+
+Princípios aplicados:
+- Memória limitada: o corpo de cada parte é lido em blocos de
+  FOTO_BLOCO_LEITURA bytes e gravado no disco, qualquer que seja o
+  tamanho da foto
+- Estado no disco (arquivo parcial + metadados em JSON): os bytes já
+  recebidos são o tamanho do arquivo, e qualquer worker pode continuar
+  o upload
+- Uma parte por vez: o arquivo parcial fica com lock exclusivo (flock)
+  enquanto a parte é gravada; uma parte concorrente recebe 409
+- A imagem é validada pelo cabeçalho (formato e dimensões), sem
+  decodificar o bitmap; o arquivo concluído é movido para o storage
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.utils.text import get_valid_filename
+from PIL import Image, UnidentifiedImageError
+
+from ..constants import (
+    ERROR_UPLOAD_FORA_DE_ORDEM,
+    ERROR_UPLOAD_FORMATO,
+    ERROR_UPLOAD_PARTE_CONCORRENTE,
+    ERROR_UPLOAD_PARTE_INCOMPLETA,
+    ERROR_UPLOAD_PARTE_TAMANHO,
+    ERROR_UPLOAD_PIXELS,
+    ERROR_UPLOAD_TAMANHO,
+    FOTO_BLOCO_LEITURA,
+    FOTO_FORMATOS_PERMITIDOS,
+    FOTO_MAX_PIXELS,
+    FOTO_TAMANHO_MAXIMO,
+    FOTO_TAMANHO_MAXIMO_PARTE,
+    FOTO_UPLOAD_VALIDADE,
+)
+from ..models import Paciente
+
+logger = logging.getLogger(__name__)
+
+_RE_UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class ParteForaDeOrdem(ValueError):
+    """A parte não começa no próximo byte esperado do upload."""
+
+    def __init__(self, recebidos: int):
+        super().__init__(ERROR_UPLOAD_FORA_DE_ORDEM.format(recebidos=recebidos))
+        self.recebidos = recebidos
+
+
+class ParteConcorrente(ParteForaDeOrdem):
+    """Outra requisição está gravando uma parte do mesmo upload."""
+
+    def __init__(self, recebidos: int):
+        ValueError.__init__(self, ERROR_UPLOAD_PARTE_CONCORRENTE)
+        self.recebidos = recebidos
+
+
+class _ArquivoRecebido(File):
+    """Arquivo já no disco: o FileSystemStorage o move em vez de copiar."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class UploadFotoService:
+    """
+    Serviço para receber a foto do paciente em partes.
+
+    Example:
+        >>> service = UploadFotoService()
+        >>> upload = service.iniciar(paciente.pk, usuario.pk, 7340032, "rex.jpg")
+        >>> service.receber(upload["upload_id"], usuario.pk, parte, 0, len_parte)
+        {'upload_id': '...', 'tamanho': 7340032, 'recebidos': 5242880, ...}
+    """
+
+    def __init__(self, diretorio: Optional[str] = None):
+        self.diretorio = Path(diretorio or settings.FOTO_UPLOAD_DIR)
+
+    def iniciar(
+        self, paciente_id: int, usuario_id: int, tamanho, nome: str = ""
+    ) -> dict:
+        """
+        Abre um upload da foto do paciente.
+
+        Args:
+            tamanho: Tamanho total da foto em bytes
+            nome: Nome original do arquivo (usado no nome gravado)
+
+        Raises:
+            ValueError: Se o tamanho for inválido
+        """
+        try:
+            tamanho = int(tamanho)
+        except (TypeError, ValueError):
+            tamanho = 0
+        if not 0 < tamanho <= FOTO_TAMANHO_MAXIMO:
+            raise ValueError(ERROR_UPLOAD_TAMANHO.format(maximo=FOTO_TAMANHO_MAXIMO))
+
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.remover_expirados()
+        upload_id = secrets.token_hex(16)
+        metadados = {
+            "paciente": paciente_id,
+            "usuario": usuario_id,
+            "tamanho": tamanho,
+            "nome": os.path.basename(str(nome or "")),
+        }
+        self._caminho(upload_id, "json").write_text(json.dumps(metadados))
+        self._caminho(upload_id, "parte").touch()
+        return self._estado(upload_id, metadados)
+
+    def estado(self, upload_id: str, usuario_id: int) -> Optional[dict]:
+        """Bytes já recebidos de um upload (None se não existe ou é de outro
+        usuário)."""
+        metadados = self._metadados(upload_id, usuario_id)
+        return None if metadados is None else self._estado(upload_id, metadados)
+
+    def receber(
+        self,
+        upload_id: str,
+        usuario_id: int,
+        corpo: BinaryIO,
+        inicio: Optional[int],
+        tamanho_parte: int,
+    ) -> Optional[dict]:
+        """
+        Grava uma parte lendo o corpo em blocos. Na última parte, valida a
+        imagem e a anexa ao paciente.
+
+        Args:
+            corpo: Stream do corpo da requisição
+            inicio: Byte inicial da parte (None = continuar de onde parou)
+            tamanho_parte: Content-Length da parte
+
+        Returns:
+            Estado do upload ('concluido' True na última parte), ou None se
+            o upload não existe
+
+        Raises:
+            ParteForaDeOrdem: Se 'inicio' não é o próximo byte esperado
+            ParteConcorrente: Se outra parte do upload está sendo gravada
+            ValueError: Parte com tamanho inválido ou imagem inválida
+        """
+        metadados = self._metadados(upload_id, usuario_id)
+        if metadados is None:
+            return None
+        try:
+            # "r+b" não recria o arquivo de um upload concluído nesse meio tempo
+            arquivo = open(self._caminho(upload_id, "parte"), "r+b")
+        except FileNotFoundError:
+            return None
+        with arquivo:
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ParteConcorrente(self._recebidos(upload_id))
+            # Relido com o lock: outra parte pode ter sido gravada antes dele
+            recebidos = arquivo.seek(0, os.SEEK_END)
+            if inicio is not None and inicio != recebidos:
+                raise ParteForaDeOrdem(recebidos)
+            if not 0 < tamanho_parte <= min(
+                FOTO_TAMANHO_MAXIMO_PARTE, metadados["tamanho"] - recebidos
+            ):
+                raise ValueError(
+                    ERROR_UPLOAD_PARTE_TAMANHO.format(maximo=FOTO_TAMANHO_MAXIMO_PARTE)
+                )
+
+            gravados = 0
+            while gravados < tamanho_parte:
+                bloco = corpo.read(min(FOTO_BLOCO_LEITURA, tamanho_parte - gravados))
+                if not bloco:
+                    break
+                arquivo.write(bloco)
+                gravados += len(bloco)
+            if gravados < tamanho_parte:
+                # Conexão interrompida: descarta a parte incompleta, o
+                # cliente reenvia a partir de 'recebidos'
+                arquivo.truncate(recebidos)
+                raise ValueError(ERROR_UPLOAD_PARTE_INCOMPLETA)
+            arquivo.flush()
+
+            estado = self._estado(upload_id, metadados)
+            if estado["recebidos"] == metadados["tamanho"]:
+                try:
+                    self._concluir(upload_id, metadados)
+                finally:
+                    self._remover(upload_id)
+                estado["concluido"] = True
+        return estado
+
+    def remover_expirados(self) -> int:
+        """Remove uploads sem partes recebidas há mais de FOTO_UPLOAD_VALIDADE."""
+        limite = time.time() - FOTO_UPLOAD_VALIDADE
+        removidos = 0
+        for caminho in self.diretorio.glob("*.json"):
+            # O arquivo parcial é gravado a cada parte: sua data é a da
+            # última atividade do upload
+            parte = self._caminho(caminho.stem, "parte")
+            atividade = parte if parte.exists() else caminho
+            try:
+                expirado = atividade.stat().st_mtime < limite
+            except FileNotFoundError:
+                continue
+            if expirado:
+                self._remover(caminho.stem)
+                removidos += 1
+        return removidos
+
+    # ------------------------------------------------------------------
+
+    def _concluir(self, upload_id: str, metadados: dict) -> None:
+        """Valida a imagem pelo cabeçalho e a anexa ao paciente."""
+        caminho = self._caminho(upload_id, "parte")
+        try:
+            # Image.open lê só o cabeçalho; verify() confere a estrutura
+            # do arquivo sem decodificar os pixels
+            with Image.open(caminho) as imagem:
+                formato = imagem.format
+                largura, altura = imagem.size
+                if formato in FOTO_FORMATOS_PERMITIDOS:
+                    if largura * altura > FOTO_MAX_PIXELS:
+                        raise ValueError(
+                            ERROR_UPLOAD_PIXELS.format(maximo=FOTO_MAX_PIXELS)
+                        )
+                    imagem.verify()
+        except Image.DecompressionBombError:
+            raise ValueError(ERROR_UPLOAD_PIXELS.format(maximo=FOTO_MAX_PIXELS))
+        except (UnidentifiedImageError, SyntaxError, OSError):
+            formato = None
+        if formato not in FOTO_FORMATOS_PERMITIDOS:
+            raise ValueError(ERROR_UPLOAD_FORMATO)
+
+        paciente = Paciente.objects.filter(pk=metadados["paciente"]).first()
+        if paciente is None:
+            return
+        base = os.path.splitext(metadados["nome"])[0] or f"paciente_{paciente.pk}"
+        nome = get_valid_filename(f"{base}.{FOTO_FORMATOS_PERMITIDOS[formato]}")
+        with open(caminho, "rb") as arquivo:
+            paciente.foto.save(nome, _ArquivoRecebido(arquivo), save=False)
+        paciente.save(update_fields=["foto", "data_atualizacao"])
+        logger.info(f"Foto do paciente {paciente.pk} recebida: {paciente.foto.name}")
+
+    def _metadados(self, upload_id: str, usuario_id: int) -> Optional[dict]:
+        if not _RE_UPLOAD_ID.fullmatch(upload_id or ""):
+            return None
+        try:
+            metadados = json.loads(self._caminho(upload_id, "json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        return metadados if metadados["usuario"] == usuario_id else None
+
+    def _estado(self, upload_id: str, metadados: dict) -> dict:
+        return {
+            "upload_id": upload_id,
+            "paciente": metadados["paciente"],
+            "tamanho": metadados["tamanho"],
+            "recebidos": self._recebidos(upload_id),
+            "concluido": False,
+        }
+
+    def _recebidos(self, upload_id: str) -> int:
+        try:
+            return self._caminho(upload_id, "parte").stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _caminho(self, upload_id: str, extensao: str) -> Path:
+        return self.diretorio / f"{upload_id}.{extensao}"
+
+    def _remover(self, upload_id: str) -> None:
+        for extensao in ("parte", "json"):
+            self._caminho(upload_id, extensao).unlink(missing_ok=True)
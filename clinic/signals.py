@@ -0,0 +1,250 @@
+"""
+Sinais da aplicação clinic.
+
+- Mantém a versão da base de conhecimento (VersaoBaseConhecimento) em dia
+  quando sintomas, doenças ou suas associações são alterados fora do
+  comando sync_kb (admin, API, scripts de carga).
+- Incrementa as versões de tabela usadas pelo cache de respostas
+  (clinic.cache) quando tutores, pacientes ou consultas mudam.
+- Registra as exclusões de tutores, pacientes e consultas
+  (RegistroExclusao) para a sincronização incremental.
+- Mantém o índice da busca global (ItemBusca/TokenBusca) em dia.
+- Invalida o histórico em cache dos pacientes cujas consultas mudaram.
+- Mantém os contadores (total_consultas, total_pacientes, total_sintomas)
+  via ContadorService.
+
+Operações em lote (bulk_create/bulk_update/update) não disparam sinais;
+quem as usa deve chamar incrementar_versao_tabela(),
+BuscaService().indexar(), HistoricoPacienteService.invalidar() e
+ContadorService().recontar_afetados() diretamente.
+"""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from .cache import incrementar_versao_tabela
+from .models import (
+    Consulta,
+    Doenca,
+    Paciente,
+    RegistroExclusao,
+    Sintoma,
+    Tutor,
+    Veterinario,
+)
+from .services import (
+    BaseConhecimentoService,
+    BuscaService,
+    ContadorService,
+    HistoricoPacienteService,
+    MiniaturaService,
+)
+from .services.contador_service import campos_rastreados
+
+# Relação de cada tabela de associação da consulta, para localizar as
+# consultas afetadas quando a alteração é feita pelo lado do sintoma/doença
+_RELACOES_CONSULTA = {
+    Consulta.sintomas_apresentados.through: "sintomas_apresentados",
+    Consulta.diagnosticos_suspeitos.through: "diagnosticos_suspeitos",
+    Consulta.diagnosticos_definitivos.through: "diagnosticos_definitivos",
+}
+
+
+def _incrementar_versao_base():
+    service = BaseConhecimentoService()
+    if service.versionamento_automatico():
+        service.incrementar_versao()
+
+
+@receiver(post_save, sender=Sintoma)
+@receiver(post_save, sender=Doenca)
+@receiver(post_delete, sender=Sintoma)
+@receiver(post_delete, sender=Doenca)
+def base_conhecimento_alterada(sender, **kwargs):
+    """Incrementa a versão da base ao salvar ou remover sintomas/doenças."""
+    _incrementar_versao_base()
+
+
+@receiver(m2m_changed, sender=Doenca.sintomas_associados.through)
+def associacoes_alteradas(sender, action, **kwargs):
+    """Incrementa a versão da base ao alterar os sintomas de uma doença."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        _incrementar_versao_base()
+
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_save, sender=Paciente)
+@receiver(post_save, sender=Consulta)
+@receiver(post_save, sender=Veterinario)
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Paciente)
+@receiver(post_delete, sender=Consulta)
+@receiver(post_delete, sender=Veterinario)
+def tabela_alterada(sender, **kwargs):
+    """Invalida as respostas em cache que dependem da tabela alterada."""
+    incrementar_versao_tabela(sender._meta.model_name)
+
+
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Paciente)
+@receiver(post_delete, sender=Consulta)
+def registrar_exclusao(sender, instance, **kwargs):
+    """Grava a marca de exclusão usada pelos endpoints /sync/."""
+    RegistroExclusao.objects.create(
+        tabela=sender._meta.model_name, objeto_id=instance.pk
+    )
+
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_save, sender=Paciente)
+@receiver(post_save, sender=Consulta)
+def indexar_busca(sender, instance, raw=False, **kwargs):
+    """Atualiza o registro no índice da busca global."""
+    if not raw:
+        BuscaService().indexar(sender._meta.model_name, [instance.pk])
+
+
+@receiver(post_save, sender=Paciente)
+def agendar_miniaturas(sender, instance, raw=False, **kwargs):
+    """Agenda a geração das miniaturas quando a foto do paciente muda."""
+    if raw or not instance.foto:
+        return
+    if (instance.miniaturas or {}).get("origem") != instance.foto.name:
+        MiniaturaService().agendar(instance.pk)
+
+
+@receiver(post_delete, sender=Tutor)
+@receiver(post_delete, sender=Paciente)
+@receiver(post_delete, sender=Consulta)
+def remover_da_busca(sender, instance, **kwargs):
+    """Remove o registro excluído do índice da busca global."""
+    BuscaService().remover(sender._meta.model_name, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Consulta.sintomas_apresentados.through)
+@receiver(m2m_changed, sender=Consulta.diagnosticos_suspeitos.through)
+@receiver(m2m_changed, sender=Consulta.diagnosticos_definitivos.through)
+def consulta_associacoes_alteradas(sender, action, **kwargs):
+    """Invalida o cache de consultas ao alterar sintomas/diagnósticos."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        incrementar_versao_tabela("consulta")
+
+
+@receiver(post_init, sender=Paciente)
+@receiver(post_init, sender=Consulta)
+def guardar_valores_originais(sender, instance, **kwargs):
+    """
+    Guarda as FKs carregadas (paciente, veterinário, tutor), para ajustar
+    o registro antigo e o novo quando elas mudam.
+    """
+    # __dict__ evita carregar campos adiados com only()/defer()
+    instance._valores_originais = {
+        campo: instance.__dict__[campo]
+        for campo in campos_rastreados(sender)
+        if campo in instance.__dict__
+    }
+
+
+@receiver(post_save, sender=Consulta)
+@receiver(post_delete, sender=Consulta)
+def historico_alterado(sender, instance, **kwargs):
+    """Invalida o histórico em cache do paciente da consulta."""
+    originais = getattr(instance, "_valores_originais", {})
+    HistoricoPacienteService.invalidar(
+        {instance.paciente_id, originais.get("paciente_id")}
+    )
+
+
+@receiver(m2m_changed, sender=Consulta.sintomas_apresentados.through)
+@receiver(m2m_changed, sender=Consulta.diagnosticos_suspeitos.through)
+@receiver(m2m_changed, sender=Consulta.diagnosticos_definitivos.through)
+def historico_associacoes_alteradas(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Invalida o histórico dos pacientes das consultas cujas associações mudaram."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            HistoricoPacienteService.invalidar([instance.paciente_id])
+        return
+    # Alteração pelo lado do sintoma/doença: pk_set são consultas. No clear
+    # o conjunto não é informado e as associações só existem antes dele.
+    if action in ("post_add", "post_remove"):
+        consultas = Consulta.objects.filter(pk__in=pk_set)
+    elif action == "pre_clear":
+        consultas = Consulta.objects.filter(**{_RELACOES_CONSULTA[sender]: instance})
+    else:
+        return
+    HistoricoPacienteService.invalidar(
+        consultas.values_list("paciente_id", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=Paciente)
+@receiver(post_save, sender=Consulta)
+def contadores_apos_gravar(sender, instance, created, raw=False, **kwargs):
+    """Ajusta total_pacientes/total_consultas com UPDATE ... + 1."""
+    if not raw:
+        ContadorService().registrar_gravacao(
+            instance, created, getattr(instance, "_valores_originais", {})
+        )
+
+
+@receiver(post_delete, sender=Paciente)
+@receiver(post_delete, sender=Consulta)
+def contadores_apos_remover(sender, instance, **kwargs):
+    """Ajusta total_pacientes/total_consultas com UPDATE ... - 1."""
+    ContadorService().registrar_remocao(instance)
+
+
+def _doencas_do_sintoma(sintoma):
+    return list(sintoma.doenca_set.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Doenca.sintomas_associados.through)
+def contadores_sintomas_doenca(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Reconta total_sintomas das doenças cujas associações mudaram.
+
+    Recontagem em vez de +/-: no remove, pk_set traz os IDs pedidos, que
+    podem não estar associados.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            ContadorService().recontar("doenca.total_sintomas", [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        ContadorService().recontar("doenca.total_sintomas", pk_set)
+    elif action == "pre_clear":
+        instance._doencas_afetadas = _doencas_do_sintoma(instance)
+    elif action == "post_clear":
+        ContadorService().recontar(
+            "doenca.total_sintomas", getattr(instance, "_doencas_afetadas", [])
+        )
+
+
+@receiver(pre_delete, sender=Sintoma)
+def guardar_doencas_do_sintoma(sender, instance, **kwargs):
+    """Guarda as doenças do sintoma antes que as associações sejam apagadas."""
+    instance._doencas_afetadas = _doencas_do_sintoma(instance)
+
+
+@receiver(post_delete, sender=Sintoma)
+def contadores_apos_remover_sintoma(sender, instance, **kwargs):
+    """Reconta total_sintomas das doenças que tinham o sintoma removido."""
+    ContadorService().recontar(
+        "doenca.total_sintomas", getattr(instance, "_doencas_afetadas", [])
+    )
+
+
+# Registrado por último: os receptores acima comparam com os valores
+# carregados, que só então passam a ser os gravados.
+@receiver(post_save, sender=Paciente)
+@receiver(post_save, sender=Consulta)
+def atualizar_valores_originais(sender, instance, **kwargs):
+    """Passa a comparar as próximas gravações com os valores gravados."""
+    guardar_valores_originais(sender, instance)
@@ -1,10 +1,36 @@
+import csv
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
+from PIL import Image
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from .cache import incrementar_versao_tabela
+from .constants import (
+    DEDUPE_LIMIAR_PADRAO,
+    FOTO_TAMANHO_MAXIMO,
+    FOTO_TAMANHO_MAXIMO_PARTE,
+    FOTO_UPLOAD_VALIDADE,
+    MINIATURA_TAMANHOS,
+)
 from .factories import (
     ConsultaFactory,
     DoencaFactory,
@@ -13,9 +39,28 @@ from .factories import (
     TutorFactory,
     VeterinarioFactory,
 )
-from .models import Consulta, Paciente, Sintoma, Tutor, Veterinario
+from .mixins import RespostaCondicionalMixin
+from .models import (
+    Consulta,
+    Doenca,
+    ItemBusca,
+    Paciente,
+    Sintoma,
+    Tutor,
+    Veterinario,
+    formatar_idade,
+)
 from .serializers import TutorSerializer
-from .services import sugerir_diagnosticos
+from .services import (
+    BaseConhecimentoService,
+    DeduplicacaoTutoresService,
+    ImportacaoService,
+    MiniaturaService,
+    SchemaService,
+    TutorService,
+    UploadFotoService,
+    sugerir_diagnosticos,
+)
 
 # --- Classe Base para Testes de API Autenticados ---
 
@@ -25,6 +70,8 @@ class AuthenticatedAPITestCase(APITestCase):
 
     def setUp(self):
         super().setUp()
+        # O cache não participa do rollback entre testes
+        cache.clear()
         # Cria usuário de teste e autentica
         self.user = User.objects.create_user(
             username="testveterinario",
@@ -118,6 +165,27 @@ class TutorAPITests(AuthenticatedAPITestCase):
             response.data["nome_completo"], serializer_esperado.data["nome_completo"]
         )
 
+    def test_pacientes_embutidos_com_numero_constante_de_queries(self):
+        """Testa o resumo dos pacientes e as queries por página da listagem"""
+        rex = PacienteFactory(tutor=self.tutor1, nome="Rex", especie="CANINO")
+
+        # contagem + página de tutores + pacientes de toda a página
+        with self.assertNumQueries(3):
+            response = self.client.get(self.list_create_url)
+        tutor = next(t for t in response.data["results"] if t["id"] == self.tutor1.id)
+        self.assertEqual(
+            tutor["pacientes"],
+            [{"id": rex.id, "nome": "Rex", "especie": "CANINO", "status": rex.status}],
+        )
+
+        for outro in TutorFactory.create_batch(5):
+            PacienteFactory.create_batch(2, tutor=outro)
+        with self.assertNumQueries(3):
+            self.client.get(self.list_create_url)
+
+        response = self.client.get(self.detail_url_tutor1)
+        self.assertEqual(response.data["pacientes"][0]["id"], rex.id)
+
     def test_atualizar_tutor_patch(self):
         """Testa atualização parcial de um tutor"""
         data_parcial = {
@@ -850,3 +918,1872 @@ class ConsultaIntegrationTests(AuthenticatedAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 1)
         self.assertEqual(response.data["results"][0]["paciente"], self.paciente.id)
+
+
+class SincronizacaoBaseConhecimentoTests(TestCase):
+    """Testes para a sincronização da base de conhecimento (sync_kb)."""
+
+    def setUp(self):
+        self.dados = {
+            "versao": "2025.11",
+            "sintomas": [{"nome": "Febre", "descricao": "Temperatura elevada"}],
+            "doencas": [
+                {
+                    "nome": "Gripe",
+                    "descricao": "Infecção viral",
+                    "sintomas": ["Febre", "Tosse"],
+                }
+            ],
+        }
+        self.service = BaseConhecimentoService()
+
+    def test_sincronizar_cria_registros_e_incrementa_versao_uma_vez(self):
+        """Testa inserção de sintomas, doenças e associações em lote"""
+        resumo = self.service.sincronizar(self.dados)
+
+        self.assertEqual(resumo["sintomas_criados"], 2)
+        self.assertEqual(resumo["doencas_criadas"], 1)
+        self.assertEqual(resumo["associacoes_criadas"], 2)
+        self.assertEqual(resumo["versao"], 1)
+        gripe = Doenca.objects.get(nome="Gripe")
+        self.assertEqual(
+            set(gripe.sintomas_associados.values_list("nome", flat=True)),
+            {"Febre", "Tosse"},
+        )
+        self.assertEqual(self.service.versao_atual().origem, "2025.11")
+
+    def test_sincronizar_mesmo_arquivo_e_idempotente(self):
+        """Testa que reaplicar o mesmo arquivo não altera nada nem a versão"""
+        self.service.sincronizar(self.dados)
+        resumo = self.service.sincronizar(self.dados)
+
+        self.assertEqual(resumo["versao"], 1)
+        self.assertFalse(any(v for k, v in resumo.items() if k != "versao"))
+
+    def test_sincronizar_remove_e_atualiza_diferencas(self):
+        """Testa remoção de associações/sintomas ausentes e atualização de descrições"""
+        self.service.sincronizar(self.dados)
+        self.dados["sintomas"] = [{"nome": "Febre", "descricao": "Hipertermia"}]
+        self.dados["doencas"][0]["sintomas"] = ["Febre"]
+
+        resumo = self.service.sincronizar(self.dados, remover=True)
+
+        self.assertEqual(resumo["sintomas_removidos"], 1)
+        self.assertEqual(resumo["sintomas_atualizados"], 1)
+        self.assertEqual(resumo["associacoes_removidas"], 1)
+        self.assertEqual(resumo["versao"], 2)
+        self.assertFalse(Sintoma.objects.filter(nome="Tosse").exists())
+        self.assertEqual(Sintoma.objects.get(nome="Febre").descricao, "Hipertermia")
+
+    def test_sincronizar_sinonimos(self):
+        """Testa que os sinônimos do arquivo são gravados e atualizados"""
+        self.dados["sintomas"][0]["sinonimos"] = ["Hipertermia", " Pirexia ", ""]
+        self.service.sincronizar(self.dados)
+        febre = Sintoma.objects.get(nome="Febre")
+        self.assertEqual(febre.sinonimos, "Hipertermia\nPirexia")
+
+        self.dados["sintomas"][0]["sinonimos"] = ["Pirexia"]
+        resumo = self.service.sincronizar(self.dados)
+        self.assertEqual(resumo["sintomas_atualizados"], 1)
+        self.assertEqual(Sintoma.objects.get(nome="Febre").sinonimos, "Pirexia")
+
+        # Sintoma só citado por uma doença: sinônimos atuais preservados
+        Sintoma.objects.filter(nome="Tosse").update(sinonimos="Tossir")
+        self.service.sincronizar(self.dados)
+        self.assertEqual(Sintoma.objects.get(nome="Tosse").sinonimos, "Tossir")
+
+        self.dados["sintomas"][0]["sinonimos"] = "Pirexia"
+        with self.assertRaisesMessage(ValueError, "Febre"):
+            self.service.sincronizar(self.dados)
+
+    def test_ausentes_so_sao_removidos_com_prune(self):
+        """Testa que, sem remover=True, o que saiu do arquivo é mantido"""
+        self.service.sincronizar(self.dados)
+        self.dados["doencas"] = []
+
+        resumo = self.service.sincronizar(self.dados)
+
+        self.assertEqual(resumo["sintomas_removidos"], 0)
+        self.assertEqual(resumo["doencas_removidas"], 0)
+        self.assertEqual(resumo["associacoes_removidas"], 0)
+        self.assertEqual(
+            Doenca.objects.get(nome="Gripe").sintomas_associados.count(), 2
+        )
+
+    def test_prune_mantem_registros_usados_em_consultas(self):
+        """Testa que --prune não apaga sintomas/doenças de consultas"""
+        self.service.sincronizar(self.dados)
+        consulta = ConsultaFactory(
+            sintomas_apresentados=[Sintoma.objects.get(nome="Tosse")],
+            diagnosticos_suspeitos=[Doenca.objects.get(nome="Gripe")],
+        )
+        self.dados["sintomas"] = [{"nome": "Vômito"}]
+        self.dados["doencas"] = []
+
+        saida = StringIO()
+        call_command("sync_kb", self._gravar_arquivo(), prune=True, stdout=saida)
+
+        self.assertIn("sintomas_mantidos_em_uso: 1", saida.getvalue())
+        self.assertIn("doencas_mantidas_em_uso: 1", saida.getvalue())
+        self.assertIn("Tosse", saida.getvalue())
+        self.assertFalse(Sintoma.objects.filter(nome="Febre").exists())
+        self.assertEqual(consulta.sintomas_apresentados.get().nome, "Tosse")
+        self.assertEqual(consulta.diagnosticos_suspeitos.get().nome, "Gripe")
+
+    def test_sintomas_da_doenca_devem_ser_nomes(self):
+        """Testa erro de validação (e não AttributeError) com nomes inválidos"""
+        self.dados["doencas"][0]["sintomas"] = ["Febre", 3, None]
+        with self.assertRaisesMessage(CommandError, "Gripe"):
+            call_command("sync_kb", self._gravar_arquivo(), stdout=StringIO())
+        self.assertFalse(Sintoma.objects.exists())
+
+    def _gravar_arquivo(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        caminho = os.path.join(diretorio, "base.json")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.dados, arquivo)
+        return caminho
+
+    def test_dry_run_nao_grava_alteracoes(self):
+        """Testa que o dry-run apenas calcula a diferença"""
+        resumo = self.service.sincronizar(self.dados, dry_run=True)
+
+        self.assertEqual(resumo["doencas_criadas"], 1)
+        self.assertEqual(resumo["versao"], 0)
+        self.assertFalse(Doenca.objects.exists())
+
+    def test_arquivo_com_doenca_duplicada_e_rejeitado(self):
+        """Testa validação de nomes duplicados no arquivo"""
+        self.dados["doencas"].append({"nome": "Gripe"})
+        with self.assertRaises(ValueError):
+            self.service.sincronizar(self.dados)
+        self.assertFalse(Sintoma.objects.exists())
+
+
+class ImportacaoClinicaTests(TestCase):
+    """Testes para a importação em massa (importar_clinica)."""
+
+    def setUp(self):
+        from validate_docbr import CPF
+
+        self.cpf = CPF().generate(True)
+        self.diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.diretorio)
+        self.febre = SintomaFactory(nome="Febre")
+        self.tosse = SintomaFactory(nome="Tosse")
+        gripe = DoencaFactory(nome="Gripe")
+        gripe.sintomas_associados.set([self.febre, self.tosse])
+        VeterinarioFactory(crmv="CRMV-SP 1234")
+
+    def _arquivo(self, nome, conteudo):
+        caminho = os.path.join(self.diretorio, nome)
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(conteudo)
+        return caminho
+
+    def test_importar_arquivos_resolve_referencias_e_grava_rejeitos(self):
+        """Testa o fluxo completo tutores -> pacientes -> consultas"""
+        tutores = self._arquivo(
+            "tutores.csv",
+            "nome_completo,cpf,email\n"
+            f"Ana Souza,{self.cpf.replace('.', '').replace('-', '')},ana@example.com\n"
+            "CPF Ruim,000.000.000-00,ruim@example.com\n",
+        )
+        pacientes = self._arquivo(
+            "pacientes.csv",
+            "id_origem,nome,tutor_cpf,especie,data_nascimento\n"
+            f"P1,Rex,{self.cpf},canino,2020-01-15\n"
+            "P2,Sem Tutor,123.456.789-09,FELINO,\n",
+        )
+        consultas = self._arquivo(
+            "consultas.jsonl",
+            json.dumps(
+                {
+                    "paciente_ref": "P1",
+                    "veterinario_crmv": "CRMV-SP 1234",
+                    "data_hora_agendamento": "2024-05-10T14:30:00",
+                    "sintomas": ["Febre", "Tosse"],
+                }
+            )
+            + "\n"
+            + json.dumps(
+                {
+                    "paciente_ref": "P1",
+                    "data_hora_agendamento": "2024-05-11T09:00:00",
+                    "sintomas": "Febre|Espirro",
+                }
+            )
+            + "\n",
+        )
+        rejeitos = os.path.join(self.diretorio, "rejeitos.jsonl")
+
+        call_command(
+            "importar_clinica",
+            tutores=tutores,
+            pacientes=pacientes,
+            consultas=consultas,
+            rejeitos=rejeitos,
+            processos=1,
+            diagnosticos=True,
+            stdout=StringIO(),
+        )
+
+        rex = Paciente.objects.get(nome="Rex")
+        self.assertEqual(rex.tutor.cpf, self.cpf)
+        self.assertEqual(rex.especie, "CANINO")
+        consulta = Consulta.objects.get(paciente=rex)
+        self.assertEqual(consulta.sintomas_apresentados.count(), 2)
+        self.assertEqual(consulta.veterinario_responsavel.crmv, "CRMV-SP 1234")
+        self.assertEqual(
+            list(consulta.diagnosticos_suspeitos.values_list("nome", flat=True)),
+            ["Gripe"],
+        )
+
+        with open(rejeitos, encoding="utf-8") as arquivo:
+            erros = [json.loads(linha) for linha in arquivo]
+        self.assertEqual(
+            [(e["arquivo"], e["linha"]) for e in erros],
+            [("tutores", 3), ("pacientes", 3), ("consultas", 2)],
+        )
+
+    def test_importar_tutores_rejeita_cpf_ja_cadastrado(self):
+        """Testa que CPFs existentes ou repetidos no arquivo são rejeitados"""
+        TutorFactory(cpf=self.cpf)
+        caminho = self._arquivo(
+            "tutores.jsonl",
+            json.dumps({"nome_completo": "Repetido", "cpf": self.cpf}) + "\n",
+        )
+        rejeitos = StringIO()
+
+        criados = ImportacaoService(rejeitos).importar_tutores(caminho)
+
+        self.assertEqual(criados, 0)
+        self.assertIn("já cadastrado", rejeitos.getvalue())
+
+    def test_importar_rejeita_valores_que_o_banco_recusaria(self):
+        """Testa que tamanho, e-mail, decimais e id_origem repetido vão aos rejeitos"""
+        from validate_docbr import CPF
+
+        cpfs = CPF().generate_list(3, mask=True)
+        tutores = self._arquivo(
+            "tutores.jsonl",
+            "".join(
+                json.dumps(registro) + "\n"
+                for registro in [
+                    {"nome_completo": "Ana", "cpf": cpfs[0]},
+                    {"nome_completo": "X" * 300, "cpf": cpfs[1]},
+                    {"nome_completo": "Bia", "cpf": cpfs[2], "email": "bia@"},
+                ]
+            ),
+        )
+        pacientes = self._arquivo(
+            "pacientes.csv",
+            "id_origem,nome,tutor_cpf,especie,peso_kg\n"
+            f"P1,Rex,{cpfs[0]},CANINO,12.5\n"
+            f"P1,Toby,{cpfs[0]},CANINO,\n"
+            f"P2,Bolinha,{cpfs[0]},CANINO,12345.5\n",
+        )
+        rejeitos = StringIO()
+        service = ImportacaoService(rejeitos)
+
+        self.assertEqual(service.importar_tutores(tutores), 1)
+        self.assertEqual(service.importar_pacientes(pacientes), 1)
+
+        erros = [json.loads(linha)["erro"] for linha in rejeitos.getvalue().splitlines()]
+        self.assertEqual(len(erros), 4)
+        self.assertTrue(erros[0].startswith("nome_completo:"))
+        self.assertTrue(erros[1].startswith("email:"))
+        self.assertEqual(erros[2], "id_origem: duplicado no arquivo")
+        self.assertTrue(erros[3].startswith("peso_kg:"))
+
+    def test_linhas_malformadas_vao_aos_rejeitos_sem_abortar(self):
+        """Testa que JSON inválido e linhas que não são objetos são rejeitados"""
+        from validate_docbr import CPF
+
+        cpfs = CPF().generate_list(2, mask=True)
+        caminho = self._arquivo(
+            "tutores.jsonl",
+            json.dumps({"nome_completo": "Ana", "cpf": cpfs[0]})
+            + "\n"
+            + '{"nome_completo": "Quebrado", \n'
+            + json.dumps(["x"])
+            + "\n"
+            + json.dumps({"nome_completo": "Bia", "cpf": cpfs[1]})
+            + "\n",
+        )
+        rejeitos = StringIO()
+
+        for processos in (1, 2):
+            with self.subTest(processos=processos):
+                Tutor.objects.all().delete()
+                rejeitos.seek(0)
+                rejeitos.truncate()
+                service = ImportacaoService(
+                    rejeitos, tamanho_lote=2, processos=processos
+                )
+                self.assertEqual(service.importar_tutores(caminho), 2)
+
+                erros = sorted(
+                    (e["linha"], e["erro"])
+                    for e in map(json.loads, rejeitos.getvalue().splitlines())
+                )
+                self.assertEqual([linha for linha, _ in erros], [2, 3])
+                self.assertTrue(erros[0][1].startswith("registro: JSON inválido"))
+                self.assertEqual(erros[1][1], "registro: esperado um objeto")
+                self.assertEqual(
+                    set(Tutor.objects.values_list("cpf", flat=True)), set(cpfs)
+                )
+
+
+class ExportacaoStreamingTests(AuthenticatedAPITestCase):
+    """Testes para os endpoints de exportação em streaming."""
+
+    def setUp(self):
+        super().setUp()
+        self.tutor = TutorFactory(nome_completo="Ana Exportação")
+        self.rex = PacienteFactory(nome="Rex", tutor=self.tutor)
+        self.mimi = PacienteFactory(nome="Mimi", tutor=self.tutor)
+        self.febre = SintomaFactory(nome="Febre")
+        self.consulta_rex = ConsultaFactory(
+            paciente=self.rex, sintomas_apresentados=[self.febre]
+        )
+        ConsultaFactory(paciente=self.mimi)
+
+    def _conteudo(self, response):
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_exportar_consultas_ndjson_respeita_filtros(self):
+        """Testa exportação NDJSON com filtro e IDs M2M agregados"""
+        response = self.client.get(
+            reverse("consulta-export"), {"format": "ndjson", "paciente": self.rex.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        linhas = [json.loads(linha) for linha in self._conteudo(response).splitlines()]
+        self.assertEqual(len(linhas), 1)
+        self.assertEqual(linhas[0]["id"], self.consulta_rex.id)
+        self.assertEqual(linhas[0]["paciente_id"], self.rex.id)
+        self.assertEqual(linhas[0]["sintomas_apresentados"], [self.febre.id])
+
+    def test_exportar_tutores_csv_inclui_pacientes(self):
+        """Testa exportação CSV com cabeçalho e relacionamento reverso"""
+        response = self.client.get(reverse("tutor-export"), {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        linhas = list(csv.DictReader(StringIO(self._conteudo(response))))
+        self.assertEqual(len(linhas), 1)
+        self.assertEqual(linhas[0]["nome_completo"], "Ana Exportação")
+        self.assertEqual(
+            set(linhas[0]["pacientes"].split("|")), {str(self.rex.id), str(self.mimi.id)}
+        )
+
+
+class OperacoesEmLoteTests(AuthenticatedAPITestCase):
+    """Testes para criação e atualização em lote de tutores e pacientes."""
+
+    def setUp(self):
+        super().setUp()
+        from validate_docbr import CPF
+
+        self.cpfs = CPF().generate_list(3, mask=True, repeat=False)
+        self.tutor = TutorFactory()
+
+    def test_criar_tutores_em_lote_reporta_erros_por_item(self):
+        """Testa criação em lote com itens inválidos e CPF repetido no lote"""
+        dados = [
+            {"nome_completo": "Tutor Um", "cpf": self.cpfs[0]},
+            {"nome_completo": "Tutor Dois", "cpf": "123"},
+            {"nome_completo": "Tutor Três", "cpf": self.cpfs[1]},
+            {"nome_completo": "Tutor Repetido", "cpf": self.cpfs[0]},
+        ]
+        response = self.client.post(reverse("tutor-list"), dados, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(
+            [tutor["nome_completo"] for tutor in response.data["criados"]],
+            ["Tutor Um", "Tutor Três"],
+        )
+        self.assertEqual([erro["indice"] for erro in response.data["erros"]], [1, 3])
+        self.assertIn("cpf", response.data["erros"][0]["erros"])
+        self.assertEqual(Tutor.objects.count(), 3)
+
+    def test_criar_pacientes_em_lote(self):
+        """Testa criação em lote de pacientes válidos"""
+        dados = [
+            {"nome": f"Pet {i}", "tutor": self.tutor.pk, "especie": "CANINO"}
+            for i in range(3)
+        ]
+        response = self.client.post(reverse("paciente-list"), dados, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["criados"]), 3)
+        self.assertEqual(response.data["erros"], [])
+        self.assertEqual(self.tutor.pacientes.count(), 3)
+
+    def test_lote_acima_do_limite_retorna_erro(self):
+        """Testa que listas maiores que o limite são rejeitadas"""
+        from .constants import MAX_ITENS_LOTE
+
+        dados = [{"nome_completo": "X"}] * (MAX_ITENS_LOTE + 1)
+        response = self.client.post(reverse("tutor-list"), dados, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tutor.objects.count(), 1)
+
+    def test_atualizar_pacientes_em_lote_por_id(self):
+        """Testa PATCH em lote com id inexistente e id repetido"""
+        rex = PacienteFactory(tutor=self.tutor, peso_kg="10.000")
+        mimi = PacienteFactory(tutor=self.tutor, peso_kg="4.000")
+        dados = [
+            {"id": rex.pk, "peso_kg": "12.500"},
+            {"id": mimi.pk, "status": "OBITO"},
+            {"id": 999999, "peso_kg": "1.000"},
+            {"id": rex.pk, "peso_kg": "13.000"},
+        ]
+        response = self.client.patch(reverse("paciente-list"), dados, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(len(response.data["atualizados"]), 2)
+        self.assertEqual([erro["indice"] for erro in response.data["erros"]], [2, 3])
+        rex.refresh_from_db()
+        mimi.refresh_from_db()
+        self.assertEqual(str(rex.peso_kg), "12.500")
+        self.assertEqual(mimi.status, "OBITO")
+
+
+class LookupsAPITests(AuthenticatedAPITestCase):
+    """Testes para o endpoint compacto de listas (/lookups/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("lookups")
+        tutor = TutorFactory()
+        self.rex = PacienteFactory(nome="Rex", tutor=tutor)
+        self.amora = PacienteFactory(nome="Amora", tutor=tutor)
+        self.febre = SintomaFactory(nome="Febre")
+
+    def test_retorna_pares_id_rotulo_ordenados(self):
+        """Testa o formato [id, rótulo] e a ordenação pelo rótulo"""
+        response = self.client.get(self.url, {"recursos": "pacientes,sintomas"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        dados = json.loads(response.content)
+        self.assertEqual(set(dados), {"pacientes", "sintomas"})
+        self.assertEqual(
+            dados["pacientes"], [[self.amora.id, "Amora"], [self.rex.id, "Rex"]]
+        )
+        self.assertEqual(dados["sintomas"], [[self.febre.id, "Febre"]])
+
+    def test_etag_retorna_304_ate_o_conteudo_mudar(self):
+        """Testa If-None-Match com ETag igual e após uma alteração"""
+        params = {"recursos": "pacientes"}
+        etag = self.client.get(self.url, params)["ETag"]
+
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.rex.nome = "Rex II"
+        self.rex.save()
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_recurso_desconhecido_retorna_400(self):
+        """Testa validação do parâmetro 'recursos'"""
+        response = self.client.get(self.url, {"recursos": "pacientes,usuarios"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("usuarios", response.data["detail"])
+
+
+class BaseConhecimentoCondicionalTests(AuthenticatedAPITestCase):
+    """Testes para ETag/Last-Modified dos endpoints da base de conhecimento."""
+
+    def setUp(self):
+        super().setUp()
+        self.febre = SintomaFactory(nome="Febre")
+        self.gripe = DoencaFactory(nome="Gripe")
+        self.gripe.sintomas_associados.set([self.febre])
+
+    def test_if_none_match_retorna_304_sem_consultar_a_tabela(self):
+        """Testa 304 respondido apenas com a leitura da versão da base"""
+        url = reverse("doenca-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_alteracoes_na_base_invalidam_o_etag(self):
+        """Testa que save, delete e m2m de sintomas/doenças mudam o ETag"""
+        url = reverse("sintoma-detail", kwargs={"pk": self.febre.pk})
+        alteracoes = [
+            lambda: SintomaFactory(nome="Tosse"),
+            lambda: self.gripe.sintomas_associados.clear(),
+            lambda: DoencaFactory(nome="Rinite").delete(),
+        ]
+        for alterar in alteracoes:
+            etag = self.client.get(url)["ETag"]
+            alterar()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+
+
+    def test_mixin_exige_tabelas_e_usa_versoes_do_cache(self):
+        """Testa tabelas_versao obrigatório e o ETag padrão pelo clinic.cache"""
+        with self.assertRaises(ImproperlyConfigured):
+
+            class SemTabelas(RespostaCondicionalMixin):
+                pass
+
+        class Pacientes(RespostaCondicionalMixin):
+            tabelas_versao = ("paciente", "tutor")
+
+        versao, data = Pacientes().get_versao_recurso()
+        self.assertIsNone(data)
+        incrementar_versao_tabela("tutor")
+        self.assertNotEqual(Pacientes().get_versao_recurso()[0], versao)
+
+
+class CacheRespostaBaseConhecimentoTests(AuthenticatedAPITestCase):
+    """Testes para o cache das listagens da base de conhecimento."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("doenca-list")
+        self.febre = SintomaFactory(nome="Febre")
+        self.gripe = DoencaFactory(nome="Gripe")
+        self.gripe.sintomas_associados.set([self.febre])
+
+    def test_acerto_no_cache_nao_consulta_o_banco(self):
+        """Testa que a mesma listagem é servida do cache sem queries"""
+        primeira = self.client.get(self.url, {"search": "", "page": 1})
+        self.assertEqual(primeira.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            segunda = self.client.get(self.url, {"page": 1})
+        self.assertEqual(segunda.status_code, status.HTTP_200_OK)
+        self.assertEqual(segunda.content, primeira.content)
+        self.assertEqual(segunda["ETag"], primeira["ETag"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {"page": 1}, HTTP_IF_NONE_MATCH=primeira["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_alterar_associacoes_invalida_o_cache(self):
+        """Testa invalidação ao mudar os sintomas de uma doença"""
+        self.client.get(self.url)
+        tosse = SintomaFactory(nome="Tosse")
+        self.gripe.sintomas_associados.add(tosse)
+
+        response = self.client.get(self.url)
+        nomes = [s["nome"] for s in response.data["results"][0]["sintomas_associados"]]
+        self.assertEqual(sorted(nomes), ["Febre", "Tosse"])
+
+    def test_sync_kb_invalida_o_cache(self):
+        """Testa invalidação após sincronizar a base (operações em lote)"""
+        self.client.get(self.url)
+        BaseConhecimentoService().sincronizar(
+            {
+                "sintomas": [{"nome": "Febre"}],
+                "doencas": [
+                    {"nome": "Gripe", "sintomas": ["Febre"]},
+                    {"nome": "Dengue", "sintomas": ["Febre"]},
+                ],
+            }
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 2)
+
+
+class CacheRespostaPacientesTutoresTests(AuthenticatedAPITestCase):
+    """Testes para o cache das listagens de pacientes e tutores."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("paciente-list")
+        self.tutor = TutorFactory(nome_completo="Carla Souza")
+        self.rex = PacienteFactory(nome="Rex", tutor=self.tutor, especie="CANINO")
+
+    def test_mesma_busca_e_servida_do_cache(self):
+        """Testa que a ordem dos parâmetros não muda a chave do cache"""
+        self.client.get(self.url, {"especie": "CANINO", "search": "Rex"})
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {"search": "Rex", "especie": "CANINO"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["count"], 1)
+
+    def test_alterar_tutor_invalida_listagem_de_pacientes(self):
+        """Testa invalidação pela tabela relacionada (nome do tutor)"""
+        self.client.get(self.url)
+        self.tutor.nome_completo = "Carla Lima"
+        self.tutor.save()
+
+        response = self.client.get(self.url)
+        paciente = response.data["results"][0]
+        self.assertEqual(paciente["tutor_nome_completo"], "Carla Lima")
+
+    def test_operacoes_em_lote_invalidam_o_cache(self):
+        """Testa invalidação após bulk_create/bulk_update (sem sinais)"""
+        self.client.get(self.url)
+        self.client.post(
+            self.url,
+            [{"nome": "Mimi", "tutor": self.tutor.pk, "especie": "FELINO"}],
+            format="json",
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 2)
+
+        self.client.patch(
+            self.url, [{"id": self.rex.pk, "nome": "Rex II"}], format="json"
+        )
+        response = self.client.get(self.url)
+        nomes = {paciente["nome"] for paciente in response.data["results"]}
+        self.assertEqual(nomes, {"Mimi", "Rex II"})
+
+
+@override_settings(BATCH_MAX_WORKERS=1)
+class BatchAPITests(AuthenticatedAPITestCase):
+    """Testes para o endpoint de requisições em lote (/batch/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("batch")
+        self.rex = PacienteFactory(nome="Rex")
+        self.vet = VeterinarioFactory(nome_completo="Dra. Ana")
+
+    def test_executa_subrequisicoes_na_ordem_pedida(self):
+        """Testa respostas de sucesso, 404 e URL inválida no mesmo lote"""
+        requisicoes = [
+            f"/api/v1/pacientes/{self.rex.pk}/",
+            {"id": "vets", "url": "/api/v1/veterinarios/?search=Ana"},
+            "/api/v1/pacientes/999999/",
+            "https://exemplo.com/api/v1/pacientes/",
+            {"url": "/api/v1/tutores/", "method": "POST"},
+        ]
+        response = self.client.post(
+            self.url, {"requisicoes": requisicoes}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        respostas = response.data["respostas"]
+        self.assertEqual(
+            [r["status"] for r in respostas], [200, 200, 404, 400, 405]
+        )
+        self.assertEqual(respostas[0]["corpo"]["nome"], "Rex")
+        self.assertEqual(respostas[1]["id"], "vets")
+        self.assertEqual(respostas[1]["corpo"]["count"], 1)
+
+    def test_subrequisicao_para_rota_async(self):
+        """Testa que rotas /async/ (views com corrotina) também são executadas"""
+        requisicoes = [
+            "/api/v1/async/pacientes/",
+            f"/api/v1/pacientes/{self.rex.pk}/",
+        ]
+        response = self.client.post(
+            self.url, {"requisicoes": requisicoes}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        respostas = response.data["respostas"]
+        self.assertEqual([r["status"] for r in respostas], [200, 200])
+        self.assertEqual(respostas[0]["corpo"]["count"], 1)
+        self.assertEqual(respostas[0]["corpo"]["results"][0]["nome"], "Rex")
+
+    def test_lote_aninhado_e_formato_invalido(self):
+        """Testa rejeição de batch aninhado e de corpo sem lista"""
+        response = self.client.post(
+            self.url, {"requisicoes": ["/api/v1/batch/"]}, format="json"
+        )
+        self.assertEqual(response.data["respostas"][0]["status"], 400)
+
+        response = self.client.post(self.url, {"requisicoes": "x"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FiltroIdsTests(AuthenticatedAPITestCase):
+    """Testes para o filtro '?ids=' comum a todos os ViewSets."""
+
+    def setUp(self):
+        super().setUp()
+        self.consultas = ConsultaFactory.create_batch(4)
+
+    def test_retorna_registros_na_ordem_pedida_em_uma_pagina(self):
+        """Testa a ordem dos IDs e a paginação que cabe todos os pedidos"""
+        ids = [self.consultas[2].id, self.consultas[0].id, self.consultas[3].id]
+        parametros = {"ids": ",".join(map(str, ids)), "page_size": 1}
+        response = self.client.get(reverse("consulta-list"), parametros)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["id"] for c in response.data["results"]], ids)
+
+    def test_ids_invalidos_ou_acima_do_limite_retornam_400(self):
+        """Testa validação do parâmetro 'ids'"""
+        from .constants import MAX_IDS_FILTRO
+
+        url = reverse("doenca-list")
+        self.assertEqual(
+            self.client.get(url, {"ids": "1,abc"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        muitos = ",".join(str(i) for i in range(1, MAX_IDS_FILTRO + 2))
+        response = self.client.get(url, {"ids": muitos})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", response.data)
+
+
+class SincronizacaoIncrementalTests(AuthenticatedAPITestCase):
+    """Testes para os endpoints de sincronização incremental (/sync/)."""
+
+    def setUp(self):
+        super().setUp()
+        from .models import RegistroExclusao
+
+        self.url = reverse("paciente-sync")
+        self.registros_exclusao = RegistroExclusao.objects
+        self.tutor = TutorFactory()
+        self.pacientes = PacienteFactory.create_batch(3, tutor=self.tutor)
+        self.antes = timezone.now() - timezone.timedelta(hours=1)
+        self._retroceder(Paciente.objects.all(), minutos=30)
+
+    def _retroceder(self, queryset, minutos):
+        """Simula alterações antigas (fora da margem de segurança)."""
+        data = timezone.now() - timezone.timedelta(minutes=minutos)
+        if queryset.model is Paciente:
+            queryset.update(data_atualizacao=data)
+        else:
+            queryset.update(data_exclusao=data)
+
+    def _sincronizar(self, parametros):
+        alterados, excluidos = [], []
+        while True:
+            response = self.client.get(self.url, {**parametros, "limit": 2})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            alterados += [paciente["id"] for paciente in response.data["alterados"]]
+            excluidos += response.data["excluidos"]
+            parametros = {"cursor": response.data["cursor"]}
+            if not response.data["tem_mais"]:
+                return alterados, excluidos, response.data["cursor"]
+
+    def test_sincronizacao_inicial_e_incremental(self):
+        """Testa paginação por cursor, alterações e exclusões"""
+        alterados, excluidos, cursor = self._sincronizar(
+            {"modified_since": self.antes.isoformat()}
+        )
+        self.assertEqual(sorted(alterados), sorted(p.id for p in self.pacientes))
+        self.assertEqual(excluidos, [])
+
+        # Nada mudou: a próxima sincronização volta vazia
+        self.assertEqual(self._sincronizar({"cursor": cursor})[:2], ([], []))
+
+        alterado, removido_id = self.pacientes[0], self.pacientes[1].id
+        alterado.peso_kg = "9.000"
+        alterado.save()
+        self.pacientes[1].delete()
+        self._retroceder(Paciente.objects.filter(pk=alterado.pk), minutos=10)
+        self._retroceder(self.registros_exclusao.all(), minutos=10)
+
+        alterados, excluidos, _ = self._sincronizar({"cursor": cursor})
+        self.assertEqual(alterados, [alterado.id])
+        self.assertEqual(excluidos, [removido_id])
+
+    def test_alteracoes_recentes_ficam_para_a_proxima_sincronizacao(self):
+        """Testa a margem de segurança para transações em andamento"""
+        self.pacientes[0].save()
+        alterados, _, _ = self._sincronizar({"modified_since": self.antes.isoformat()})
+        self.assertNotIn(self.pacientes[0].id, alterados)
+        self.assertEqual(len(alterados), 2)
+
+    def test_parametros_invalidos_retornam_400(self):
+        """Testa modified_since e cursor inválidos"""
+        response = self.client.get(self.url, {"modified_since": "ontem"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"cursor": "xyz"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncViewsTests(AuthenticatedAPITestCase):
+    """Testes para as leituras assíncronas (/async/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.febre = SintomaFactory(nome="Febre")
+        self.tosse = SintomaFactory(nome="Tosse")
+        self.gripe = DoencaFactory(nome="Gripe")
+        self.gripe.sintomas_associados.set([self.febre, self.tosse])
+        self.virose = DoencaFactory(nome="Virose")
+        self.virose.sintomas_associados.set([self.febre, SintomaFactory()])
+        self.consulta = ConsultaFactory()
+        self.consulta.sintomas_apresentados.set([self.febre, self.tosse])
+
+    def test_listagens_equivalentes_as_sincronas(self):
+        """Testa que a listagem async devolve o mesmo corpo da síncrona"""
+        PacienteFactory.create_batch(2)
+        for rota in ("consulta-list", "paciente-list"):
+            params = {"ordering": "id"}
+            sincrona = self.client.get(reverse(rota), params)
+            assincrona = self.client.get(reverse(f"async-{rota}"), params)
+            self.assertEqual(assincrona.status_code, status.HTTP_200_OK)
+            dados = json.loads(assincrona.content)
+            self.assertEqual(dados["count"], sincrona.data["count"])
+            self.assertEqual(
+                [item["id"] for item in dados["results"]],
+                [item["id"] for item in sincrona.data["results"]],
+            )
+
+    def test_detalhe_com_diagnosticos_sem_gravar(self):
+        """Testa o ranking no detalhe async sem persistir as suspeitas"""
+        url = reverse("async-consulta-detail", args=[self.consulta.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        suspeitas = json.loads(response.content)["diagnosticos_suspeitos"]
+        self.assertEqual(
+            [doenca["id"] for doenca in suspeitas], [self.gripe.id, self.virose.id]
+        )
+        self.assertIn("score", suspeitas[0])
+        self.assertFalse(self.consulta.diagnosticos_suspeitos.exists())
+
+        url = reverse("async-consulta-detail", args=[0])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sugestao_avulsa_e_lookups(self):
+        """Testa o diagnóstico avulso e os lookups assíncronos"""
+        url = reverse("async-diagnosticos-sugerir")
+        response = self.client.get(url, {"sintomas": f"{self.tosse.id}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sugeridas = json.loads(response.content)
+        self.assertEqual([doenca["id"] for doenca in sugeridas], [self.gripe.id])
+        response = self.client.get(url, {"sintomas": "a,b"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = reverse("async-lookups")
+        response = self.client.get(url, {"recursos": "sintomas"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sintomas = json.loads(response.content)["sintomas"]
+        self.assertIn([self.febre.id, "Febre"], sintomas)
+
+    def test_token_invalido_retorna_401(self):
+        """Testa que um JWT inválido é recusado como na API síncrona"""
+        response = self.client.get(
+            reverse("async-paciente-list"), HTTP_AUTHORIZATION="Bearer invalido"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RenderersCompressaoTests(AuthenticatedAPITestCase):
+    """Testes para os renderers opcionais e a compressão das respostas da API."""
+
+    def setUp(self):
+        super().setUp()
+        ConsultaFactory.create_batch(5)
+        self.url = reverse("consulta-list")
+
+    def test_json_rapido_igual_ao_json_padrao(self):
+        """Testa que o renderer orjson gera o mesmo JSON do DRF"""
+        from decimal import Decimal
+
+        from rest_framework.renderers import JSONRenderer
+
+        from .renderers import JSONRapidoRenderer
+
+        dados = self.client.get(self.url).data
+        dados["extras"] = {
+            1: Decimal("2.50"),
+            "quando": timezone.now(),
+            "dia": timezone.localdate(),
+        }
+        self.assertEqual(
+            json.loads(JSONRapidoRenderer().render(dados)),
+            json.loads(JSONRenderer().render(dados)),
+        )
+
+    def test_message_pack(self):
+        """Testa a serialização MessagePack (se o pacote estiver instalado)"""
+        from .renderers import MessagePackRenderer, msgpack
+
+        if msgpack is None:
+            self.skipTest("msgpack não instalado")
+        dados = json.loads(self.client.get(self.url).content)
+        self.assertEqual(msgpack.unpackb(MessagePackRenderer().render(dados)), dados)
+
+    def test_compressao_negociada(self):
+        """Testa gzip/brotli conforme o Accept-Encoding, só em /api/"""
+        import gzip
+
+        from .middleware import brotli
+
+        original = self.client.get(self.url).content
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), original)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        if brotli is not None:
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertEqual(brotli.decompress(response.content), original)
+
+        response = self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_resposta_que_reflete_a_query_usa_gzip_com_padding(self):
+        """Testa a mitigação do BREACH: busca autenticada não usa brotli"""
+        import gzip
+
+        url = reverse("busca")
+        TutorFactory.create_batch(5, nome_completo="Ana Souza")
+        original = self.client.get(url, {"q": "ana"}).content
+        tamanhos = set()
+        for _ in range(5):
+            response = self.client.get(
+                url, {"q": "ana"}, HTTP_ACCEPT_ENCODING="gzip, br"
+            )
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(response.content), original)
+            tamanhos.add(len(response.content))
+        # Bytes aleatórios no cabeçalho gzip variam o tamanho da resposta
+        self.assertGreater(len(tamanhos), 1)
+
+
+class SchemaOpenAPITests(APITestCase):
+    """Testes para o schema OpenAPI pré-gerado (/api/schema/)."""
+
+    def setUp(self):
+        cache.clear()
+        SchemaService._memoria.clear()
+        self.diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.diretorio)
+        self.url = reverse("schema")
+
+    def test_gera_uma_vez_e_responde_304_pelo_etag(self):
+        """Testa que o schema é gerado só no primeiro acesso e validado por ETag"""
+        with override_settings(SCHEMA_OPENAPI_DIR=self.diretorio), mock.patch.object(
+            SchemaService, "gerar", autospec=True, side_effect=SchemaService.gerar
+        ) as gerar:
+            primeira = self.client.get(self.url, {"format": "json"})
+            segunda = self.client.get(self.url, {"format": "json"})
+            self.assertEqual(gerar.call_count, 1)
+
+            self.assertEqual(primeira.status_code, status.HTTP_200_OK)
+            self.assertIn("/api/v1/consultas/", json.loads(primeira.content)["paths"])
+            self.assertEqual(segunda.content, primeira.content)
+
+            response = self.client.get(
+                self.url, {"format": "json"}, HTTP_IF_NONE_MATCH=primeira["ETag"]
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            # Outro processo (memória e cache vazios) lê o arquivo em disco
+            SchemaService._memoria.clear()
+            cache.clear()
+            self.client.get(self.url, {"format": "json"})
+            self.assertEqual(gerar.call_count, 1)
+
+    def test_comando_grava_os_arquivos(self):
+        """Testa o comando gerar_schema_openapi"""
+        with override_settings(SCHEMA_OPENAPI_DIR=self.diretorio):
+            call_command("gerar_schema_openapi", stdout=StringIO())
+        versao = SchemaService.versao_codigo()
+        self.assertEqual(
+            sorted(os.listdir(self.diretorio)),
+            [f"openapi-{versao}.json", f"openapi-{versao}.yaml"],
+        )
+
+
+class BuscaGlobalTests(AuthenticatedAPITestCase):
+    """Testes para a busca global (/busca/) e o índice de busca."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("busca")
+        self.tutor = TutorFactory(
+            nome_completo="João Conceição", cpf="529.982.247-25"
+        )
+        self.rex = PacienteFactory(
+            nome="Rex", tutor=self.tutor, microchip="985-112-003-456"
+        )
+        # Nome fixo: um nome aleatório ('João...') apareceria nas buscas
+        self.outro = PacienteFactory(
+            nome="Rexona", tutor=TutorFactory(nome_completo="Carla Dias")
+        )
+        self.consulta = ConsultaFactory(paciente=self.rex)
+
+    def _buscar(self, termo):
+        response = self.client.get(self.url, {"q": termo})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(r["tipo"], r["id"]) for r in response.data["resultados"]]
+
+    def test_migracao_preenche_indice_de_banco_existente(self):
+        """Testa o backfill da migração 0017 com o índice vazio"""
+        from importlib import import_module
+
+        from django.apps import apps
+
+        def indice():
+            return {
+                (item.tipo, item.objeto_id, item.rotulo, item.detalhe): {
+                    (token.token, token.peso) for token in item.tokens.all()
+                }
+                for item in ItemBusca.objects.prefetch_related("tokens")
+            }
+
+        esperado = indice()
+        migracao = import_module("clinic.migrations.0017_preencher_indice_busca")
+        ItemBusca.objects.all().delete()
+        self.assertEqual(self._buscar("rex"), [])
+
+        migracao.preencher_indice_busca(apps, None)
+
+        # Mesmo índice que os sinais (BuscaService) geraram
+        self.assertEqual(indice(), esperado)
+        self.assertIn(("paciente", self.rex.id), self._buscar("rex"))
+        self.assertIn(("tutor", self.tutor.id), self._buscar("52998224725"))
+        self.assertIn(("consulta", self.consulta.id), self._buscar("conceicao"))
+
+    def test_limite_do_prefixo_vale_em_qualquer_collation(self):
+        """Testa o limite superior do intervalo e termos terminados em z/9"""
+        from .services.busca_service import limite_prefixo
+
+        self.assertEqual(limite_prefixo("ana"), "anb")
+        self.assertEqual(limite_prefixo("luiz"), "luj")
+        self.assertEqual(limite_prefixo("1299"), "13")
+        self.assertIsNone(limite_prefixo("zz9"))
+
+        luiz = TutorFactory(nome_completo="Luiz Lua")
+        self.assertEqual(self._buscar("luiz"), [("tutor", luiz.id)])
+        self.assertEqual(self._buscar("98511200345"), [("paciente", self.rex.id)])
+
+    def test_busca_por_nome_cpf_e_microchip(self):
+        """Testa prefixo sem acentos, CPF com pontuação e microchip"""
+        self.assertEqual(self._buscar("joao conc")[0], ("tutor", self.tutor.id))
+        self.assertEqual(self._buscar("529.982.2"), [("tutor", self.tutor.id)])
+        self.assertEqual(self._buscar("985112"), [("paciente", self.rex.id)])
+
+        # Nome exato vem antes de prefixo; o tutor filtra entre os pets
+        resultados = self._buscar("rex")
+        self.assertEqual(resultados[0], ("paciente", self.rex.id))
+        self.assertIn(("paciente", self.outro.id), resultados)
+        self.assertIn(("consulta", self.consulta.id), resultados)
+        self.assertNotIn(("paciente", self.outro.id), self._buscar("rex joao"))
+
+    def test_indice_acompanha_alteracoes(self):
+        """Testa renomeação (com cascata para os pets) e exclusão"""
+        self.tutor.nome_completo = "Maria Souza"
+        self.tutor.save()
+        self.assertEqual(self._buscar("joao"), [])
+        self.assertIn(("paciente", self.rex.id), self._buscar("rex souza"))
+
+        self.outro.delete()
+        self.assertNotIn(("paciente", self.outro.id), self._buscar("rex"))
+
+    def test_nao_usa_like_e_valida_termo(self):
+        """Testa que a busca não usa LIKE e exige termos com tamanho mínimo"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as contexto:
+            self._buscar("rex joao")
+        self.assertFalse(any("LIKE" in q["sql"].upper() for q in contexto))
+
+        response = self.client.get(self.url, {"q": "a"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_comando_reindexar(self):
+        """Testa a reconstrução do índice após operações sem sinais"""
+        Tutor.objects.filter(pk=self.tutor.pk).update(nome_completo="Ana Lima")
+        self.assertEqual(self._buscar("lima"), [])
+        call_command("reindexar_busca", stdout=StringIO())
+        self.assertEqual(self._buscar("lima")[0], ("tutor", self.tutor.id))
+
+
+class AutocompleteSintomasTests(AuthenticatedAPITestCase):
+    """Testes para o autocompletar de sintomas (/sintomas/autocomplete/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("sintoma-autocomplete")
+        self.vomito = SintomaFactory(nome="Vômito", sinonimos="Êmese\nRegurgitação")
+        self.diarreia = SintomaFactory(nome="Diarreia sanguinolenta")
+        self.tosse = SintomaFactory(nome="Tosse seca")
+
+    def _sugerir(self, termo):
+        response = self.client.get(self.url, {"q": termo})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_prefixo_sem_acentos_nome_e_sinonimo(self):
+        """Testa casamento por início de palavra, sem acentos, e por sinônimo"""
+        self.assertEqual(
+            self._sugerir("VOM"),
+            [{"id": self.vomito.id, "nome": "Vômito", "sinonimo": None}],
+        )
+        self.assertEqual(self._sugerir("sangu")[0]["id"], self.diarreia.id)
+        self.assertEqual(self._sugerir("emes")[0]["sinonimo"], "Êmese")
+        self.assertEqual(self._sugerir("xyz"), [])
+        self.assertEqual(self._sugerir(""), [])
+
+    def test_indice_em_memoria_reconstruido_quando_a_base_muda(self):
+        """Testa que buscas não acessam o banco até a base ser alterada"""
+        self._sugerir("to")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._sugerir("tos")[0]["id"], self.tosse.id)
+
+        self.tosse.sinonimos = "Tossir"
+        self.tosse.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self._sugerir("tossir")[0]["sinonimo"], "Tossir")
+
+
+class IdadePacienteTests(AuthenticatedAPITestCase):
+    """Testes para a idade do paciente calculada no banco."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("paciente-list")
+        hoje = timezone.localdate()
+        tutor = TutorFactory()
+        self.filhote = PacienteFactory(
+            nome="Filhote", tutor=tutor, data_nascimento=hoje - timedelta(days=60)
+        )
+        self.adulto = PacienteFactory(
+            nome="Adulto", tutor=tutor, data_nascimento=hoje - timedelta(days=1500)
+        )
+        self.sem_data = PacienteFactory(
+            nome="Sem data", tutor=tutor, data_nascimento=None
+        )
+
+    def _nomes(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [paciente["nome"] for paciente in response.data["results"]]
+
+    def test_anotacao_idade_dias(self):
+        """Testa o valor anotado e o texto derivado dele"""
+        idades = dict(
+            Paciente.objects.com_idade().values_list("nome", "idade_dias")
+        )
+        self.assertEqual(idades["Filhote"], 60)
+        self.assertEqual(idades["Adulto"], 1500)
+        self.assertIsNone(idades["Sem data"])
+
+        adulto = Paciente.objects.com_idade().get(pk=self.adulto.pk)
+        self.assertEqual(adulto.idade, "4 ano(s)")
+        self.assertEqual(adulto.idade, Paciente.objects.get(pk=self.adulto.pk).idade)
+
+    def test_filtros_idade_min_e_max(self):
+        """Testa ?idade_max (filhotes) e ?idade_min em dias"""
+        self.assertEqual(self._nomes({"idade_max": 180}), ["Filhote"])
+        self.assertEqual(self._nomes({"idade_min": 365}), ["Adulto"])
+        self.assertEqual(self._nomes({"idade_min": 30, "idade_max": 60}), ["Filhote"])
+
+        response = self.client.get(self.url, {"idade_max": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ordenacao_por_idade(self):
+        """Testa ?ordering=idade com pacientes sem data no fim"""
+        self.assertEqual(
+            self._nomes({"ordering": "idade"}), ["Filhote", "Adulto", "Sem data"]
+        )
+        self.assertEqual(
+            self._nomes({"ordering": "-idade"}), ["Adulto", "Filhote", "Sem data"]
+        )
+
+    def test_resposta_inclui_idade_em_dias(self):
+        """Testa os campos idade_dias e idade_atual na listagem"""
+        response = self.client.get(reverse("paciente-detail", args=[self.filhote.pk]))
+        self.assertEqual(response.data["idade_dias"], 60)
+        self.assertEqual(response.data["idade_atual"], formatar_idade(60))
+
+    def test_formatar_idade(self):
+        """Testa o texto da idade em anos, meses e dias"""
+        hoje = timezone.localdate().replace(year=2024, month=3, day=15)
+        self.assertEqual(formatar_idade(None), "Não informada")
+        self.assertEqual(formatar_idade(-1), "Data futura")
+        self.assertEqual(formatar_idade(0, hoje), "Hoje")
+        self.assertEqual(formatar_idade(10, hoje), "10 dia(s)")
+        self.assertEqual(formatar_idade(31, hoje), "1 mes(es)")
+        self.assertEqual(formatar_idade(366, hoje), "1 ano(s)")
+
+
+class HistoricoPacienteTests(AuthenticatedAPITestCase):
+    """Testes para a linha do tempo do paciente (/pacientes/{id}/historico/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.paciente = PacienteFactory(nome="Rex")
+        self.url = reverse("paciente-historico", args=[self.paciente.id])
+        self.vomito = SintomaFactory(nome="Vômito")
+        self.febre = SintomaFactory(nome="Febre")
+        self.gastrite = DoencaFactory(nome="Gastrite")
+        agora = timezone.now()
+        self.antiga = ConsultaFactory(
+            paciente=self.paciente,
+            data_hora_agendamento=agora - timedelta(days=30),
+            temperatura_celsius="38.5",
+        )
+        self.recente = ConsultaFactory(
+            paciente=self.paciente, data_hora_agendamento=agora - timedelta(days=1)
+        )
+        self.antiga.sintomas_apresentados.clear()
+        self.recente.sintomas_apresentados.set([self.vomito, self.febre])
+        self.recente.diagnosticos_definitivos.set([self.gastrite])
+        ConsultaFactory()  # Consulta de outro paciente
+
+    def _historico(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["consultas"]
+
+    def test_linha_do_tempo_compacta(self):
+        """Testa a ordem, os nomes associados e os sinais vitais"""
+        consultas = self._historico()
+        self.assertEqual(
+            [consulta["id"] for consulta in consultas],
+            [self.recente.id, self.antiga.id],
+        )
+        self.assertEqual(consultas[0]["sintomas"], ["Febre", "Vômito"])
+        self.assertEqual(consultas[0]["diagnosticos_definitivos"], ["Gastrite"])
+        self.assertEqual(consultas[1]["sintomas"], [])
+        self.assertEqual(consultas[1]["sinais_vitais"]["temperatura_celsius"], "38.5")
+        self.assertEqual(
+            consultas[1]["veterinario"],
+            self.antiga.veterinario_responsavel.nome_completo,
+        )
+
+    def test_montado_com_duas_consultas_e_cache_por_paciente(self):
+        """Testa o número de queries e a invalidação ao gravar uma consulta"""
+        with self.assertNumQueries(2):
+            self._historico()
+        with self.assertNumQueries(0):
+            self._historico()
+
+        self.antiga.sintomas_apresentados.add(self.vomito)
+        self.assertEqual(self._historico()[1]["sintomas"], ["Vômito"])
+
+        ConsultaFactory(paciente=self.paciente)
+        self.assertEqual(len(self._historico()), 3)
+
+    def test_consulta_movida_invalida_os_dois_pacientes(self):
+        """Testa que trocar o paciente da consulta atualiza os dois históricos"""
+        outro = PacienteFactory()
+        url_outro = reverse("paciente-historico", args=[outro.id])
+        self._historico()
+        self.assertEqual(self.client.get(url_outro).data["consultas"], [])
+
+        consulta = Consulta.objects.get(pk=self.antiga.pk)
+        consulta.paciente = outro
+        consulta.save()
+
+        self.assertEqual(len(self._historico()), 1)
+        self.assertEqual(len(self.client.get(url_outro).data["consultas"]), 1)
+
+    def test_paciente_inexistente(self):
+        """Testa 404 para paciente inexistente"""
+        response = self.client.get(reverse("paciente-historico", args=[99999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ContadoresTests(AuthenticatedAPITestCase):
+    """Testes para as colunas contadoras e o comando reconciliar_contadores."""
+
+    def setUp(self):
+        super().setUp()
+        self.tutor = TutorFactory()
+        self.outro_tutor = TutorFactory()
+        self.rex = PacienteFactory(tutor=self.tutor)
+        self.mimi = PacienteFactory(tutor=self.tutor)
+        self.vet = VeterinarioFactory()
+
+    def _total(self, objeto, campo):
+        return type(objeto).objects.values_list(campo, flat=True).get(pk=objeto.pk)
+
+    def test_contadores_de_pacientes_e_consultas(self):
+        """Testa criação, troca de FK e remoção"""
+        self.assertEqual(self._total(self.tutor, "total_pacientes"), 2)
+
+        consulta = ConsultaFactory(paciente=self.rex, veterinario_responsavel=self.vet)
+        self.assertEqual(self._total(self.rex, "total_consultas"), 1)
+        self.assertEqual(self._total(self.vet, "total_consultas"), 1)
+        self.rex.save()  # Instância lida antes da consulta não regrava o contador
+        self.assertEqual(self._total(self.rex, "total_consultas"), 1)
+
+        consulta = Consulta.objects.get(pk=consulta.pk)
+        consulta.paciente = self.mimi
+        consulta.save()
+        consulta.save()  # Salvar de novo não conta duas vezes
+        self.assertEqual(self._total(self.rex, "total_consultas"), 0)
+        self.assertEqual(self._total(self.mimi, "total_consultas"), 1)
+
+        consulta.delete()
+        self.assertEqual(self._total(self.mimi, "total_consultas"), 0)
+        self.assertEqual(self._total(self.vet, "total_consultas"), 0)
+
+        paciente = Paciente.objects.get(pk=self.mimi.pk)
+        paciente.tutor = self.outro_tutor
+        paciente.save()
+        self.assertEqual(self._total(self.tutor, "total_pacientes"), 1)
+        self.assertEqual(self._total(self.outro_tutor, "total_pacientes"), 1)
+
+    def test_contador_de_sintomas_da_doenca(self):
+        """Testa add/remove/clear pelos dois lados e a remoção do sintoma"""
+        tosse, febre = SintomaFactory(), SintomaFactory()
+        doenca = DoencaFactory(sintomas_associados=[tosse])
+        self.assertEqual(self._total(doenca, "total_sintomas"), 1)
+
+        febre.doenca_set.add(doenca)
+        doenca.sintomas_associados.remove(SintomaFactory())  # Não associado
+        self.assertEqual(self._total(doenca, "total_sintomas"), 2)
+
+        febre.delete()
+        self.assertEqual(self._total(doenca, "total_sintomas"), 1)
+        tosse.doenca_set.clear()
+        self.assertEqual(self._total(doenca, "total_sintomas"), 0)
+
+    def test_lote_de_pacientes_reconta_tutores(self):
+        """Testa a recontagem após criação e atualização em lote"""
+        dados = [
+            {"nome": "Thor", "tutor": self.outro_tutor.pk, "especie": "CANINO"},
+            {"id": self.rex.pk, "tutor": self.outro_tutor.pk},
+        ]
+        self.client.post(reverse("paciente-list"), dados[:1], format="json")
+        self.client.patch(reverse("paciente-list"), dados[1:], format="json")
+        self.assertEqual(self._total(self.tutor, "total_pacientes"), 1)
+        self.assertEqual(self._total(self.outro_tutor, "total_pacientes"), 2)
+
+    def test_ordenacao_e_filtro_por_contador(self):
+        """Testa ?ordering=-total_pacientes e ?total_pacientes__gte"""
+        response = self.client.get(
+            reverse("tutor-list"),
+            {"ordering": "-total_pacientes", "total_pacientes__gte": 1},
+        )
+        self.assertEqual(
+            [tutor["id"] for tutor in response.data["results"]], [self.tutor.id]
+        )
+        self.assertEqual(response.data["results"][0]["total_pacientes"], 2)
+
+    def test_reconciliar_contadores(self):
+        """Testa que o comando detecta e corrige desvios"""
+        Tutor.objects.filter(pk=self.tutor.pk).update(total_pacientes=99)
+
+        saida = StringIO()
+        call_command("reconciliar_contadores", "--dry-run", stdout=saida)
+        self.assertIn("tutor.total_pacientes: 1 divergentes", saida.getvalue())
+        self.assertEqual(self._total(self.tutor, "total_pacientes"), 99)
+
+        call_command("reconciliar_contadores", stdout=StringIO())
+        self.assertEqual(self._total(self.tutor, "total_pacientes"), 2)
+
+
+class IdentificadorTests(AuthenticatedAPITestCase):
+    """Testes para a consulta por identificador (/identificadores/{valor}/)."""
+
+    def setUp(self):
+        super().setUp()
+        self.tutor = TutorFactory(cpf="529.982.247-25", nome_completo="Ana Souza")
+        self.paciente = PacienteFactory(
+            tutor=self.tutor, nome="Rex", microchip="985 112-000 123 456"
+        )
+        self.veterinario = VeterinarioFactory(crmv="SP-12345")
+
+    def _localizar(self, valor):
+        return self.client.get(reverse("identificador", args=[valor]))
+
+    def test_cpf_com_e_sem_mascara(self):
+        """Testa que o CPF é encontrado com ou sem pontuação"""
+        for valor in ("529.982.247-25", "52998224725"):
+            response = self._localizar(valor)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                response.data,
+                {
+                    "tipo": "cpf",
+                    "recurso": "tutor",
+                    "id": self.tutor.id,
+                    "rotulo": "Ana Souza",
+                },
+            )
+
+    def test_microchip_e_crmv_normalizados(self):
+        """Testa microchip sem espaços e CRMV com outra pontuação"""
+        response = self._localizar("985112000123456")
+        self.assertEqual(response.data["recurso"], "paciente")
+        self.assertEqual(response.data["id"], self.paciente.id)
+
+        response = self._localizar("sp 12345")
+        self.assertEqual(response.data["tipo"], "crmv")
+        self.assertEqual(response.data["id"], self.veterinario.id)
+
+    def test_invalido_e_nao_encontrado(self):
+        """Testa 400 para formato desconhecido e 404 sem cadastro"""
+        self.assertEqual(
+            self._localizar("???").status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self._localizar("111.444.777-35").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_deteccao_usa_separadores_e_formatos_de_cada_tipo(self):
+        """Testa que o tipo detectado é o mesmo da normalização consultada"""
+        from .services.identificador_service import IdentificadorService
+
+        detectar = IdentificadorService().detectar
+        self.assertEqual(detectar("529.982.247-25"), ("cpf", "52998224725"))
+        # Espaço não é separador de CPF: não é detectado como CPF
+        self.assertIsNone(detectar("529 982 247 25"))
+        self.assertEqual(detectar("12345/sp"), ("crmv", "12345SP"))
+        self.assertEqual(
+            detectar("985 112-000 123 456"), ("microchip", "985112000123456")
+        )
+        self.assertEqual(detectar("123-456-789"), ("microchip", "123456789"))
+        self.assertEqual(detectar("0a0139f2e1"), ("microchip", "0A0139F2E1"))
+        for valor in ("1234567", "123456789012", "ABCDEFGHIJK"):
+            with self.subTest(valor=valor):
+                self.assertIsNone(detectar(valor))
+
+    def test_uma_consulta_e_cache_invalidado_ao_gravar(self):
+        """Testa uma query no primeiro acesso, nenhuma no segundo e a
+        invalidação quando o tutor é alterado"""
+        with self.assertNumQueries(1):
+            self._localizar("52998224725")
+        with self.assertNumQueries(0):
+            self._localizar("52998224725")
+        # "Não encontrado" também fica em cache
+        with self.assertNumQueries(1):
+            self._localizar("11144477735")
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self._localizar("11144477735").status_code, status.HTTP_404_NOT_FOUND
+            )
+
+        TutorFactory(cpf="111.444.777-35")
+        self.assertEqual(
+            self._localizar("11144477735").status_code, status.HTTP_200_OK
+        )
+
+    def test_validacao_de_cpfs_em_lote(self):
+        """Testa que o lote dá o mesmo resultado da validação individual"""
+        service = TutorService()
+        cpfs = [
+            "529.982.247-25",
+            "52998224725",
+            " 111.444.777-35 ",
+            "111.111.111-11",
+            "529.982.247-26",
+            "529982247251",
+            "5299822472a",
+            "",
+            "8699640978",  # 086.996.409-78 sem o zero à esquerda
+            "86.996.409-78",
+            "5299822472",
+        ]
+        self.assertEqual(
+            service.validar_e_formatar_cpfs(cpfs),
+            [service.validar_e_formatar_cpf(cpf) for cpf in cpfs],
+        )
+        self.assertEqual(
+            service.validar_e_formatar_cpf("8699640978"), (True, "086.996.409-78")
+        )
+
+
+class DeduplicacaoTutoresTests(TestCase):
+    """Testes para a deduplicação de tutores (comando dedupe_tutores)."""
+
+    def setUp(self):
+        agora = timezone.now()
+        self.original = TutorFactory(
+            nome_completo="José da Silva",
+            telefone_principal="(11) 98765-4321",
+            telefone_secundario=None,
+            email=None,
+            endereco_cep="01001-000",
+            data_cadastro=agora - timedelta(days=400),
+        )
+        self.duplicado = TutorFactory(
+            nome_completo="Jose Silva",
+            telefone_principal="11 3333-4444",
+            telefone_secundario="11987654321",
+            email="jose.silva@example.com",
+            endereco_cep="01001000",
+            data_cadastro=agora - timedelta(days=10),
+        )
+        # Mesmo CEP, nome parecido e telefone diferente: não é duplicado
+        self.vizinho = TutorFactory(
+            nome_completo="José Silva Santos",
+            telefone_principal="(11) 91111-2222",
+            telefone_secundario=None,
+            endereco_cep="01001-000",
+        )
+        self.pacientes = PacienteFactory.create_batch(2, tutor=self.duplicado)
+        PacienteFactory(tutor=self.original)
+
+    def test_plano_agrupa_apenas_duplicados(self):
+        """Testa que o plano funde o cadastro mais novo no mais antigo"""
+        plano = DeduplicacaoTutoresService().planejar()
+        self.assertEqual(len(plano), 1)
+        self.assertEqual(plano[0].principal, self.original.pk)
+        self.assertEqual(plano[0].duplicados, (self.duplicado.pk,))
+        self.assertGreaterEqual(plano[0].score, DEDUPE_LIMIAR_PADRAO)
+
+    def test_aplicar_transfere_pacientes_e_completa_cadastro(self):
+        """Testa a transferência em lote, o contador e os campos completados"""
+        call_command("dedupe_tutores", "--aplicar", stdout=StringIO())
+
+        self.assertFalse(Tutor.objects.filter(pk=self.duplicado.pk).exists())
+        original = Tutor.objects.get(pk=self.original.pk)
+        self.assertEqual(original.pacientes.count(), 3)
+        self.assertEqual(original.total_pacientes, 3)
+        self.assertEqual(original.email, "jose.silva@example.com")
+        self.assertEqual(original.telefone_secundario, "11 3333-4444")
+        self.assertTrue(Tutor.objects.filter(pk=self.vizinho.pk).exists())
+
+    def test_dry_run_nao_altera(self):
+        """Testa que sem --aplicar nada é alterado"""
+        saida = StringIO()
+        call_command("dedupe_tutores", stdout=saida)
+        self.assertIn("1 grupos, 1 tutores duplicados", saida.getvalue())
+        self.assertTrue(Tutor.objects.filter(pk=self.duplicado.pk).exists())
+
+
+def _imagem(formato="JPEG", tamanho=(1200, 900), cor="red"):
+    """Arquivo de imagem em memória para testes de upload."""
+    buffer = BytesIO()
+    Image.new("RGB", tamanho, cor).save(buffer, format=formato)
+    return SimpleUploadedFile(
+        f"foto.{formato.lower()}",
+        buffer.getvalue(),
+        content_type=f"image/{formato.lower()}",
+    )
+
+
+@override_settings(MINIATURAS_EM_SEGUNDO_PLANO=False)
+class MiniaturasTests(AuthenticatedAPITestCase):
+    """Testes para as miniaturas das fotos dos pacientes."""
+
+    def setUp(self):
+        super().setUp()
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        configuracao = override_settings(MEDIA_ROOT=diretorio)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.paciente = PacienteFactory()
+        self.url = reverse("paciente-detail", args=[self.paciente.id])
+
+    def _enviar_foto(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.url, {"foto": _imagem(**kwargs)}, format="multipart"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return self.client.get(self.url).data["miniaturas"]
+
+    def test_upload_gera_miniaturas(self):
+        """Testa os tamanhos e formatos gerados e as URLs no serializer"""
+        miniaturas = self._enviar_foto()
+        self.assertEqual(set(miniaturas), set(MINIATURA_TAMANHOS))
+        self.assertEqual(set(miniaturas["pequena"]), {"webp", "jpeg"})
+
+        arquivos = Paciente.objects.get(pk=self.paciente.pk).miniaturas["arquivos"]
+        with default_storage.open(arquivos["pequena"]["webp"]) as arquivo:
+            with Image.open(arquivo) as imagem:
+                self.assertEqual(imagem.format, "WEBP")
+                self.assertEqual(imagem.size, (96, 72))
+
+    def test_nova_foto_substitui_miniaturas(self):
+        """Testa que as miniaturas da foto anterior são removidas"""
+        self._enviar_foto()
+        anteriores = Paciente.objects.get(pk=self.paciente.pk).miniaturas
+        self._enviar_foto(formato="PNG", cor="blue")
+
+        atuais = Paciente.objects.get(pk=self.paciente.pk).miniaturas
+        self.assertNotEqual(atuais["origem"], anteriores["origem"])
+        self.assertFalse(
+            default_storage.exists(anteriores["arquivos"]["media"]["jpeg"])
+        )
+        self.assertTrue(default_storage.exists(atuais["arquivos"]["media"]["jpeg"]))
+
+    def test_preencher_fotos_existentes(self):
+        """Testa o comando gerar_miniaturas para fotos sem miniaturas"""
+        nome = default_storage.save("pacientes_fotos/antiga.jpg", _imagem())
+        Paciente.objects.filter(pk=self.paciente.pk).update(foto=nome)
+
+        call_command("gerar_miniaturas", "--processos", "1", stdout=StringIO())
+        paciente = Paciente.objects.get(pk=self.paciente.pk)
+        self.assertEqual(paciente.miniaturas["origem"], nome)
+
+        saida = StringIO()
+        call_command("gerar_miniaturas", "--processos", "1", stdout=saida)
+        self.assertIn("0 pacientes", saida.getvalue())
+
+    def test_foto_invalida_nao_e_reprocessada_a_cada_gravacao(self):
+        """Testa que a falha fica registrada e só o comando tenta de novo"""
+        nome = default_storage.save("pacientes_fotos/corrompida.jpg", BytesIO(b"x"))
+        Paciente.objects.filter(pk=self.paciente.pk).update(foto=nome)
+
+        self.assertFalse(MiniaturaService().processar(self.paciente.pk))
+        paciente = Paciente.objects.get(pk=self.paciente.pk)
+        self.assertEqual(paciente.miniaturas["origem"], nome)
+        self.assertTrue(paciente.miniaturas["falha"])
+        self.assertEqual(self.client.get(self.url).data["miniaturas"], {})
+
+        with mock.patch.object(MiniaturaService, "agendar") as agendar:
+            paciente.nome = "Outro nome"
+            paciente.save()
+        agendar.assert_not_called()
+
+        self.assertEqual(
+            [pk for pk, _, _ in MiniaturaService().pendentes()], [self.paciente.pk]
+        )
+
+    def test_foto_acima_do_limite_de_pixels_registra_falha(self):
+        """Testa que DecompressionBombError é registrado como falha"""
+        nome = default_storage.save("pacientes_fotos/enorme.jpg", _imagem())
+        Paciente.objects.filter(pk=self.paciente.pk).update(foto=nome)
+
+        # 1200x900 é mais que o dobro de 100.000 pixels: Image.open recusa
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100_000):
+            self.assertFalse(MiniaturaService().processar(self.paciente.pk))
+
+        miniaturas = Paciente.objects.get(pk=self.paciente.pk).miniaturas
+        self.assertEqual(miniaturas, {"origem": nome, "arquivos": {}, "falha": True})
+
+
+@override_settings(MINIATURAS_EM_SEGUNDO_PLANO=False)
+class UploadFotoTests(AuthenticatedAPITestCase):
+    """Testes para o upload da foto do paciente em partes."""
+
+    def setUp(self):
+        super().setUp()
+        self.midia = tempfile.mkdtemp()
+        self.parciais = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.midia)
+        self.addCleanup(shutil.rmtree, self.parciais)
+        configuracao = override_settings(
+            MEDIA_ROOT=self.midia, FOTO_UPLOAD_DIR=self.parciais
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.paciente = PacienteFactory()
+        self.url = reverse("paciente-iniciar-upload-foto", args=[self.paciente.id])
+        self.foto = _imagem().read()
+
+    def _iniciar(self, tamanho=None):
+        response = self.client.post(
+            self.url,
+            {"tamanho": tamanho or len(self.foto), "nome": "rex.jpg"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return f"{self.url}{response.data['upload_id']}/"
+
+    def _enviar(self, url, inicio, fim, total=None):
+        return self.client.put(
+            url,
+            data=self.foto[inicio:fim],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {inicio}-{fim - 1}/{total or len(self.foto)}",
+        )
+
+    def test_upload_em_partes_anexa_foto(self):
+        """Testa o envio em duas partes, a retomada e a foto no paciente"""
+        url = self._iniciar()
+        metade = len(self.foto) // 2
+        response = self._enviar(url, 0, metade)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["recebidos"], metade)
+        self.assertFalse(response.data["concluido"])
+
+        # Retomada: o cliente consulta quantos bytes já foram recebidos
+        self.assertEqual(self.client.get(url).data["recebidos"], metade)
+
+        response = self._enviar(url, metade, len(self.foto))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["foto"].endswith(".jpg"))
+
+        paciente = Paciente.objects.get(pk=self.paciente.pk)
+        self.assertTrue(paciente.foto.name.startswith("pacientes_fotos/rex"))
+        with paciente.foto.open("rb") as arquivo:
+            self.assertEqual(arquivo.read(), self.foto)
+        self.assertEqual(os.listdir(self.parciais), [])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_parte_fora_de_ordem(self):
+        """Testa 409 com os bytes recebidos quando a parte pula um trecho"""
+        url = self._iniciar()
+        self._enviar(url, 0, 100)
+        response = self._enviar(url, 200, 300)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["recebidos"], 100)
+
+        response = self._enviar(url, 0, 100, total=len(self.foto) + 1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_parte_concorrente_recebe_409(self):
+        """Testa que só uma parte do upload é gravada por vez"""
+        url = self._iniciar()
+        self._enviar(url, 0, 100)
+        upload_id = url.rstrip("/").rsplit("/", 1)[1]
+        with open(os.path.join(self.parciais, f"{upload_id}.parte"), "rb") as parte:
+            # Simula outro worker gravando uma parte deste upload
+            fcntl.flock(parte, fcntl.LOCK_EX)
+            response = self._enviar(url, 100, 200)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["recebidos"], 100)
+
+        response = self._enviar(url, 100, len(self.foto))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Paciente.objects.get(pk=self.paciente.pk).foto)
+
+    def test_upload_com_partes_recentes_nao_expira(self):
+        """Testa que a validade conta da última parte recebida"""
+        url = self._iniciar()
+        self._enviar(url, 0, 100)
+        upload_id = url.rstrip("/").rsplit("/", 1)[1]
+        antigo = time.time() - FOTO_UPLOAD_VALIDADE - 60
+        metadados = os.path.join(self.parciais, f"{upload_id}.json")
+        os.utime(metadados, (antigo, antigo))
+
+        self.assertEqual(UploadFotoService().remover_expirados(), 0)
+        self.assertEqual(self.client.get(url).data["recebidos"], 100)
+
+        os.utime(os.path.join(self.parciais, f"{upload_id}.parte"), (antigo, antigo))
+        self.assertEqual(UploadFotoService().remover_expirados(), 1)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_limites_de_tamanho(self):
+        """Testa o tamanho máximo da foto e de cada parte"""
+        response = self.client.post(
+            self.url, {"tamanho": FOTO_TAMANHO_MAXIMO + 1}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        url = self._iniciar(tamanho=FOTO_TAMANHO_MAXIMO)
+        response = self.client.put(
+            url,
+            data=b"0" * (FOTO_TAMANHO_MAXIMO_PARTE + 1),
+            content_type="application/octet-stream",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_arquivo_invalido_e_descartado(self):
+        """Testa que arquivos que não são imagem não chegam ao paciente"""
+        self.foto = b"%PDF-1.4 " * 50
+        url = self._iniciar()
+        response = self._enviar(url, 0, len(self.foto))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Paciente.objects.get(pk=self.paciente.pk).foto)
+        self.assertEqual(os.listdir(self.parciais), [])
+
+    def test_limite_de_pixels(self):
+        """Testa a recusa de imagens acima de FOTO_MAX_PIXELS pelo cabeçalho"""
+        url = self._iniciar()
+        with mock.patch(
+            "clinic.services.upload_foto_service.FOTO_MAX_PIXELS", 1000
+        ), mock.patch.object(Image.Image, "load") as decodificar:
+            response = self._enviar(url, 0, len(self.foto))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        decodificar.assert_not_called()
+        self.assertFalse(Paciente.objects.get(pk=self.paciente.pk).foto)
+
+    def test_upload_de_outro_usuario(self):
+        """Testa que o upload só é visível para quem o iniciou"""
+        url = self._iniciar()
+        outro = User.objects.create_user(username="outro", password="senha")
+        self.client.force_authenticate(user=outro)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=None)
+        self.assertIn(
+            self._enviar(url, 0, 100).status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+
+
+class MidiaTests(TestCase):
+    """Testes para a entrega dos arquivos de mídia (MEDIA_URL)."""
+
+    conteudo = bytes(range(256)) * 40  # 10240 bytes
+
+    def setUp(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        configuracao = override_settings(MEDIA_ROOT=diretorio, MIDIA_ENVIO="")
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        os.makedirs(os.path.join(diretorio, "anexos"))
+        with open(os.path.join(diretorio, "anexos", "exame.pdf"), "wb") as arquivo:
+            arquivo.write(self.conteudo)
+        self.url = "/media/anexos/exame.pdf"
+
+    def _corpo(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_arquivo_inteiro_com_cabecalhos_de_cache(self):
+        """Testa o conteúdo, ETag, Cache-Control e a resposta 304"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._corpo(response), self.conteudo)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_intervalos(self):
+        """Testa Range com início e fim, só início, sufixo e fora do arquivo"""
+        casos = {
+            "bytes=0-99": (0, 99),
+            "bytes=10000-": (10000, 10239),
+            "bytes=-240": (10000, 10239),
+            "bytes=10200-99999": (10200, 10239),
+        }
+        for cabecalho, (inicio, fim) in casos.items():
+            response = self.client.get(self.url, HTTP_RANGE=cabecalho)
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+            self.assertEqual(response["Content-Range"], f"bytes {inicio}-{fim}/10240")
+            self.assertEqual(response["Content-Length"], str(fim - inicio + 1))
+            self.assertEqual(self._corpo(response), self.conteudo[inicio : fim + 1])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=20000-")
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], "bytes */10240")
+
+    def test_if_range_desatualizado_responde_arquivo_inteiro(self):
+        """Testa que If-Range com outro ETag ignora o Range"""
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"outro"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self._corpo(response)), len(self.conteudo))
+
+    def test_envio_delegado_ao_proxy(self):
+        """Testa X-Accel-Redirect e X-Sendfile (sem corpo na resposta)"""
+        with override_settings(MIDIA_ENVIO="x-accel-redirect"):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/midia-interna/anexos/exame.pdf"
+        )
+        self.assertEqual(response.content, b"")
+
+        with override_settings(MIDIA_ENVIO="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertTrue(response["X-Sendfile"].endswith("exame.pdf"))
+
+    def test_caminho_fora_de_media_root(self):
+        """Testa 404 para arquivos inexistentes e caminhos com '..'"""
+        for url in ("/media/anexos/nada.pdf", "/media/%2E%2E/manage.py", "/media/anexos"):
+            self.assertEqual(
+                self.client.get(url).status_code, status.HTTP_404_NOT_FOUND
+            )
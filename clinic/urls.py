@@ -1,6 +1,7 @@
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
 
+from . import async_views
+from .routers import OperacoesEmLoteRouter
 from .views import (
     ConsultaViewSet,
     DoencaViewSet,
@@ -8,12 +9,16 @@ from .views import (
     SintomaViewSet,
     TutorViewSet,
     VeterinarioViewSet,
+    batch,
+    busca,
     get_user_info,
+    identificador,
+    lookups,
     register_user,
 )
 
 # Cria um router e registra viewsets com ele
-router = DefaultRouter()
+router = OperacoesEmLoteRouter()
 router.register(r"tutores", TutorViewSet, basename="tutor")
 router.register(r"pacientes", PacienteViewSet, basename="paciente")
 router.register(r"veterinarios", VeterinarioViewSet, basename="veterinario")
@@ -24,5 +29,32 @@ router.register(r"doencas", DoencaViewSet, basename="doenca")
 urlpatterns = [
     path("auth/register/", register_user, name="register"),
     path("auth/user/", get_user_info, name="user-info"),
+    path("lookups/", lookups, name="lookups"),
+    path("batch/", batch, name="batch"),
+    path("busca/", busca, name="busca"),
+    path("identificadores/<path:valor>/", identificador, name="identificador"),
+    # Leituras assíncronas (ORM async); ganham concorrência quando servidas
+    # por ASGI (perfil 'asgi' do docker-compose)
+    path(
+        "async/consultas/",
+        async_views.listar_consultas,
+        name="async-consulta-list",
+    ),
+    path(
+        "async/consultas/<int:pk>/",
+        async_views.detalhar_consulta,
+        name="async-consulta-detail",
+    ),
+    path(
+        "async/pacientes/",
+        async_views.listar_pacientes,
+        name="async-paciente-list",
+    ),
+    path("async/lookups/", async_views.lookups, name="async-lookups"),
+    path(
+        "async/diagnosticos/sugerir/",
+        async_views.sugerir_diagnosticos,
+        name="async-diagnosticos-sugerir",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,22 +1,71 @@
+import copy
+import hashlib
+import json
 import logging
-
-from django.db import IntegrityError
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connections
+from django.db.models import Prefetch
 from django.db.models.deletion import ProtectedError
+from django.http import Http404, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
 from django_filters.rest_framework import DjangoFilterBackend  # type: ignore
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
 from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from .constants import (
+    AUTOCOMPLETE_LIMITE_MAXIMO,
+    AUTOCOMPLETE_LIMITE_PADRAO,
+    BATCH_MAX_REQUISICOES,
+    BUSCA_LIMITE_MAXIMO,
+    BUSCA_LIMITE_PADRAO,
+    BUSCA_TAMANHO_MINIMO,
     DEFAULT_PAGE_SIZE,
+    ERROR_BATCH_ANINHADO,
+    ERROR_BATCH_FORMATO,
+    ERROR_BATCH_LIMITE,
+    ERROR_BATCH_METODO,
+    ERROR_BATCH_NAO_ENCONTRADO,
+    ERROR_BATCH_STREAMING,
+    ERROR_BATCH_URL_INVALIDA,
+    ERROR_BUSCA_TERMO_CURTO,
     ERROR_GENERIC,
+    ERROR_IDENTIFICADOR_INVALIDO,
+    ERROR_IDENTIFICADOR_NAO_ENCONTRADO,
     ERROR_INTEGRITY_ERROR,
+    ERROR_LOOKUP_RECURSO_INVALIDO,
+    ERROR_LOOKUP_RECURSOS_OBRIGATORIO,
     ERROR_TUTOR_PROTECTED_DELETE,
+    ERROR_UPLOAD_CONTENT_RANGE,
+    ERROR_UPLOAD_NAO_ENCONTRADO,
     MAX_PAGE_SIZE,
 )
+from .filters import (
+    IdsFilterBackend,
+    OrderingFilterComApelidos,
+    PacienteFilter,
+    ids_da_requisicao,
+)
+from .mixins import (
+    BaseConhecimentoCondicionalMixin,
+    CacheRespostaMixin,
+    ExportacaoStreamingMixin,
+    OperacoesEmLoteMixin,
+    SincronizacaoIncrementalMixin,
+)
 from .models import Consulta, Doenca, Paciente, Sintoma, Tutor, Veterinario
 from .serializers import (
     ConsultaSerializer,
@@ -28,11 +77,22 @@ from .serializers import (
     UserSerializer,
     VeterinarioSerializer,
 )
-from .services import ConsultaService
+from .services import (
+    AutocompleteSintomasService,
+    BuscaService,
+    ConsultaService,
+    HistoricoPacienteService,
+    IdentificadorService,
+    SchemaService,
+    UploadFotoService,
+)
+from .services.upload_foto_service import ParteForaDeOrdem
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+_RE_CONTENT_RANGE = re.compile(r"^bytes (?P<inicio>\d+)-(?P<fim>\d+)/(?P<total>\d+)$")
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
@@ -42,35 +102,65 @@ class StandardResultsSetPagination(PageNumberPagination):
     - Tamanho padrão: 20 itens por página
     - Tamanho máximo: 100 itens por página
     - Permite ao cliente definir o tamanho via query param 'page_size'
+    - Com '?ids=', todos os registros pedidos vêm em uma única página
     """
 
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = "page_size"
     max_page_size = MAX_PAGE_SIZE
 
+    def get_page_size(self, request):
+        ids = ids_da_requisicao(request)
+        if ids:
+            return len(ids)
+        return super().get_page_size(request)
+
 
-class TutorViewSet(viewsets.ModelViewSet):
+class TutorViewSet(
+    CacheRespostaMixin,
+    OperacoesEmLoteMixin,
+    ExportacaoStreamingMixin,
+    SincronizacaoIncrementalMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet para gerenciar os Tutores.
 
     Endpoints:
     - GET /tutores/ - Lista todos os tutores (com paginação)
-    - POST /tutores/ - Cria um novo tutor
+    - POST /tutores/ - Cria um novo tutor (ou vários, enviando uma lista)
+    - PATCH /tutores/ - Atualiza vários tutores (lista de objetos com 'id')
     - GET /tutores/{id}/ - Detalha um tutor específico
     - PUT/PATCH /tutores/{id}/ - Atualiza um tutor
     - DELETE /tutores/{id}/ - Remove um tutor (se não houver pacientes)
+    - GET /tutores/export/?format=ndjson|csv - Exporta os tutores filtrados
+    - GET /tutores/sync/?modified_since=...|cursor=... - Sincronização incremental
 
     Filtros disponíveis:
     - cpf, email, endereco_cidade, endereco_uf, nome_completo
+    - total_pacientes (também __gte e __lte)
+    - ids (ex: ?ids=1,5,9), disponível em todos os ViewSets
 
     Busca (search):
     - nome_completo, cpf, email, observacoes, endereco_rua, endereco_bairro
 
     Ordenação (ordering):
-    - nome_completo, data_cadastro, endereco_cidade
+    - nome_completo, data_cadastro, endereco_cidade, total_pacientes
+
+    Cada tutor traz o resumo dos seus pacientes (id, nome, especie, status),
+    carregado para a página inteira em uma única consulta.
+
+    As listagens em JSON ficam em cache até tutores ou pacientes mudarem.
     """
 
-    queryset = Tutor.objects.all()
+    queryset = Tutor.objects.prefetch_related(
+        Prefetch(
+            "pacientes",
+            queryset=Paciente.objects.only(
+                "id", "tutor_id", "nome", "especie", "status"
+            ).order_by("nome"),
+        )
+    )
     serializer_class = TutorSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
@@ -79,14 +169,16 @@ class TutorViewSet(viewsets.ModelViewSet):
         DjangoFilterBackend,
         SearchFilter,
         OrderingFilter,
+        IdsFilterBackend,
     ]
-    filterset_fields = [
-        "cpf",
-        "email",
-        "endereco_cidade",
-        "endereco_uf",
-        "nome_completo",
-    ]
+    filterset_fields = {
+        "cpf": ["exact"],
+        "email": ["exact"],
+        "endereco_cidade": ["exact"],
+        "endereco_uf": ["exact"],
+        "nome_completo": ["exact"],
+        "total_pacientes": ["exact", "gte", "lte"],
+    }
     search_fields = [
         "nome_completo",
         "cpf",
@@ -99,7 +191,10 @@ class TutorViewSet(viewsets.ModelViewSet):
         "nome_completo",
         "data_cadastro",
         "endereco_cidade",
+        "total_pacientes",
     ]
+    export_relacionados = {"pacientes": (Paciente.objects, "tutor_id", "id")}
+    cache_tabelas = ("tutor", "paciente")
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -138,21 +233,40 @@ class TutorViewSet(viewsets.ModelViewSet):
             )
 
 
-class PacienteViewSet(viewsets.ModelViewSet):
+class PacienteViewSet(
+    CacheRespostaMixin,
+    OperacoesEmLoteMixin,
+    ExportacaoStreamingMixin,
+    SincronizacaoIncrementalMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet para gerenciar os Pacientes.
 
     Endpoints:
     - GET /pacientes/ - Lista todos os pacientes
-    - POST /pacientes/ - Registra um novo paciente
+    - POST /pacientes/ - Registra um novo paciente (ou vários, enviando uma lista)
+    - PATCH /pacientes/ - Atualiza vários pacientes (lista de objetos com 'id')
     - GET /pacientes/{id}/ - Detalha um paciente específico
     - PUT/PATCH /pacientes/{id}/ - Atualiza informações do paciente
     - DELETE /pacientes/{id}/ - Remove um paciente
+    - GET /pacientes/export/?format=ndjson|csv - Exporta os pacientes filtrados
+    - GET /pacientes/sync/?modified_since=...|cursor=... - Sincronização incremental
+    - GET /pacientes/{id}/historico/ - Linha do tempo das consultas do paciente
+    - POST /pacientes/{id}/foto/upload/ - Abre um upload da foto em partes
+    - GET/PUT /pacientes/{id}/foto/upload/{upload_id}/ - Estado do upload / envia
+      a próxima parte
 
     Filtros disponíveis:
     - tutor, tutor__nome_completo, especie, raca, status, sexo, nome
+    - idade_min, idade_max: idade em dias (ex: ?idade_max=180 para filhotes)
+    - total_consultas (também __gte e __lte)
+    - ids (ex: ?ids=1,5,9)
+
+    Ordenação padrão: nome (alfabética). ?ordering=idade ou -idade ordena
+    pela idade (sem data de nascimento ficam no fim).
 
-    Ordenação padrão: nome (alfabética)
+    As listagens em JSON ficam em cache até pacientes ou tutores mudarem.
     """
 
     queryset = Paciente.objects.all()
@@ -160,16 +274,13 @@ class PacienteViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = {
-        "tutor": ["exact"],
-        "tutor__nome_completo": ["icontains"],
-        "especie": ["exact"],
-        "raca": ["icontains"],
-        "status": ["exact"],
-        "sexo": ["exact"],
-        "nome": ["icontains"],
-    }
+    filter_backends = [
+        DjangoFilterBackend,
+        SearchFilter,
+        OrderingFilterComApelidos,
+        IdsFilterBackend,
+    ]
+    filterset_class = PacienteFilter
     search_fields = [
         "nome",
         "raca",
@@ -184,8 +295,145 @@ class PacienteViewSet(viewsets.ModelViewSet):
         "especie",
         "tutor__nome_completo",
         "peso_kg",
+        "idade",
+        "total_consultas",
     ]
+    # Idade crescente = nascimento mais recente primeiro
+    ordering_apelidos = {"idade": "-data_nascimento"}
     ordering = ["nome"]
+    cache_tabelas = ("paciente", "tutor")
+
+    def get_queryset(self):
+        return super().get_queryset().com_idade()
+
+    @action(detail=True, methods=["get"])
+    def historico(self, request, pk=None):
+        """
+        Linha do tempo clínica do paciente, da consulta mais recente para a
+        mais antiga.
+
+        Exemplo: GET /pacientes/7/historico/
+
+        Cada item traz data, tipo, veterinário, nomes de sintomas e
+        diagnósticos e sinais vitais. Montado com duas consultas ao banco e
+        guardado em cache até a próxima alteração nas consultas do paciente.
+
+        Retorna:
+        - 200: {"paciente": id, "consultas": [...]}
+        - 404: Paciente não encontrado
+        """
+        try:
+            paciente_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        historico = HistoricoPacienteService().obter(paciente_id)
+        if historico is None:
+            raise Http404
+        return Response(historico)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="foto/upload",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def iniciar_upload_foto(self, request, pk=None):
+        """
+        Abre um upload da foto do paciente, enviada depois em partes.
+
+        Exemplo: POST /pacientes/7/foto/upload/ {"tamanho": 7340032,
+        "nome": "rex.jpg"}
+
+        Retorna:
+        - 201: {"upload_id", "paciente", "tamanho", "recebidos": 0, ...}
+        - 400: Tamanho ausente ou acima de FOTO_TAMANHO_MAXIMO
+        - 404: Paciente não encontrado
+        """
+        paciente = self.get_object()
+        try:
+            upload = UploadFotoService().iniciar(
+                paciente.pk,
+                request.user.pk,
+                request.data.get("tamanho"),
+                request.data.get("nome", ""),
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=["get", "put"],
+        url_path=r"foto/upload/(?P<upload_id>[0-9a-f]{32})",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def upload_foto(self, request, pk=None, upload_id=None):
+        """
+        GET: bytes já recebidos (para retomar após uma falha de rede).
+        PUT: próxima parte da foto, no corpo cru da requisição (até
+        FOTO_TAMANHO_MAXIMO_PARTE bytes), com 'Content-Range: bytes
+        início-fim/total' opcional. O corpo é gravado em disco em blocos,
+        sem passar por request.data.
+
+        Retorna:
+        - 200: Estado do upload; na última parte, o paciente com a foto nova
+        - 400: Parte com tamanho inválido, Content-Range inválido ou imagem
+          inválida (o upload é descartado)
+        - 404: Paciente ou upload não encontrado
+        - 409: A parte não começa no próximo byte ({"recebidos": n})
+        """
+        paciente = self.get_object()
+        service = UploadFotoService()
+        estado = service.estado(upload_id, request.user.pk)
+        if estado is None or estado["paciente"] != paciente.pk:
+            return Response(
+                {"detail": ERROR_UPLOAD_NAO_ENCONTRADO},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if request.method == "GET":
+            return Response(estado)
+
+        try:
+            tamanho_parte = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            tamanho_parte = 0
+        inicio = None
+        content_range = request.META.get("HTTP_CONTENT_RANGE")
+        if content_range:
+            intervalo = _RE_CONTENT_RANGE.match(content_range.strip())
+            if (
+                intervalo is None
+                or int(intervalo["total"]) != estado["tamanho"]
+                or int(intervalo["fim"]) - int(intervalo["inicio"]) + 1
+                != tamanho_parte
+            ):
+                return Response(
+                    {"detail": ERROR_UPLOAD_CONTENT_RANGE},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            inicio = int(intervalo["inicio"])
+
+        try:
+            # request.stream: o corpo cru, lido aos poucos pelo serviço
+            estado = service.receber(
+                upload_id, request.user.pk, request.stream, inicio, tamanho_parte
+            )
+        except ParteForaDeOrdem as e:
+            return Response(
+                {"detail": str(e), "recebidos": e.recebidos},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if estado is None:
+            return Response(
+                {"detail": ERROR_UPLOAD_NAO_ENCONTRADO},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if estado["concluido"]:
+            paciente = self.get_queryset().get(pk=paciente.pk)
+            return Response(self.get_serializer(paciente).data)
+        return Response(estado)
 
 
 class VeterinarioViewSet(viewsets.ModelViewSet):
@@ -198,6 +446,9 @@ class VeterinarioViewSet(viewsets.ModelViewSet):
     - GET /veterinarios/{id}/ - Detalha um veterinário específico
     - PUT/PATCH /veterinarios/{id}/ - Atualiza dados do veterinário
     - DELETE /veterinarios/{id}/ - Remove um veterinário
+
+    Filtros: crmv, nome_completo, total_consultas (também __gte e __lte)
+    Ordenação: nome_completo, total_consultas
     """
 
     queryset = Veterinario.objects.all()
@@ -205,14 +456,25 @@ class VeterinarioViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["crmv", "nome_completo"]
+    filter_backends = [
+        DjangoFilterBackend,
+        SearchFilter,
+        OrderingFilter,
+        IdsFilterBackend,
+    ]
+    filterset_fields = {
+        "crmv": ["exact"],
+        "nome_completo": ["exact"],
+        "total_consultas": ["exact", "gte", "lte"],
+    }
     search_fields = ["nome_completo", "crmv"]
-    ordering_fields = ["nome_completo"]
+    ordering_fields = ["nome_completo", "total_consultas"]
     ordering = ["nome_completo"]
 
 
-class SintomaViewSet(viewsets.ModelViewSet):
+class SintomaViewSet(
+    CacheRespostaMixin, BaseConhecimentoCondicionalMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para gerenciar os Sintomas.
 
@@ -225,6 +487,10 @@ class SintomaViewSet(viewsets.ModelViewSet):
     - GET /sintomas/{id}/ - Detalha um sintoma específico
     - PUT/PATCH /sintomas/{id}/ - Atualiza informações do sintoma
     - DELETE /sintomas/{id}/ - Remove um sintoma
+
+    As leituras trazem ETag/Last-Modified derivados da versão da base de
+    conhecimento e respondem 304 quando o cliente já tem a versão atual.
+    As listagens em JSON ficam em cache até a base ser alterada.
     """
 
     queryset = Sintoma.objects.all()
@@ -232,14 +498,46 @@ class SintomaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        SearchFilter,
+        OrderingFilter,
+        IdsFilterBackend,
+    ]
     filterset_fields = {"nome": ["exact", "icontains"], "descricao": ["icontains"]}
     search_fields = ["nome", "descricao"]
     ordering_fields = ["nome", "id"]
     ordering = ["nome"]
+    cache_tabelas = ("base_conhecimento",)
+
+    # Sem autenticação: a JWTAuthentication buscaria o usuário no banco a
+    # cada tecla digitada (a leitura é pública, como a listagem)
+    @action(detail=False, methods=["get"], authentication_classes=[])
+    def autocomplete(self, request):
+        """
+        Sugestões de sintomas para o type-ahead da consulta.
+
+        Exemplo: GET /sintomas/autocomplete/?q=vom&limite=10
+
+        Casa o início de qualquer palavra do nome ou de um sinônimo, sem
+        diferenciar acentos e maiúsculas. Servido por um índice em memória
+        reconstruído quando a base de conhecimento muda.
+
+        Retorna:
+        - 200: [{"id", "nome", "sinonimo"}] (vazio se 'q' estiver vazio)
+        """
+        limite = ler_limite(
+            request, AUTOCOMPLETE_LIMITE_PADRAO, AUTOCOMPLETE_LIMITE_MAXIMO
+        )
+        sugestoes = AutocompleteSintomasService().sugerir(
+            request.query_params.get("q", ""), limite
+        )
+        return Response(sugestoes)
 
 
-class ConsultaViewSet(viewsets.ModelViewSet):
+class ConsultaViewSet(
+    ExportacaoStreamingMixin, SincronizacaoIncrementalMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para gerenciar as Consultas.
 
@@ -252,6 +550,8 @@ class ConsultaViewSet(viewsets.ModelViewSet):
     - GET /consultas/{id}/ - Detalha uma consulta específica
     - PUT/PATCH /consultas/{id}/ - Atualiza informações da consulta
     - DELETE /consultas/{id}/ - Remove uma consulta
+    - GET /consultas/export/?format=ndjson|csv - Exporta as consultas filtradas
+    - GET /consultas/sync/?modified_since=...|cursor=... - Sincronização incremental
 
     Funcionalidades especiais:
     - Sugestão automática de diagnósticos com base em sintomas
@@ -272,7 +572,12 @@ class ConsultaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        SearchFilter,
+        OrderingFilter,
+        IdsFilterBackend,
+    ]
     filterset_fields = {
         "paciente": ["exact"],
         "paciente__nome": ["icontains"],
@@ -301,6 +606,24 @@ class ConsultaViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ["data_hora_agendamento", "paciente__nome", "tipo_consulta"]
     ordering = ["-data_criacao_registro"]
+    sync_campo_atualizacao = "data_ultima_modificacao"
+    export_relacionados = {
+        "sintomas_apresentados": (
+            Consulta.sintomas_apresentados.through.objects,
+            "consulta_id",
+            "sintoma_id",
+        ),
+        "diagnosticos_suspeitos": (
+            Consulta.diagnosticos_suspeitos.through.objects,
+            "consulta_id",
+            "doenca_id",
+        ),
+        "diagnosticos_definitivos": (
+            Consulta.diagnosticos_definitivos.through.objects,
+            "consulta_id",
+            "doenca_id",
+        ),
+    }
 
     def __init__(self, *args, **kwargs):
         """
@@ -360,7 +683,9 @@ class ConsultaViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class DoencaViewSet(viewsets.ModelViewSet):
+class DoencaViewSet(
+    CacheRespostaMixin, BaseConhecimentoCondicionalMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para gerenciar as Doenças (Base de Conhecimento).
 
@@ -374,12 +699,357 @@ class DoencaViewSet(viewsets.ModelViewSet):
     - GET /doencas/{id}/ - Detalha uma doença específica
     - PUT/PATCH /doencas/{id}/ - Atualiza informações da doença
     - DELETE /doencas/{id}/ - Remove uma doença
+
+    Filtros: total_sintomas (também __gte e __lte), ids
+    Ordenação: nome (padrão), total_sintomas
+
+    As leituras trazem ETag/Last-Modified derivados da versão da base de
+    conhecimento e respondem 304 quando o cliente já tem a versão atual.
+    As listagens em JSON ficam em cache até a base ser alterada.
     """
 
     queryset = Doenca.objects.all().prefetch_related("sintomas_associados")
     serializer_class = DoencaSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IdsFilterBackend]
+    filterset_fields = {"total_sintomas": ["exact", "gte", "lte"]}
+    ordering_fields = ["nome", "total_sintomas"]
+    cache_tabelas = ("base_conhecimento",)
+
+
+# ==============================
+# LOOKUPS (LISTAS PARA SELECTS)
+# ==============================
+
+# recurso -> (queryset, campo usado como rótulo)
+RECURSOS_LOOKUP = {
+    "tutores": (Tutor.objects.all(), "nome_completo"),
+    "pacientes": (Paciente.objects.all(), "nome"),
+    "veterinarios": (Veterinario.objects.all(), "nome_completo"),
+    "sintomas": (Sintoma.objects.all(), "nome"),
+    "doencas": (Doenca.objects.all(), "nome"),
+}
+
+
+@api_view(["GET"])
+def lookups(request):
+    """
+    Endpoint com listas compactas de [id, rótulo] para preencher selects.
+
+    Exemplo: GET /lookups/?recursos=pacientes,veterinarios,sintomas
+
+    Cada recurso é lido com uma única consulta values_list, ordenada pelo
+    rótulo. A resposta traz um ETag calculado sobre o conteúdo; se o
+    cliente enviar If-None-Match com o mesmo valor, recebe 304 sem corpo.
+
+    Retorna:
+    - 200: {"pacientes": [[1, "Rex"], ...], ...}
+    - 304: Conteúdo não mudou
+    - 400: Parâmetro 'recursos' ausente ou com recursos desconhecidos
+    """
+    recursos, erro = ler_recursos_lookup(request.query_params)
+    if erro:
+        return Response({"detail": erro}, status=status.HTTP_400_BAD_REQUEST)
+
+    dados = {nome: list(queryset_lookup(nome)) for nome in recursos}
+    return resposta_lookups(request, dados, Response(dados))
+
+
+def ler_recursos_lookup(query_params):
+    """
+    Lê e valida o parâmetro 'recursos' dos lookups.
+
+    Returns:
+        (lista de recursos sem repetições, mensagem de erro ou None)
+    """
+    recursos = [
+        nome.strip()
+        for nome in query_params.get("recursos", "").split(",")
+        if nome.strip()
+    ]
+    if not recursos:
+        return [], ERROR_LOOKUP_RECURSOS_OBRIGATORIO
+    desconhecidos = [nome for nome in recursos if nome not in RECURSOS_LOOKUP]
+    if desconhecidos:
+        return [], ERROR_LOOKUP_RECURSO_INVALIDO.format(
+            recursos=", ".join(desconhecidos)
+        )
+    return list(dict.fromkeys(recursos)), None
+
+
+def queryset_lookup(nome):
+    """Retorna o queryset values_list (id, rótulo) de um recurso de lookup."""
+    queryset, campo_rotulo = RECURSOS_LOOKUP[nome]
+    return queryset.order_by(campo_rotulo, "id").values_list("id", campo_rotulo)
+
+
+def resposta_lookups(request, dados, resposta):
+    """
+    Aplica ETag (hash do conteúdo) e Cache-Control à resposta dos lookups,
+    trocando-a por 304 se o cliente já tiver o mesmo conteúdo.
+    """
+    conteudo = json.dumps(dados, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = f'"{hashlib.md5(conteudo.encode("utf-8")).hexdigest()}"'
+
+    # private + no-cache: o navegador guarda a resposta, mas sempre a
+    # revalida com If-None-Match antes de reutilizá-la.
+    resposta = get_conditional_response(request, etag=etag) or resposta
+    resposta["ETag"] = etag
+    resposta["Cache-Control"] = "private, no-cache"
+    return resposta
+
+
+# ==============================
+# BUSCA GLOBAL
+# ==============================
+
+
+@api_view(["GET"])
+def busca(request):
+    """
+    Busca global da recepção em tutores, pacientes e consultas.
+
+    Exemplo: GET /busca/?q=rex silva&limite=10
+
+    Aceita nome do tutor, nome do pet, CPF ou microchip (com ou sem
+    pontuação). Cada termo casa por prefixo com os tokens do índice
+    (ItemBusca/TokenBusca) e os resultados precisam casar todos os termos.
+
+    Retorna:
+    - 200: {"resultados": [{"tipo", "id", "rotulo", "detalhe", "score"}],
+      "parcial": bool} em ordem de relevância; 'parcial' indica que algum
+      limite de custo da busca foi atingido
+    - 400: Nenhum termo com o tamanho mínimo
+    """
+    service = BuscaService()
+    consulta = request.query_params.get("q", "")
+    if not service.termos(consulta):
+        return Response(
+            {"detail": ERROR_BUSCA_TERMO_CURTO.format(minimo=BUSCA_TAMANHO_MINIMO)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    limite = ler_limite(request, BUSCA_LIMITE_PADRAO, BUSCA_LIMITE_MAXIMO)
+    return Response(service.buscar(consulta, limite))
+
+
+@api_view(["GET"])
+def identificador(request, valor):
+    """
+    Localiza o cadastro dono de um CPF, microchip ou CRMV.
+
+    Exemplo: GET /identificadores/123.456.789-09/
+
+    O tipo é detectado pelo formato e a pontuação é opcional ('12345678909'
+    e '123.456.789-09' encontram o mesmo tutor). Leitura por índice nas
+    colunas normalizadas, com cache curto.
+
+    Retorna:
+    - 200: {"tipo": "cpf" | "microchip" | "crmv", "recurso": "tutor" |
+      "paciente" | "veterinario", "id", "rotulo"}
+    - 400: Formato não reconhecido
+    - 404: Nenhum cadastro com o identificador
+    """
+    try:
+        resultado = IdentificadorService().localizar(valor)
+    except ValueError:
+        return Response(
+            {"detail": ERROR_IDENTIFICADOR_INVALIDO},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if resultado is None:
+        return Response(
+            {"detail": ERROR_IDENTIFICADOR_NAO_ENCONTRADO},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(resultado)
+
+
+def ler_limite(request, padrao, maximo):
+    """Lê o parâmetro '?limite=', limitado a [1, maximo] (padrão se inválido)."""
+    try:
+        limite = int(request.query_params.get("limite", padrao))
+    except ValueError:
+        limite = padrao
+    return max(1, min(limite, maximo))
+
+
+# ==============================
+# REQUISIÇÕES EM LOTE
+# ==============================
+
+# Cabeçalhos da requisição principal que não fazem sentido nas sub-requisições
+_CABECALHOS_NAO_REPASSADOS = {
+    "CONTENT_TYPE",
+    "CONTENT_LENGTH",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+}
+
+
+@api_view(["POST"])
+def batch(request):
+    """
+    Executa várias requisições GET da API em uma única chamada.
+
+    Corpo:
+        {"requisicoes": [
+            "/api/v1/veterinarios/",
+            {"id": "rex", "url": "/api/v1/pacientes/12/"}
+        ]}
+
+    O usuário é autenticado uma única vez e repassado às sub-requisições,
+    que chamam as views diretamente (sem passar de novo pelos middlewares).
+    Sub-requisições independentes rodam em paralelo em um pool de threads
+    (settings.BATCH_MAX_WORKERS); com 1 worker, rodam em sequência na
+    própria requisição. A ordem das respostas é a mesma do pedido.
+
+    Retorna:
+    - 200: {"respostas": [{"id", "url", "status", "corpo"}, ...]}
+    - 400: Corpo inválido ou lote acima do limite
+    """
+    itens = request.data.get("requisicoes") if isinstance(request.data, dict) else None
+    if not isinstance(itens, list) or not itens:
+        return Response(
+            {"detail": ERROR_BATCH_FORMATO}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(itens) > BATCH_MAX_REQUISICOES:
+        return Response(
+            {"detail": ERROR_BATCH_LIMITE.format(limite=BATCH_MAX_REQUISICOES)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    itens = [{"url": item} if isinstance(item, str) else item for item in itens]
+    if not all(
+        isinstance(item, dict) and isinstance(item.get("url"), str) for item in itens
+    ):
+        return Response(
+            {"detail": ERROR_BATCH_FORMATO}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    workers = min(settings.BATCH_MAX_WORKERS, len(itens))
+    if workers <= 1:
+        respostas = [_executar_subrequisicao(request, item) for item in itens]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            respostas = list(
+                executor.map(partial(_executar_subrequisicao_em_thread, request), itens)
+            )
+
+    return Response({"respostas": respostas})
+
+
+def _executar_subrequisicao_em_thread(request, item):
+    try:
+        return _executar_subrequisicao(request, item)
+    finally:
+        # Cada thread abre sua própria conexão com o banco
+        connections.close_all()
+
+
+def _executar_subrequisicao(request, item):
+    """Resolve e executa uma sub-requisição GET, devolvendo seu resultado."""
+    url = item["url"]
+
+    def resultado(codigo, corpo):
+        return {"id": item.get("id"), "url": url, "status": codigo, "corpo": corpo}
+
+    if str(item.get("method", "GET")).upper() != "GET":
+        return resultado(
+            status.HTTP_405_METHOD_NOT_ALLOWED, {"detail": ERROR_BATCH_METODO}
+        )
+    partes = urlsplit(url)
+    if partes.scheme or partes.netloc or not partes.path.startswith("/api/"):
+        return resultado(
+            status.HTTP_400_BAD_REQUEST, {"detail": ERROR_BATCH_URL_INVALIDA}
+        )
+    try:
+        rota = resolve(partes.path)
+    except Resolver404:
+        return resultado(
+            status.HTTP_404_NOT_FOUND, {"detail": ERROR_BATCH_NAO_ENCONTRADO}
+        )
+    if rota.func is batch:
+        return resultado(status.HTTP_400_BAD_REQUEST, {"detail": ERROR_BATCH_ANINHADO})
+
+    subrequisicao = copy.copy(request._request)
+    subrequisicao.method = "GET"
+    subrequisicao.path = subrequisicao.path_info = partes.path
+    subrequisicao.META = {
+        chave: valor
+        for chave, valor in request.META.items()
+        if chave not in _CABECALHOS_NAO_REPASSADOS
+    }
+    subrequisicao.META.update(
+        REQUEST_METHOD="GET",
+        PATH_INFO=partes.path,
+        QUERY_STRING=partes.query,
+        HTTP_ACCEPT="application/json",
+    )
+    subrequisicao.GET = QueryDict(partes.query)
+    subrequisicao.resolver_match = rota
+    # Reaproveita o usuário já autenticado em vez de decodificar o JWT de novo
+    subrequisicao._force_auth_user = request.user
+    subrequisicao._force_auth_token = request.auth
+
+    view = rota.func
+    if iscoroutinefunction(view):
+        # Rotas /async/: a view devolve uma corrotina, executada aqui até o fim
+        view = async_to_sync(view)
+    try:
+        response = view(subrequisicao, *rota.args, **rota.kwargs)
+        if getattr(response, "streaming", False):
+            response.close()
+            return resultado(
+                status.HTTP_400_BAD_REQUEST, {"detail": ERROR_BATCH_STREAMING}
+            )
+        if hasattr(response, "render"):
+            response.render()
+    except Exception as e:
+        logger.error(f"Erro inesperado na sub-requisição {url}: {str(e)}")
+        return resultado(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": ERROR_GENERIC}
+        )
+
+    corpo = response.content.decode(response.charset or "utf-8") or None
+    if corpo and response.get("Content-Type", "").startswith("application/json"):
+        corpo = json.loads(corpo)
+    return resultado(response.status_code, corpo)
+
+
+# ==============================
+# SCHEMA OPENAPI
+# ==============================
+
+
+class SchemaOpenAPIView(SpectacularAPIView):
+    """
+    Schema OpenAPI servido a partir da versão pré-gerada (SchemaService).
+
+    O schema só é regerado quando a versão do código muda; o ETag carrega
+    essa versão, então clientes (Swagger UI, Redoc) recebem 304 enquanto o
+    código não mudar.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        formato = request.accepted_renderer.format
+        service = SchemaService()
+        etag = f'"schema-{service.versao_codigo()}-{formato}"'
+
+        resposta = get_conditional_response(request, etag=etag)
+        if resposta is None:
+            resposta = HttpResponse(
+                service.obter(formato),
+                content_type=request.accepted_renderer.media_type,
+            )
+            resposta["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        resposta["ETag"] = etag
+        resposta["Cache-Control"] = "public, no-cache"
+        return resposta
 
 
 # ==============================
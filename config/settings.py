@@ -2,6 +2,7 @@
 Django settings for config project.
 """
 
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -61,6 +62,8 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     # Adicionado para servir arquivos estáticos em produção
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # Compressão brotli/gzip das respostas de /api/
+    "clinic.middleware.CompressaoAPIMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -115,6 +118,28 @@ if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
         DATABASES["default"]["NAME"] = str(BASE_DIR / db_name)
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Por padrão usa memória local (um cache por processo). Com vários workers,
+# use um backend compartilhado (ex: CACHE_BACKEND=django.core.cache.backends.
+# filebased.FileBasedCache e CACHE_LOCATION=/var/tmp/clinic_cache) para que
+# as invalidações feitas por um worker valham para todos.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "clinic"),
+    }
+}
+
+# Requisições em lote (POST /api/v1/batch/): máximo de sub-requisições
+# executadas em paralelo. Com 1, são executadas em sequência na mesma
+# thread (e na mesma conexão com o banco) da requisição principal.
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "4"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -173,6 +198,32 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
 
+# Entrega da mídia (clinic.midia.servir_midia): com um proxy na frente, a
+# transferência pode ficar com ele, liberando o worker do gunicorn:
+# - "x-accel-redirect" (nginx): location interna MIDIA_PREFIXO_INTERNO
+#   apontando (alias) para MEDIA_ROOT
+# - "x-sendfile" (Apache mod_xsendfile, lighttpd)
+# Vazio: o próprio Django envia o arquivo (sendfile via wsgi.file_wrapper)
+MIDIA_ENVIO = os.getenv("MIDIA_ENVIO", "").lower()
+MIDIA_PREFIXO_INTERNO = os.getenv("MIDIA_PREFIXO_INTERNO", "/midia-interna/")
+
+# Uploads de foto em andamento (em partes). Fora de MEDIA_ROOT para não
+# serem servidos, mas no mesmo disco: a foto concluída é movida, não copiada
+FOTO_UPLOAD_DIR = os.getenv("FOTO_UPLOAD_DIR", str(BASE_DIR / "uploads_parciais"))
+
+# Miniaturas das fotos dos pacientes geradas por threads em segundo plano
+# após o upload. Com 'False' são geradas na própria requisição.
+MINIATURAS_EM_SEGUNDO_PLANO = os.getenv(
+    "MINIATURAS_EM_SEGUNDO_PLANO", "True"
+).lower() in ("true", "1", "t")
+MINIATURAS_WORKERS = int(os.getenv("MINIATURAS_WORKERS", "2"))
+
+# Schema OpenAPI pré-gerado (ver 'python manage.py gerar_schema_openapi').
+# VERSAO_CODIGO (ex.: hash do commit) identifica quando o schema deve ser
+# regerado; sem ela, a versão é calculada a partir dos arquivos do projeto.
+SCHEMA_OPENAPI_DIR = os.getenv("SCHEMA_OPENAPI_DIR", BASE_DIR / "openapi")
+VERSAO_CODIGO = os.getenv("VERSAO_CODIGO", "")
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -189,8 +240,28 @@ REST_FRAMEWORK = {
     # Exemplo de paginação padrão
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,  # Tamanho da página para paginação
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
+# Renderers de alto desempenho (opt-in): JSON com orjson, se instalado, e
+# MessagePack via 'Accept: application/msgpack', se o pacote msgpack existir
+API_RENDERERS_RAPIDOS = os.getenv("API_RENDERERS_RAPIDOS", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+if API_RENDERERS_RAPIDOS:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"][0] = (
+        "clinic.renderers.JSONRapidoRenderer"
+    )
+    if importlib.util.find_spec("msgpack"):
+        REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+            "clinic.renderers.MessagePackRenderer"
+        )
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
@@ -7,8 +7,9 @@ Estrutura de versionamento da API:
 - Futuras versões poderão ser adicionadas como /api/v2/, etc.
 """
 
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -18,7 +19,6 @@ from django.urls import re_path
 # ---------------------------------------------
 # --- DRF-SPECTACULAR (DOCUMENTAÇÃO) IMPORTS ---
 from drf_spectacular.views import (  # type: ignore
-    SpectacularAPIView,
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
@@ -29,6 +29,9 @@ from rest_framework_simplejwt.views import (  # type: ignore
     TokenRefreshView,
 )
 
+from clinic.midia import servir_midia
+from clinic.views import SchemaOpenAPIView
+
 # ---------------------------------------------
 
 
@@ -57,8 +60,8 @@ urlpatterns = [
     path("api/v1/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     # --- DOCUMENTATION URLS ---
     path(
-        "api/schema/", SpectacularAPIView.as_view(), name="schema"
-    ),  # Gera o schema da API
+        "api/schema/", SchemaOpenAPIView.as_view(), name="schema"
+    ),  # Schema da API (pré-gerado, regerado só quando o código muda)
     # Swagger UI:
     path(
         "api/schema/swagger-ui/",
@@ -78,6 +81,12 @@ urlpatterns = [
     re_path(r'^(?P<path>style\.css|script\.js)$', serve, {'document_root': settings.BASE_DIR / 'frontend'}),
 ]
 
-# Servir Arquivos de Mídia em Desenvolvimento
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Arquivos de mídia (fotos, miniaturas), em desenvolvimento e em produção:
+# Range, ETag e cache longo; envio delegado ao proxy com MIDIA_ENVIO
+urlpatterns += [
+    re_path(
+        r"^%s(?P<caminho>.+)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+        servir_midia,
+        name="midia",
+    ),
+]
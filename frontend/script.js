@@ -413,6 +413,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const pacienteSelect = document.getElementById('pacienteSelect');
         const veterinarioSelect = document.getElementById('veterinarioSelect');
         const sintomasContainer = document.getElementById('listaSintomasCheckboxes');
+        const buscaSintomasInput = document.getElementById('buscaSintomas');
+        const sugestoesUl = document.getElementById('sugestoesSintomas');
         const consultaForm = document.getElementById('novaConsultaForm');
         const resultadoDiv = document.getElementById('resultadoDiagnostico');
         const diagnosticosUl = document.getElementById('listaDiagnosticosSugeridos');
@@ -420,68 +422,90 @@ document.addEventListener('DOMContentLoaded', () => {
         const submitButton = document.getElementById('submitButton');
 
         // --- Funções Helper para a página de consulta ---
-        const carregarTodosDados = async endpoint => {
-            const todosOsDados = [];
-            let url = `${apiBaseUrl}/${endpoint}/`;
+        // Busca todas as listas de uma vez em /lookups/, no formato [id, rótulo],
+        // já ordenadas pelo rótulo. O navegador revalida a resposta via ETag.
+        const carregarLookups = async recursos => {
+            const url = `${apiBaseUrl}/lookups/?recursos=${recursos.join(',')}`;
+            const response = await fetch(url, {
+                headers: { Authorization: `Bearer ${getAuthToken()}` }
+            });
+            if (!response.ok)
+                throw new Error(`Erro ao buscar dados de ${recursos.join(', ')}: ${response.statusText}`);
+            return response.json();
+        };
 
-            while (url) {
-                const response = await fetch(url, {
-                    headers: { Authorization: `Bearer ${getAuthToken()}` }
-                });
-                if (!response.ok)
-                    throw new Error(`Erro ao buscar dados de ${endpoint}: ${response.statusText}`);
-                const data = await response.json();
-                todosOsDados.push(...(data.results || data));
-                url = data.next;
-            }
-            return todosOsDados;
+        const popularSelect = (selectElement, itens, nomeCampo) => {
+            selectElement.innerHTML = `<option value="">Selecione um ${nomeCampo}</option>`;
+            itens.forEach(([id, rotulo]) => {
+                const option = document.createElement('option');
+                option.value = id;
+                option.textContent = rotulo;
+                selectElement.appendChild(option);
+            });
         };
 
-        const popularSelect = async (selectElement, endpoint, nomeCampo) => {
-            try {
-                const dados = await carregarTodosDados(endpoint);
-                selectElement.innerHTML = `<option value="">Selecione um ${nomeCampo}</option>`;
-                dados.sort((a, b) =>
-                    (a.nome_completo || a.nome).localeCompare(b.nome_completo || b.nome)
-                );
-                dados.forEach(item => {
-                    const option = document.createElement('option');
-                    option.value = item.id;
-                    option.textContent = item.nome_completo || item.nome;
-                    selectElement.appendChild(option);
-                });
-            } catch (error) {
-                selectElement.innerHTML = '<option value="">Erro ao carregar</option>';
-                // Erro ao popular select - considere usar um sistema de logging em produção
-            }
+        // Sintomas escolhidos no autocompletar viram checkboxes marcados
+        // (desmarcar remove o sintoma da consulta).
+        const adicionarSintoma = (id, nome) => {
+            if (document.getElementById(`sintoma-${id}`)) return;
+            if (!sintomasContainer.querySelector('input')) sintomasContainer.innerHTML = '';
+            const div = document.createElement('div');
+            const checkbox = document.createElement('input');
+            checkbox.type = 'checkbox';
+            checkbox.id = `sintoma-${id}`;
+            checkbox.name = 'sintomas_apresentados';
+            checkbox.value = id;
+            checkbox.checked = true;
+            const label = document.createElement('label');
+            label.htmlFor = `sintoma-${id}`;
+            label.textContent = nome;
+            div.appendChild(checkbox);
+            div.appendChild(label);
+            sintomasContainer.appendChild(div);
         };
 
-        const popularSintomas = async () => {
-            try {
-                const sintomas = await carregarTodosDados('sintomas');
-                sintomasContainer.innerHTML = '';
-                sintomas.sort((a, b) => a.nome.localeCompare(b.nome));
-                sintomas.forEach(sintoma => {
-                    const div = document.createElement('div');
-                    const checkbox = document.createElement('input');
-                    checkbox.type = 'checkbox';
-                    checkbox.id = `sintoma-${sintoma.id}`;
-                    checkbox.name = 'sintomas_apresentados';
-                    checkbox.value = sintoma.id;
-                    const label = document.createElement('label');
-                    label.htmlFor = `sintoma-${sintoma.id}`;
-                    label.textContent = sintoma.nome;
-                    div.appendChild(checkbox);
-                    div.appendChild(label);
-                    sintomasContainer.appendChild(div);
+        const mostrarSugestoes = sugestoes => {
+            sugestoesUl.innerHTML = '';
+            sugestoes.forEach(({ id, nome, sinonimo }) => {
+                const li = document.createElement('li');
+                li.textContent = sinonimo ? `${nome} (${sinonimo})` : nome;
+                li.addEventListener('mousedown', event => {
+                    event.preventDefault();
+                    adicionarSintoma(id, nome);
+                    buscaSintomasInput.value = '';
+                    sugestoesUl.classList.add('hidden');
                 });
-            } catch (error) {
-                sintomasContainer.innerHTML =
-                    '<p class="error-message">Não foi possível carregar os sintomas.</p>';
-                // Erro ao popular sintomas - considere usar um sistema de logging em produção
-            }
+                sugestoesUl.appendChild(li);
+            });
+            sugestoesUl.classList.toggle('hidden', sugestoes.length === 0);
         };
 
+        // Consulta /sintomas/autocomplete/ a cada tecla (com um pequeno atraso);
+        // respostas fora de ordem são descartadas.
+        let ultimaBuscaSintomas = 0;
+        let atrasoBuscaSintomas;
+        buscaSintomasInput.addEventListener('input', () => {
+            clearTimeout(atrasoBuscaSintomas);
+            const termo = buscaSintomasInput.value.trim();
+            if (!termo) {
+                mostrarSugestoes([]);
+                return;
+            }
+            atrasoBuscaSintomas = setTimeout(async () => {
+                const numero = ++ultimaBuscaSintomas;
+                try {
+                    const url = `${apiBaseUrl}/sintomas/autocomplete/?q=${encodeURIComponent(termo)}`;
+                    const response = await fetch(url);
+                    if (!response.ok) throw new Error(response.statusText);
+                    const sugestoes = await response.json();
+                    if (numero === ultimaBuscaSintomas) mostrarSugestoes(sugestoes);
+                } catch (error) {
+                    mostrarSugestoes([]);
+                }
+            }, 150);
+        });
+        buscaSintomasInput.addEventListener('blur', () => sugestoesUl.classList.add('hidden'));
+
         // --- Event Listener do formulário da consulta ---
         consultaForm.addEventListener('submit', async event => {
             event.preventDefault();
@@ -552,10 +576,16 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         // --- Inicialização da página de consulta ---
-        const inicializarPaginaConsulta = () => {
-            popularSelect(pacienteSelect, 'pacientes', 'paciente');
-            popularSelect(veterinarioSelect, 'veterinarios', 'veterinário');
-            popularSintomas();
+        const inicializarPaginaConsulta = async () => {
+            try {
+                const dados = await carregarLookups(['pacientes', 'veterinarios']);
+                popularSelect(pacienteSelect, dados.pacientes, 'paciente');
+                popularSelect(veterinarioSelect, dados.veterinarios, 'veterinário');
+            } catch (error) {
+                pacienteSelect.innerHTML = '<option value="">Erro ao carregar</option>';
+                veterinarioSelect.innerHTML = '<option value="">Erro ao carregar</option>';
+                // Erro ao carregar listas - considere usar um sistema de logging em produção
+            }
         };
 
         inicializarPaginaConsulta();